@@ -0,0 +1,179 @@
+from typing import List, Dict, Iterable, Optional, Sequence
+import numpy as np
+from deserialization import achievements_list
+
+WORD_BITS = 64
+
+# Two words cover the 67 Craftax achievements; names outside the list take the next free bits.
+MIN_WORDS = 2
+
+
+def n_words(n_achievements: int) -> int:
+    """Number of uint64 words needed for `n_achievements` bits."""
+    return max(MIN_WORDS, -(-n_achievements // WORD_BITS))
+
+
+def pack_bits(flags: np.ndarray, words: Optional[int] = None) -> np.ndarray:
+    """
+    Pack a boolean matrix (rows x bits) into uint64 words, bit `i` of a row at word i // 64, bit i % 64.
+
+    Args:
+    - flags (np.ndarray): Boolean matrix.
+    - words (int, optional): Number of words per row. Defaults to the smallest that fits.
+
+    Returns:
+    - np.ndarray: Array of shape (rows, words), dtype uint64.
+    """
+    flags = np.asarray(flags, dtype=np.bool_)
+    if flags.ndim != 2:
+        flags = flags.reshape(len(flags), -1)
+    words = n_words(flags.shape[1]) if words is None else words
+    padded = np.zeros((len(flags), words * WORD_BITS), dtype=np.bool_)
+    padded[:, :flags.shape[1]] = flags
+    return np.packbits(padded, axis=1, bitorder='little').view('<u8').astype(np.uint64, copy=False)
+
+
+def unpack_bits(words: np.ndarray, n_bits: int) -> np.ndarray:
+    """Inverse of `pack_bits`: boolean matrix of shape (rows, n_bits)."""
+    words = np.ascontiguousarray(words, dtype='<u8')
+    return np.unpackbits(words.view(np.uint8), axis=1, count=n_bits, bitorder='little').astype(np.bool_)
+
+
+class AchievementBits:
+    """
+    Achievements of every state as a bitset, plus the first step each achievement is unlocked.
+
+    Bit `i` stands for `names[i]`; `achievements_list` comes first, so its bits are the same in
+    every episode.
+
+    Attributes:
+    - names (List[str]): Achievement of every bit.
+    - words (np.ndarray): Bitset of every state, shape (states, words), dtype uint64.
+    - first_unlock (np.ndarray): First step at which each bit is set, or -1; computed on first use.
+    """
+
+    def __init__(self, words: np.ndarray, names: List[str]):
+        self.names = list(names)
+        self._bits: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.words = words
+        self._first_unlock: Optional[np.ndarray] = None
+
+    @staticmethod
+    def from_flags(achievements: np.ndarray, names: List[str]) -> 'AchievementBits':
+        """
+        Pack a boolean matrix (states x names) into bitsets.
+
+        Args:
+        - achievements (np.ndarray): Achievement flags of every state.
+        - names (List[str]): Achievement of every column.
+
+        Returns:
+        - AchievementBits: The bitsets.
+        """
+        achievements = np.asarray(achievements, dtype=np.bool_).reshape(len(achievements), len(names))
+        return AchievementBits(pack_bits(achievements), names)
+
+    @property
+    def first_unlock(self) -> np.ndarray:
+        if self._first_unlock is None:
+            first = np.full(len(self.names), -1, dtype=np.int64)
+            if len(self.words):
+                # one scan of a word column per achievement that is ever held
+                held = unpack_bits(np.bitwise_or.reduce(self.words, axis=0)[None, :], len(self.names))[0]
+                for bit in np.flatnonzero(held):
+                    column = (self.words[:, bit // WORD_BITS] >> np.uint64(bit % WORD_BITS)) & np.uint64(1)
+                    first[bit] = int(np.argmax(column))
+            self._first_unlock = first
+        return self._first_unlock
+
+    def extended(self, words: np.ndarray, names: List[str], start: int) -> 'AchievementBits':
+        """
+        Bitsets of a longer episode whose states before `start` are the ones of this episode.
+
+        `names` starts with the names of this episode. First unlocks before `start` are kept
+        and the others are looked up in the new states only.
+
+        Args:
+        - words (np.ndarray): Bitset of every state of the new episode.
+        - names (List[str]): Achievement of every bit.
+        - start (int): First state that may differ.
+
+        Returns:
+        - AchievementBits: The bitsets.
+        """
+        bits = AchievementBits(words, names)
+        if self._first_unlock is not None:
+            first = np.full(len(bits.names), -1, dtype=np.int64)
+            kept = self._first_unlock
+            first[:len(kept)] = np.where(kept < start, kept, -1)
+            added = words[start:]
+            if len(added):
+                held = unpack_bits(np.bitwise_or.reduce(added, axis=0)[None, :], len(bits.names))[0]
+                for bit in np.flatnonzero(held & (first < 0)):
+                    column = (added[:, bit // WORD_BITS] >> np.uint64(bit % WORD_BITS)) & np.uint64(1)
+                    first[bit] = start + int(np.argmax(column))
+            bits._first_unlock = first
+        return bits
+
+    def bit(self, name: str) -> int:
+        """Bit of an achievement, or -1 if it never appears in the episode."""
+        return self._bits.get(name, -1)
+
+    def mask(self, names: Iterable[str]) -> np.ndarray:
+        """Bitset with the bits of `names` set; unknown names are ignored."""
+        mask = np.zeros(self.words.shape[1], dtype=np.uint64)
+        for name in names:
+            bit = self.bit(name)
+            if bit >= 0:
+                mask[bit // WORD_BITS] |= np.uint64(1) << np.uint64(bit % WORD_BITS)
+        return mask
+
+    def has(self, name: str, step: int) -> bool:
+        """Check if the achievement is set at a step."""
+        bit = self.bit(name)
+        if bit < 0:
+            return False
+        word = self.words[step, bit // WORD_BITS]
+        return bool((word >> np.uint64(bit % WORD_BITS)) & np.uint64(1))
+
+    def first_step(self, name: str) -> int:
+        """First step at which the achievement is set, or -1."""
+        bit = self.bit(name)
+        return int(self.first_unlock[bit]) if bit >= 0 else -1
+
+    def valid_mask(self) -> np.ndarray:
+        """Bitset of the known Craftax achievements."""
+        return self.mask(achievements_list)
+
+    def all_valid(self) -> bool:
+        """Check that no state holds an achievement outside `achievements_list`, with one bitwise AND."""
+        return not (self.words & ~self.valid_mask()).any()
+
+
+def corpus_valid(bitsets: Sequence[AchievementBits]) -> np.ndarray:
+    """
+    Validate the achievements of many episodes at once.
+
+    The bitsets of every state of every episode are stacked and tested against the mask of
+    known achievements with a single bitwise AND.
+
+    Args:
+    - bitsets (Sequence[AchievementBits]): The achievement bitsets of the episodes.
+
+    Returns:
+    - np.ndarray: True for every episode whose states only hold known achievements.
+    """
+    if not bitsets:
+        return np.zeros(0, dtype=np.bool_)
+    width = max(bits.words.shape[1] for bits in bitsets)
+    stacked = np.zeros((sum(len(bits.words) for bits in bitsets), width), dtype=np.uint64)
+    row = 0
+    for bits in bitsets:
+        stacked[row:row + len(bits.words), :bits.words.shape[1]] = bits.words
+        row += len(bits.words)
+    # `achievements_list` always holds the lowest bits
+    valid = pack_bits(np.ones((1, len(achievements_list)), dtype=np.bool_), width)[0]
+    invalid_rows = (stacked & ~valid).any(axis=1)
+    lengths = [len(bits.words) for bits in bitsets]
+    owners = np.repeat(np.arange(len(bitsets)), lengths)
+    return np.bincount(owners[invalid_rows], minlength=len(bitsets)) == 0
@@ -0,0 +1,169 @@
+from enum import IntEnum
+from typing import List, Dict, Tuple, Optional, Union
+import numpy as np
+from deserialization import action_map
+
+ACTION_DTYPE = np.uint8
+
+
+class Action(IntEnum):
+    """Craftax action set; codes follow the environment's action ids."""
+    NOOP = 0
+    LEFT = 1
+    RIGHT = 2
+    UP = 3
+    DOWN = 4
+    DO = 5
+    SLEEP = 6
+    PLACE_STONE = 7
+    PLACE_TABLE = 8
+    PLACE_FURNACE = 9
+    PLACE_PLANT = 10
+    MAKE_WOOD_PICKAXE = 11
+    MAKE_STONE_PICKAXE = 12
+    MAKE_IRON_PICKAXE = 13
+    MAKE_WOOD_SWORD = 14
+    MAKE_STONE_SWORD = 15
+    MAKE_IRON_SWORD = 16
+    REST = 17
+    DESCEND = 18
+    ASCEND = 19
+    MAKE_DIAMOND_PICKAXE = 20
+    MAKE_DIAMOND_SWORD = 21
+    MAKE_IRON_ARMOUR = 22
+    MAKE_DIAMOND_ARMOUR = 23
+    SHOOT_ARROW = 24
+    MAKE_ARROW = 25
+    CAST_FIREBALL = 26
+    CAST_ICEBALL = 27
+    PLACE_TORCH = 28
+    DRINK_POTION_RED = 29
+    DRINK_POTION_GREEN = 30
+    DRINK_POTION_BLUE = 31
+    DRINK_POTION_PINK = 32
+    DRINK_POTION_CYAN = 33
+    DRINK_POTION_YELLOW = 34
+    READ_BOOK = 35
+    ENCHANT_SWORD = 36
+    ENCHANT_ARMOUR = 37
+    MAKE_TORCH = 38
+    LEVEL_UP_DEXTERITY = 39
+    LEVEL_UP_STRENGTH = 40
+    LEVEL_UP_INTELLIGENCE = 41
+    ENCHANT_BOW = 42
+    UNKNOWN = 255
+
+
+# Number of possible codes; sizes the lookup tables and histograms
+N_CODES = 256
+
+# Code -> action name as stored on PlayerState.action ("place_table", ...)
+ACTION_NAMES = np.full(N_CODES, 'unknown', dtype=object)
+for _action in Action:
+    ACTION_NAMES[_action.value] = _action.name.lower()
+
+# Recorded key -> code, for decoding the `actions` section
+KEY_CODES: Dict[str, int] = {key: int(Action[name.upper()]) for key, name in action_map.items()}
+
+# Placed item -> (action, inventory item spent by the placement, if tracked)
+PLACEMENTS: Dict[str, Tuple[Action, Optional[str]]] = {
+    "stone": (Action.PLACE_STONE, "stone"),
+    "table": (Action.PLACE_TABLE, "wood"),
+    "furnace": (Action.PLACE_FURNACE, "stone"),
+    "plant": (Action.PLACE_PLANT, None),
+    "torch": (Action.PLACE_TORCH, None),
+}
+
+
+def action_code(action: Union[str, int, Action]) -> int:
+    """
+    Resolve an action name ("place_table") or code to its code.
+
+    Raises:
+    - ValueError: If the name or code is not an action.
+    """
+    if isinstance(action, str):
+        member = Action.__members__.get(action.upper())
+        if member is None:
+            raise ValueError(f"Unknown action '{action}'.")
+        return int(member)
+    if int(action) not in Action._value2member_map_:
+        raise ValueError(f"Unknown action code {action}.")
+    return int(action)
+
+
+def encode_actions(names) -> np.ndarray:
+    """Convert a sequence of recorded action names to a code array; unrecognised names become UNKNOWN."""
+    names = np.asarray(names, dtype=object)
+    distinct, inverse = np.unique(names.astype(str), return_inverse=True)
+    codes = np.array([Action.__members__.get(name.upper(), Action.UNKNOWN) for name in distinct], dtype=ACTION_DTYPE)
+    return codes[inverse].reshape(names.shape)
+
+
+class ActionIndex:
+    """
+    Sorted steps of every action, grouped by code (CSR layout).
+
+    Attributes:
+    - codes (np.ndarray): Action code of every state.
+    - counts (np.ndarray): Number of steps of every code (the action histogram).
+    """
+
+    def __init__(self, codes: np.ndarray):
+        self.codes = np.asarray(codes, dtype=ACTION_DTYPE)
+        self.counts = np.bincount(self.codes, minlength=N_CODES)
+        self._offsets = np.concatenate(([0], np.cumsum(self.counts)))
+        self._steps = np.argsort(self.codes, kind='stable')
+
+    def extended(self, codes: np.ndarray, start: int) -> 'ActionIndex':
+        """
+        Index of a longer action column whose codes before `start` are the indexed ones.
+
+        The steps before `start` keep their place and only the new codes are sorted, so
+        the cost is a copy of the index rather than a sort of the whole column.
+
+        Args:
+        - codes (np.ndarray): Action code of every state.
+        - start (int): First state that may differ.
+
+        Returns:
+        - ActionIndex: The index of `codes`.
+        """
+        index = ActionIndex.__new__(ActionIndex)
+        index.codes = np.asarray(codes, dtype=ACTION_DTYPE)
+        # the code of an indexed step is given by its group, not read back from a column that may have changed
+        dropped = np.flatnonzero(self._steps >= start)
+        kept_counts = self.counts - np.bincount(np.searchsorted(self._offsets, dropped, side='right') - 1,
+                                                minlength=N_CODES)
+        added = np.argsort(index.codes[start:], kind='stable') + start
+        index.counts = kept_counts + np.bincount(index.codes[start:], minlength=N_CODES)
+        index._offsets = np.concatenate(([0], np.cumsum(index.counts)))
+        index._steps = np.insert(self._steps[self._steps < start], np.cumsum(kept_counts)[index.codes[added]], added)
+        return index
+
+    def steps(self, action: Union[str, int, Action]) -> np.ndarray:
+        """Sorted steps at which `action` was taken."""
+        code = action_code(action)
+        return self._steps[self._offsets[code]:self._offsets[code + 1]]
+
+    def first(self, action: Union[str, int, Action], start: int = 0, end: Optional[int] = None) -> int:
+        """
+        Find the first step in [start, end] at which `action` was taken.
+
+        Args:
+        - action (str or int): The action name or code.
+        - start (int): The first step to consider.
+        - end (int, optional): The last step to consider (inclusive). Defaults to the last state.
+
+        Returns:
+        - int: The first matching step, or -1 if there is none.
+        """
+        steps = self.steps(action)
+        slot = int(np.searchsorted(steps, start))
+        if slot == len(steps) or (end is not None and steps[slot] > end):
+            return -1
+        return int(steps[slot])
+
+    def histogram(self) -> Dict[str, int]:
+        """Number of steps of every action taken at least once."""
+        return {ACTION_NAMES[code]: int(count) for code, count in enumerate(self.counts) if count}
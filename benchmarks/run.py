@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import List, Dict, Tuple, Any, Callable
+import numpy as np
+from deserialization import GameData, load_game_data
+from checkers import base, achivments
+import scenarius
+import scenarious_map
+import scenarios_building
+from shapes import cross_template
+from benchmarks.synthetic import EpisodeConfig, generate_episode
+
+Checker = Tuple[str, Callable[[GameData], Any]]
+
+
+def checkers_for(config: EpisodeConfig) -> List[Checker]:
+    """Every public checker, with arguments that make sense for an episode of `config`."""
+    last = config.n_states - 1
+    center = (config.map_size[0] // 2, config.map_size[1] // 2)
+    corners = [(row, col) for row in (0, config.map_size[0] - 1) for col in (0, config.map_size[1] - 1)]
+    checkers: List[Checker] = [
+        ('is_variable_increasing', lambda gd: base.is_variable_increasing(gd, 'player_food', 0, last)),
+        ('is_variable_decreasing', lambda gd: base.is_variable_decreasing(gd, 'player_food', 0, last)),
+        ('has_item_in_inventory', lambda gd: base.has_item_in_inventory(gd, last // 2, 'wood')),
+        ('find_item_in_inventory', lambda gd: base.find_item_in_inventory(gd, 'wood')),
+        ('is_achievement_obtained', lambda gd: base.is_achievement_obtained(gd, 'COLLECT_WOOD', 0, last)),
+        ('first_achievement_step', lambda gd: base.first_achievement_step(gd, 'COLLECT_STONE')),
+        ('find_achievement_state', lambda gd: base.find_achievement_state(gd, 'COLLECT_STONE')),
+        ('validate_game_achievements', lambda gd: base.validate_game_achievements(gd)),
+        ('did_player_go_north', lambda gd: base.did_player_go_north(gd, 0, last)),
+        ('did_player_go_south', lambda gd: base.did_player_go_south(gd, 0, last)),
+        ('did_player_go_west', lambda gd: base.did_player_go_west(gd, 0, last)),
+        ('did_player_go_east', lambda gd: base.did_player_go_east(gd, 0, last)),
+        ('check_achievement_inventory_radius',
+         lambda gd: base.check_achievement_inventory_radius(gd, center, 3, 'COLLECT_DIAMOND', 'iron')),
+        ('check_achievement_inventory_near_any',
+         lambda gd: base.check_achievement_inventory_near_any(gd, corners, 3, 'COLLECT_DIAMOND', 'iron')),
+        ('did_item_count_decrease', lambda gd: base.did_item_count_decrease(gd, 'stone', 0, last)),
+        ('was_item_placed', lambda gd: base.was_item_placed(gd, 'table', 0, config.n_states)),
+        ('was_item_collected_after_another', lambda gd: scenarius.was_item_collected_after_another(gd, 'wood', 'iron')),
+        ('did_placing_item_increase_variable',
+         lambda gd: scenarius.did_placing_item_increase_variable(gd, 'table', 'player_xp')),
+        ('was_item_placed_near_another', lambda gd: scenarius.was_item_placed_near_another(gd, 'table', 'stone')),
+        ('is_item_in_closed_contour', lambda gd: scenarius.is_item_in_closed_contour(gd, 'table', 'stone')),
+        ('is_point_within_polygon', lambda gd: scenarius.is_point_within_polygon(center, gd, 'stone')),
+        ('is_object_near_target', lambda gd: scenarious_map.is_object_near_target(gd, 'CRAFTING_TABLE', 'WATER')),
+        ('is_player_within_all_water_sources', lambda gd: scenarious_map.is_player_within_all_water_sources(gd)),
+        ('is_player_within_north_water_sources',
+         lambda gd: scenarious_map.is_player_within_north_water_sources(gd, 'CRAFTING_TABLE')),
+        ('is_player_within_south_water_sources', lambda gd: scenarious_map.is_player_within_south_water_sources(gd)),
+        ('find_clusters', lambda gd: scenarious_map.find_clusters(gd)),
+        ('if_go_in_direction_until_find_block',
+         lambda gd: scenarious_map.if_go_in_direction_until_find_block(gd, 'DIAMOND', 'north')),
+        ('first_shape_step', lambda gd: scenarios_building.first_shape_step(gd, 'STONE', [cross_template()])),
+        ('is_cross_formed', lambda gd: scenarios_building.is_cross_formed(gd, 'STONE')),
+        ('is_square_formed', lambda gd: scenarios_building.is_square_formed(gd, 'STONE', 3)),
+        ('is_line_formed', lambda gd: scenarios_building.is_line_formed(gd, 'STONE', 6, True)),
+    ]
+    for name in sorted(dir(achivments)):
+        function = getattr(achivments, name)
+        if name.startswith('is_') and callable(function):
+            checkers.append((name, function))
+    return checkers
+
+
+def time_call(function: Callable[[], Any], setup: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Time `function(setup())` `repeat` times, leaving `setup` out of the measurement.
+
+    Returns:
+    - Dict[str, Any]: min / median seconds, and the error message if the call raised.
+    """
+    timings, error = [], None
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        try:
+            function(argument)
+        except Exception as exception:  # recorded; `main` fails once the suite is done
+            error = f'{type(exception).__name__}: {exception}'
+        timings.append(time.perf_counter() - start)
+    return {'min': min(timings), 'median': statistics.median(timings), 'repeat': repeat, 'error': error}
+
+
+def run_episode(config: EpisodeConfig, repeat: int, directory: str) -> List[Dict[str, Any]]:
+    data = generate_episode(config)
+    path = os.path.join(directory, f'episode_{config.n_states}_{config.seed}.json')
+    with open(path, 'w') as file:
+        json.dump(data, file)
+
+    records = [dict(config=config.to_dict(), name='load_game_data', **time_call(lambda p: load_game_data(p), lambda: path, repeat))]
+    # every checker runs on a freshly decoded episode, so per-episode caches start cold
+    for name, checker in checkers_for(config):
+        records.append(dict(config=config.to_dict(), name=name, **time_call(checker, lambda: GameData.from_json(data), repeat)))
+    return records
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time episode loading and every checker on synthetic episodes.')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--map-sizes', type=int, nargs='+', default=[48])
+    parser.add_argument('--density', type=float, default=0.2)
+    parser.add_argument('--edit-rate', type=float, default=0.05)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_output.json')
+    args = parser.parse_args()
+
+    records = []
+    with tempfile.TemporaryDirectory() as directory:
+        for map_size in args.map_sizes:
+            for n_states in args.lengths:
+                config = EpisodeConfig(n_states=n_states, change_density=args.density, map_size=(map_size, map_size),
+                                       edit_rate=args.edit_rate, seed=args.seed)
+                for record in run_episode(config, args.repeat, directory):
+                    records.append(record)
+                    print(f"{n_states:>8} {map_size:>4}  {record['name']:<40} {record['median'] * 1e3:10.2f} ms"
+                          + (f"  ({record['error']})" if record['error'] else ''))
+
+    with open(args.output, 'w') as file:
+        json.dump({'environment': environment(), 'results': records}, file, indent=2)
+
+    failures = sorted({record['name'] for record in records if record['error']})
+    if failures:
+        raise SystemExit(f"{len(failures)} checker(s) raised: {', '.join(failures)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+from typing import List, Dict, Tuple, Any, Optional
+from dataclasses import dataclass, field, asdict
+import numpy as np
+from deserialization import achievements_list, action_map
+from columnar import VARIABLE_COLUMNS, INVENTORY_COLUMNS
+from blocks import BlockType
+
+# Default block mix of the generated maps: mostly grass, with water pools and resources
+DEFAULT_BLOCKS: Dict[str, float] = {
+    "GRASS": 0.55, "WATER": 0.08, "STONE": 0.15, "TREE": 0.12, "SAND": 0.04,
+    "COAL": 0.03, "IRON": 0.02, "DIAMOND": 0.01,
+}
+
+# Blocks written by the map edits (placements and mining)
+DEFAULT_EDIT_BLOCKS: Dict[str, float] = {
+    "PATH": 0.4, "STONE": 0.2, "CRAFTING_TABLE": 0.15, "FURNACE": 0.1, "PLANT": 0.15,
+}
+
+
+@dataclass
+class EpisodeConfig:
+    """
+    Shape of a synthetic episode.
+
+    Attributes:
+    - n_states (int): Trajectory length.
+    - change_density (float): Probability that a variable or the inventory changes at a step.
+    - map_size (Tuple[int, int]): (rows, cols) of the world map.
+    - blocks (Dict[str, float]): Relative frequency of every block of the initial map.
+    - edit_rate (float): Average number of map cell edits per step.
+    - edit_blocks (Dict[str, float]): Relative frequency of the blocks written by edits.
+    - achievement_rate (float): Probability that a new achievement is unlocked at a step.
+    - seed (int): Random seed.
+    """
+    n_states: int = 1000
+    change_density: float = 0.2
+    map_size: Tuple[int, int] = (48, 48)
+    blocks: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_BLOCKS))
+    edit_rate: float = 0.05
+    edit_blocks: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_EDIT_BLOCKS))
+    achievement_rate: float = 0.01
+    seed: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _sample_blocks(rng: np.random.Generator, blocks: Dict[str, float], size) -> np.ndarray:
+    ids = np.array([int(BlockType[name]) for name in blocks])
+    weights = np.array(list(blocks.values()), dtype=np.float64)
+    return rng.choice(ids, size=size, p=weights / weights.sum())
+
+
+def _change_steps(rng: np.random.Generator, n_states: int, density: float) -> np.ndarray:
+    # step 0 is always recorded, like in the recorder's output
+    steps = np.flatnonzero(rng.random(n_states) < density)
+    return np.union1d([0], steps)
+
+
+def _random_walk(rng: np.random.Generator, steps: np.ndarray, low: int, high: int, start: int) -> np.ndarray:
+    values = start + np.cumsum(rng.integers(-1, 2, len(steps)))
+    return np.clip(values, low, high)
+
+
+def generate_episode(config: EpisodeConfig) -> Dict[str, Any]:
+    """
+    Generate an episode in the compressed changes format.
+
+    Args:
+    - config (EpisodeConfig): The episode shape.
+
+    Returns:
+    - Dict[str, Any]: JSON-serializable data accepted by `GameData.from_json`.
+    """
+    rng = np.random.default_rng(config.seed)
+    n, (rows, cols) = config.n_states, config.map_size
+
+    # the player moves by at most one cell per step and stays on the map
+    moves = np.array([(0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)])[rng.integers(0, 5, n)]
+    positions = np.empty((n, 2), dtype=np.int64)
+    position = np.array([rows // 2, cols // 2])
+    for step in range(n):
+        position = np.clip(position + moves[step], 0, (rows - 1, cols - 1))
+        positions[step] = position
+    moved = np.flatnonzero(np.any(np.diff(positions, axis=0, prepend=positions[:1] - 1), axis=1))
+
+    variables: Dict[str, Dict[str, Any]] = {
+        'player_position': {str(step): positions[step].tolist() for step in moved},
+        'timestep': {str(step): step for step in range(n)},
+    }
+    for name, (dtype, shape, default) in VARIABLE_COLUMNS.items():
+        if name in variables:
+            continue
+        steps = _change_steps(rng, n, config.change_density)
+        if shape:
+            values = [np.asarray(default).tolist()] * len(steps)
+        elif np.dtype(dtype).kind == 'f':
+            values = np.round(rng.random(len(steps)) * 9, 2).tolist()
+        elif np.dtype(dtype).kind == 'b':
+            values = (rng.random(len(steps)) < 0.1).tolist()
+        else:
+            values = _random_walk(rng, steps, 0, 9, 5).tolist()
+        variables[name] = {str(step): value for step, value in zip(steps.tolist(), values)}
+
+    inventory_steps = _change_steps(rng, n, config.change_density)
+    counts = {
+        name: _random_walk(rng, inventory_steps, 0, 9, 0)
+        for name, (dtype, shape, default) in INVENTORY_COLUMNS.items() if not shape
+    }
+    inventory = {
+        str(step): dict({name: int(values[i]) for name, values in counts.items()},
+                        armour=[0, 0, 0, 0], potions=[0, 0, 0, 0, 0, 0])
+        for i, step in enumerate(inventory_steps.tolist())
+    }
+
+    unlock_steps = np.flatnonzero(rng.random(n) < config.achievement_rate)
+    order = rng.permutation(len(achievements_list))
+    achievements, unlocked = {'0': []}, []
+    for count, step in enumerate(unlock_steps[:len(achievements_list)].tolist(), start=1):
+        unlocked = [achievements_list[i] for i in order[:count]]
+        achievements[str(step)] = unlocked
+
+    keys = list(action_map)
+    actions = {str(step): keys[code] for step, code in enumerate(rng.integers(0, len(keys), n).tolist())}
+
+    n_edits = rng.poisson(config.edit_rate * n)
+    edit_steps = np.sort(rng.integers(1, max(n, 2), n_edits))
+    edit_cells = np.stack([rng.integers(0, rows, n_edits), rng.integers(0, cols, n_edits),
+                           _sample_blocks(rng, config.edit_blocks, n_edits)], axis=1)
+    game_map = {'0': _sample_blocks(rng, config.blocks, (rows, cols)).tolist()}
+    for step in np.unique(edit_steps).tolist():
+        game_map[str(step)] = edit_cells[edit_steps == step].tolist()
+
+    return {
+        'variables': variables,
+        'inventory': inventory,
+        'achievements': achievements,
+        'actions': actions,
+        'map': game_map,
+    }
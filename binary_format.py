@@ -0,0 +1,109 @@
+import json
+import mmap
+import struct
+from typing import List, Dict, Tuple, Any, Optional
+import numpy as np
+from columnar import ColumnarGameData, as_columnar
+from instrumentation import timed
+
+# File layout:
+#   magic (8 bytes) | version (uint32) | header length (uint32) | header (UTF-8 JSON) | column blocks
+# The header lists every column with its dtype, shape and byte offset relative to the first
+# block. Blocks are aligned so that they can be viewed in place from a memory map.
+MAGIC = b'CRAFTAX\x00'
+VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sII')
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_binary(game_data, file_path: str) -> None:
+    """
+    Write game data to the compact binary episode format.
+
+    Achievements are stored as the uint64 bitsets of `AchievementBits`, actions as uint8
+    `Action` codes and every other column in its native dtype. The map tensor is written when the game data has one.
+
+    Args:
+    - game_data (GameData or ColumnarGameData): The game data object.
+    - file_path (str): Destination path.
+    """
+    columns, metadata = as_columnar(game_data).to_columns()
+
+    entries, offset = [], 0
+    for name, column in columns.items():
+        column = np.ascontiguousarray(column)
+        columns[name] = column
+        entries.append({
+            'name': name,
+            'dtype': column.dtype.str,
+            'shape': list(column.shape),
+            'offset': offset,
+        })
+        offset = _align(offset + column.nbytes)
+    header = json.dumps({'metadata': metadata, 'columns': entries}).encode('utf-8')
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    with open(file_path, 'wb') as file:
+        file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        file.write(header)
+        for entry in entries:
+            file.seek(data_start + entry['offset'])
+            file.write(columns[entry['name']].tobytes())
+
+
+def read_binary_header(file_path: str) -> Dict[str, Any]:
+    """
+    Read only the header of a binary episode file.
+
+    Args:
+    - file_path (str): Path to the binary episode file.
+
+    Returns:
+    - Dict[str, Any]: The header with `metadata` and the `columns` table.
+    """
+    with open(file_path, 'rb') as file:
+        magic, version, header_length = _PREAMBLE.unpack(file.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"'{file_path}' is not a binary episode file.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary episode version {version}.")
+        return json.loads(file.read(header_length).decode('utf-8'))
+
+
+@timed('load/binary')
+def load_binary(file_path: str) -> ColumnarGameData:
+    """
+    Open a binary episode file as memory-mapped columns.
+
+    Column arrays, the achievement bitsets included, are read-only views into the map, so
+    opening a file only reads its header; the operating system pages in a column the first
+    time a checker touches it.
+
+    Args:
+    - file_path (str): Path to the binary episode file.
+
+    Returns:
+    - ColumnarGameData: The columnar game data backed by the memory map.
+    """
+    header = read_binary_header(file_path)
+    with open(file_path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    header_length = _PREAMBLE.unpack(mapped[:_PREAMBLE.size])[2]
+    data_start = _align(_PREAMBLE.size + header_length)
+
+    columns = {}
+    for entry in header['columns']:
+        dtype = np.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        count = int(np.prod(shape))
+        if count == 0:
+            columns[entry['name']] = np.empty(shape, dtype=dtype)
+            continue
+        columns[entry['name']] = np.frombuffer(
+            mapped, dtype=dtype, count=count, offset=data_start + entry['offset']
+        ).reshape(shape)
+    return ColumnarGameData.from_columns(columns, header['metadata'])
@@ -0,0 +1,126 @@
+from enum import IntEnum
+from typing import List, Dict, Union, Iterable
+import numpy as np
+
+
+class BlockType(IntEnum):
+    """Block ids of the Craftax world map, as stored in the map arrays."""
+    INVALID = 0
+    OUT_OF_BOUNDS = 1
+    GRASS = 2
+    WATER = 3
+    STONE = 4
+    TREE = 5
+    WOOD = 6
+    PATH = 7
+    COAL = 8
+    IRON = 9
+    DIAMOND = 10
+    CRAFTING_TABLE = 11
+    FURNACE = 12
+    SAND = 13
+    LAVA = 14
+    PLANT = 15
+    RIPE_PLANT = 16
+    WALL = 17
+    DARKNESS = 18
+    WALL_MOSS = 19
+    STALAGMITE = 20
+    SAPPHIRE = 21
+    RUBY = 22
+    CHEST = 23
+    FOUNTAIN = 24
+    FIRE_GRASS = 25
+    ICE_GRASS = 26
+    GRAVEL = 27
+    FIRE_TREE = 28
+    ICE_SHRUB = 29
+    ENCHANTMENT_TABLE_FIRE = 30
+    ENCHANTMENT_TABLE_ICE = 31
+    NECROMANCER = 32
+    GRAVE = 33
+    GRAVE2 = 34
+    GRAVE3 = 35
+    NECROMANCER_VULNERABLE = 36
+
+
+Block = Union[str, int, BlockType]
+
+# Size of a lookup table indexed by uint8 block ids
+LOOKUP_SIZE = 256
+
+PLACEABLE_BLOCKS = frozenset({
+    "CRAFTING_TABLE", "FURNACE", "CHEST", "FOUNTAIN", "ENCHANTMENT_TABLE_FIRE", "ENCHANTMENT_TABLE_ICE", "STONE"
+})
+
+
+def block_id(block: Block) -> int:
+    """
+    Resolve a block name or id to its id.
+
+    Args:
+    - block (str or int): A BlockType name such as "WATER", or an id.
+
+    Returns:
+    - int: The block id.
+    """
+    if isinstance(block, str):
+        if block not in BlockType.__members__:
+            raise ValueError(f"Unknown block '{block}'.")
+        return int(BlockType[block])
+    if not 0 <= int(block) < LOOKUP_SIZE:
+        raise ValueError(f"Block id {block} is out of range.")
+    return int(block)
+
+
+def block_lookup(blocks: Union[Block, Iterable[Block]]) -> np.ndarray:
+    """
+    Boolean table over every block id, True for the given blocks.
+
+    Args:
+    - blocks (str, int or Iterable): One block or several blocks.
+
+    Returns:
+    - np.ndarray: Array of LOOKUP_SIZE booleans; index it with a uint8 map to get a mask.
+    """
+    if isinstance(blocks, (str, int, np.integer)):
+        blocks = [blocks]
+    table = np.zeros(LOOKUP_SIZE, dtype=np.bool_)
+    table[[block_id(block) for block in blocks]] = True
+    return table
+
+
+def block_ids(map_data: np.ndarray) -> np.ndarray:
+    """
+    Convert a map to a uint8 array of block ids.
+
+    Maps of names are converted through their distinct values; integer maps are only cast.
+
+    Args:
+    - map_data (np.ndarray): Map of block names or ids.
+
+    Returns:
+    - np.ndarray: The map as uint8 ids.
+    """
+    map_data = np.asarray(map_data)
+    if map_data.dtype == np.uint8:
+        return map_data
+    if map_data.dtype.kind in 'iu':
+        return map_data.astype(np.uint8)
+    names, inverse = np.unique(map_data, return_inverse=True)
+    ids = np.array([block_id(name) for name in names], dtype=np.uint8)
+    return ids[inverse].reshape(map_data.shape)
+
+
+def block_mask(map_data: np.ndarray, blocks: Union[Block, Iterable[Block]]) -> np.ndarray:
+    """
+    Boolean mask of the map cells holding one of `blocks`.
+
+    Args:
+    - map_data (np.ndarray): Map of block ids (or names).
+    - blocks (str, int or Iterable): One block or several blocks.
+
+    Returns:
+    - np.ndarray: Boolean array with the shape of the map.
+    """
+    return block_lookup(blocks)[block_ids(map_data)]
@@ -0,0 +1,222 @@
+from typing import List, Dict, Tuple, Any, Optional, Callable
+import numpy as np
+
+
+class ColumnIndex:
+    """
+    Sorted change points of one column: the trajectory is a sequence of constant segments.
+
+    Attributes:
+    - steps (np.ndarray): Sorted first step of every segment; always starts with 0.
+    - values (np.ndarray): Value of the column over each segment.
+    - n_states (int): Length of the indexed column.
+    """
+
+    def __init__(self, column: np.ndarray):
+        self.n_states = len(column)
+        if self.n_states == 0:
+            self.steps = np.zeros(0, dtype=np.int64)
+        else:
+            changed = column[1:] != column[:-1]
+            if changed.ndim > 1:
+                changed = changed.reshape(len(changed), -1).any(axis=1)
+            self.steps = np.concatenate(([0], np.flatnonzero(changed) + 1)).astype(np.int64)
+        self.values = column[self.steps]
+        self._next_true: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def extended(self, column: np.ndarray, start: int) -> 'ColumnIndex':
+        """
+        Index of a new version of the column, equal to the indexed one before `start`.
+
+        Only the states from `start` on are scanned; the cached predicate tables are dropped.
+
+        Args:
+        - column (np.ndarray): The new column.
+        - start (int): First state that may differ from the indexed column.
+
+        Returns:
+        - ColumnIndex: The index of `column`.
+        """
+        start = max(0, min(start, self.n_states))
+        first = max(start, 1)
+        changed = column[first:] != column[first - 1:len(column) - 1]
+        if changed.ndim > 1:
+            changed = changed.reshape(len(changed), -1).any(axis=1)
+        added = np.flatnonzero(changed) + first
+        if start == 0 and len(column):
+            added = np.concatenate(([0], added))
+        index = ColumnIndex.__new__(ColumnIndex)
+        index.n_states = len(column)
+        index.steps = np.concatenate((self.steps[self.steps < start], added)).astype(np.int64)
+        index.values = column[index.steps]
+        index._next_true = {}
+        return index
+
+    def segment(self, step: int) -> int:
+        """Return the position in `steps` of the segment containing `step`."""
+        return int(np.searchsorted(self.steps, step, side='right')) - 1
+
+    def value_at(self, step: int) -> Any:
+        return self.values[self.segment(step)]
+
+    def first(self, predicate: Callable[[np.ndarray], np.ndarray], start: int = 0, end: Optional[int] = None, key: Optional[str] = None) -> int:
+        """
+        Find the first step in [start, end] at which `predicate` holds.
+
+        The predicate is evaluated on the segment values only. When `key` is given the
+        per-segment "next match" table is cached under it and later queries cost a
+        single bisect.
+
+        Args:
+        - predicate (Callable[[np.ndarray], np.ndarray]): Vectorized test over segment values.
+        - start (int): The first step to consider.
+        - end (int, optional): The last step to consider (inclusive). Defaults to the last state.
+        - key (str, optional): Name under which the predicate table is cached.
+
+        Returns:
+        - int: The first matching step, or -1 if there is none.
+        """
+        if key is not None and key in self._next_true:
+            table = self._next_true[key]
+        else:
+            table = next_true(self._reduce(predicate(self.values)))
+            if key is not None:
+                self._next_true[key] = table
+        return self._first_from_table(table, start, end)
+
+    def first_positive(self, start: int = 0, end: Optional[int] = None) -> int:
+        """First step in [start, end] where the value (any element of it) is above zero."""
+        return self.first(lambda values: values > 0, start, end, key='positive')
+
+    def first_true(self, start: int = 0, end: Optional[int] = None) -> int:
+        """First step in [start, end] where a boolean column is set."""
+        return self.first(lambda values: values, start, end, key='true')
+
+    def where(self, predicate: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        List every step at which `predicate` holds.
+
+        Args:
+        - predicate (Callable[[np.ndarray], np.ndarray]): Vectorized test over segment values.
+
+        Returns:
+        - np.ndarray: Sorted matching steps.
+        """
+        mask = self._reduce(predicate(self.values))
+        lengths = np.diff(np.append(self.steps, self.n_states))
+        return np.flatnonzero(np.repeat(mask, lengths))
+
+    def _reduce(self, mask: np.ndarray) -> np.ndarray:
+        mask = np.asarray(mask, dtype=np.bool_)
+        if mask.ndim > 1:
+            mask = mask.reshape(len(mask), -1).any(axis=1)
+        return mask
+
+    def _first_from_table(self, table: np.ndarray, start: int, end: Optional[int]) -> int:
+        if end is None:
+            end = self.n_states - 1
+        start = max(start, 0)
+        if start > end or start >= self.n_states:
+            return -1
+        match = table[self.segment(start)]
+        if match == len(self.steps):
+            return -1
+        step = max(int(self.steps[match]), start)
+        return step if step <= end else -1
+
+
+def next_true(mask: np.ndarray) -> np.ndarray:
+    # position of the first True at or after each entry; len(mask) when there is none
+    positions = np.where(mask, np.arange(len(mask)), len(mask))
+    return np.minimum.accumulate(positions[::-1])[::-1]
+
+
+class ChangeIndex:
+    """
+    Per-variable, per-item and per-achievement change-point index over a `ColumnarGameData`.
+
+    Column indexes are built lazily the first time they are queried.
+    """
+
+    def __init__(self, game_data):
+        self._game_data = game_data
+        self._columns: Dict[Tuple[str, str], ColumnIndex] = {}
+        self._achievement_ids = {name: i for i, name in enumerate(game_data.achievement_names)}
+
+    def extended(self, game_data, start: int) -> 'ChangeIndex':
+        """
+        Index of a longer version of the game data, equal to the indexed one before `start`.
+
+        The column indexes built so far are extended by scanning the states from `start` on.
+
+        Args:
+        - game_data (ColumnarGameData): The new game data.
+        - start (int): First state that may differ.
+
+        Returns:
+        - ChangeIndex: The index of `game_data`.
+        """
+        index = ChangeIndex(game_data)
+        for (group, name), column_index in self._columns.items():
+            index._columns[group, name] = column_index.extended(index._values(group, name), start)
+        return index
+
+    def variable(self, name: str) -> ColumnIndex:
+        """Index of a `PlayerVariables` field. Raises KeyError for unknown variables."""
+        return self._column('variables', name)
+
+    def item(self, name: str) -> ColumnIndex:
+        """Index of a `PlayerInventory` item. Raises KeyError for unknown items."""
+        return self._column('inventory', name)
+
+    def achievement(self, name: str) -> Optional[ColumnIndex]:
+        """Index of one achievement flag, or None if the achievement never appears."""
+        if name not in self._achievement_ids:
+            return None
+        return self._column('achievements', name)
+
+    def first_item_above(self, name: str, threshold: int = 0, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        Find the first step in [start, end] where the count of an item is above `threshold`.
+
+        Args:
+        - name (str): The inventory item.
+        - threshold (int): The count that must be exceeded.
+        - start (int): The first step to consider.
+        - end (int, optional): The last step to consider (inclusive).
+
+        Returns:
+        - int: The first matching step, or -1 if there is none.
+        """
+        return self.item(name).first(lambda values: values > threshold, start, end, key=f'above:{threshold}')
+
+    def first_achievement(self, name: str, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        Find the first step in [start, end] where the achievement set contains `name`.
+
+        Args:
+        - name (str): The achievement name.
+        - start (int): The first step to consider.
+        - end (int, optional): The last step to consider (inclusive).
+
+        Returns:
+        - int: The first matching step, or -1 if there is none.
+        """
+        index = self.achievement(name)
+        return -1 if index is None else index.first_true(start, end)
+
+    def _values(self, group: str, name: str) -> np.ndarray:
+        if group == 'variables':
+            return self._game_data.variables[name]
+        if group == 'inventory':
+            return self._game_data.inventory[name]
+        return self._game_data.achievements[:, self._achievement_ids[name]]
+
+    def _column(self, group: str, name: str) -> ColumnIndex:
+        key = (group, name)
+        if key not in self._columns:
+            self._columns[key] = ColumnIndex(self._values(group, name))
+        return self._columns[key]
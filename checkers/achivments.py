@@ -1,7 +1,20 @@
 from typing import List, Tuple
 from deserialization import GameData, achievements_list
+from checkers.progression import progression
 from math import sqrt
+from memo import memoized
+from instrumentation import instrumented
 
+def _milestone_reached(game_data: GameData, milestone: str, verbose: bool, start_index: int, end_index: int):
+    # The whole tech tree is resolved once per episode and state range, so the chained
+    # checkers below are lookups instead of nested rescans of the trajectory.
+    index = progression(game_data).first_step(milestone, start_index, end_index)
+    if index == -1:
+        return -1 if verbose else False
+    return index if verbose else True
+
+@instrumented
+@memoized
 def is_table_placed(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
     """
     Check if the table was placed in the game within specified state range.
@@ -16,15 +29,10 @@ def is_table_placed(game_data: GameData, verbose: bool = False, start_index: int
     - bool or int: True if the table was placed, otherwise False.
                    If verbose is True, return the state index instead of True.
     """
-    if end_index is None:
-        end_index = len(game_data.states)
-
-    for index in range(start_index, end_index):
-        state = game_data.states[index]
-        if 'place_table' in state.actions and state.inventory.get('wood', 0) >= 2:
-            return index if verbose else True
-    return -1 if verbose else False
+    return _milestone_reached(game_data, "table", verbose, start_index, end_index)
 
+@instrumented
+@memoized
 def is_wood_pickaxe_made(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
     """
     Check if the wood pickaxe was made in the game within specified state range.
@@ -39,21 +47,10 @@ def is_wood_pickaxe_made(game_data: GameData, verbose: bool = False, start_index
     - bool or int: True if the wood pickaxe was made, otherwise False.
                    If verbose is True, return the state index instead of True.
     """
-    table_index = is_table_placed(game_data, verbose=True, start_index=start_index, end_index=end_index)
-    
-    if table_index == -1:
-        return -1 if verbose else False
-    
-    if end_index is None:
-        end_index = len(game_data.states)
-    
-    for index in range(table_index, end_index):
-        state = game_data.states[index]
-        if 'make_wood_pickaxe' in state.actions:
-            return index if verbose else True
-
-    return -1 if verbose else False
+    return _milestone_reached(game_data, "wood_pickaxe", verbose, start_index, end_index)
 
+@instrumented
+@memoized
 def is_stone_collected(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
     """
     Check if the stone was collected in the game within specified state range.
@@ -68,21 +65,184 @@ def is_stone_collected(game_data: GameData, verbose: bool = False, start_index:
     - bool or int: True if the stone was collected, otherwise False.
                    If verbose is True, return the state index instead of True.
     """
-    wood_pickaxe_index = is_wood_pickaxe_made(game_data, verbose=True, start_index=start_index, end_index=end_index)
-    
-    if wood_pickaxe_index == -1:
-        return -1 if verbose else False
+    return _milestone_reached(game_data, "stone", verbose, start_index, end_index)
+
+@instrumented
+@memoized
+def is_wood_sword_made(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the wood sword was made in the game within specified state range.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
+
+    Returns:
+    - bool or int: True if the wood sword was made, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "wood_sword", verbose, start_index, end_index)
+
+@instrumented
+@memoized
+def is_stone_pickaxe_made(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the stone pickaxe was made in the game within specified state range.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
+
+    Returns:
+    - bool or int: True if the stone pickaxe was made, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "stone_pickaxe", verbose, start_index, end_index)
+
+@instrumented
+@memoized
+def is_stone_sword_made(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the stone sword was made in the game within specified state range.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
 
-    if end_index is None:
-        end_index = len(game_data.states)
+    Returns:
+    - bool or int: True if the stone sword was made, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "stone_sword", verbose, start_index, end_index)
 
-    previous_stone_count = 0
-    
-    for index in range(wood_pickaxe_index, end_index):
-        state = game_data.states[index]
-        current_stone_count = state.inventory.get('stone', 0)
-        if 'collect_stone' in state.actions and current_stone_count > previous_stone_count:
-            return index if verbose else True
-        previous_stone_count = current_stone_count
+@instrumented
+@memoized
+def is_furnace_placed(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the furnace was placed in the game within specified state range.
 
-    return -1 if verbose else False
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
+
+    Returns:
+    - bool or int: True if the furnace was placed, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "furnace", verbose, start_index, end_index)
+
+@instrumented
+@memoized
+def is_coal_collected(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the coal was collected in the game within specified state range.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
+
+    Returns:
+    - bool or int: True if the coal was collected, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "coal", verbose, start_index, end_index)
+
+@instrumented
+@memoized
+def is_iron_collected(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the iron was collected in the game within specified state range.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
+
+    Returns:
+    - bool or int: True if the iron was collected, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "iron", verbose, start_index, end_index)
+
+@instrumented
+@memoized
+def is_iron_pickaxe_made(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the iron pickaxe was made in the game within specified state range.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
+
+    Returns:
+    - bool or int: True if the iron pickaxe was made, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "iron_pickaxe", verbose, start_index, end_index)
+
+@instrumented
+@memoized
+def is_iron_sword_made(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the iron sword was made in the game within specified state range.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
+
+    Returns:
+    - bool or int: True if the iron sword was made, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "iron_sword", verbose, start_index, end_index)
+
+@instrumented
+@memoized
+def is_diamond_pickaxe_made(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the diamond pickaxe was made in the game within specified state range.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
+
+    Returns:
+    - bool or int: True if the diamond pickaxe was made, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "diamond_pickaxe", verbose, start_index, end_index)
+
+@instrumented
+@memoized
+def is_diamond_sword_made(game_data: GameData, verbose: bool = False, start_index: int = 0, end_index: int = None):
+    """
+    Check if the diamond sword was made in the game within specified state range.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - verbose (bool): If True, return the state index where the condition was met.
+    - start_index (int): The index of the state to start the check from.
+    - end_index (int): The index of the state to end the check at.
+
+    Returns:
+    - bool or int: True if the diamond sword was made, otherwise False.
+                   If verbose is True, return the state index instead of True.
+    """
+    return _milestone_reached(game_data, "diamond_sword", verbose, start_index, end_index)
@@ -1,10 +1,29 @@
-from typing import List, Tuple
-from deserialization import GameData, achievements_list
+from typing import List, Tuple, Union
+from deserialization import GameData, achievements_list, known_achievements
+from columnar import as_columnar
+from checkers.movement import moved_in_direction
+from spatial import position_index
+from actions import PLACEMENTS
 from math import sqrt
+from memo import memoized
+from instrumentation import instrumented
 
 def validate_achievements(player_achievements: List[str]) -> bool:
-    return all(achievement in achievements_list for achievement in player_achievements)
+    return known_achievements.issuperset(player_achievements)
 
+@instrumented
+@memoized
+def validate_game_achievements(game_data: GameData) -> bool:
+    """
+    Check that every state of the game data only holds known achievements.
+
+    Returns:
+    - bool: True if all achievements are valid, otherwise False.
+    """
+    return as_columnar(game_data).achievement_bits.all_valid()
+
+@instrumented
+@memoized
 def is_variable_increasing(game_data: GameData, variable_name: str, start_index: int, end_index: int) -> bool:
     try:
         start_value = getattr(game_data.states[start_index].variables, variable_name)
@@ -15,6 +34,8 @@ def is_variable_increasing(game_data: GameData, variable_name: str, start_index:
     except IndexError:
         raise ValueError("Index out of range. Ensure the indices are within the correct range of states.")
 
+@instrumented
+@memoized
 def is_variable_decreasing(game_data: GameData, variable_name: str, start_index: int, end_index: int) -> bool:
     try:
         start_value = getattr(game_data.states[start_index].variables, variable_name)
@@ -25,6 +46,8 @@ def is_variable_decreasing(game_data: GameData, variable_name: str, start_index:
     except IndexError:
         raise ValueError("Index out of range. Ensure the indices are within the correct range of states.")
 
+@instrumented
+@memoized
 def has_item_in_inventory(game_data: GameData, state_index: int, item_name: str) -> bool:
     try:
         inventory = game_data.states[state_index].inventory
@@ -34,31 +57,51 @@ def has_item_in_inventory(game_data: GameData, state_index: int, item_name: str)
     except AttributeError:
         raise ValueError(f"Item '{item_name}' does not exist in PlayerInventory.")
 
+@instrumented
+@memoized
 def find_item_in_inventory(game_data: GameData, item_name: str) -> List[int]:
-    states_with_item = []
-    for i, state in enumerate(game_data.states):
-        inventory = state.inventory
-        if getattr(inventory, item_name, 0) > 0:
-            states_with_item.append(i)
-    return states_with_item
+    columns = as_columnar(game_data)
+    if item_name not in columns.inventory:
+        return []
+    return columns.change_index.item(item_name).where(lambda values: values > 0).tolist()
 
+@instrumented
+@memoized
 def is_achievement_obtained(game_data: GameData, achievement_name: str, start_index: int, end_index: int = None) -> bool:
     end_index = end_index if end_index is not None else start_index
-    try:
-        for i in range(start_index, end_index + 1):
-            if achievement_name in game_data.states[i].achievements.achievements:
-                return True
-        return False
-    except IndexError:
+    columns = as_columnar(game_data)
+    if not (0 <= start_index < columns.n_states and end_index < columns.n_states):
         raise ValueError("Index out of range. Ensure the indices are within the correct range of states.")
+    if end_index == start_index:
+        return columns.achievement_bits.has(achievement_name, start_index)
+    return columns.change_index.first_achievement(achievement_name, start_index, end_index) != -1
+
+@instrumented
+@memoized
+def first_achievement_step(game_data: GameData, achievement_name: str) -> int:
+    """
+    Find the first state at which an achievement is obtained.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - achievement_name (str): The name of the achievement.
 
+    Returns:
+    - int: Index of the first state holding the achievement, or -1 if it is never obtained.
+    """
+    return as_columnar(game_data).achievement_bits.first_step(achievement_name)
+
+@instrumented
+@memoized
 def find_achievement_state(game_data: GameData, achievement_name: str) -> List[int]:
     states_with_achievement = [-1]
-    for i, state in enumerate(game_data.states):
-        if achievement_name in state.achievements.achievements:
-            states_with_achievement.append(i)
+    index = as_columnar(game_data).change_index.achievement(achievement_name)
+    if index is not None:
+        states_with_achievement.extend(index.where(lambda values: values).tolist())
     return states_with_achievement
 
+@instrumented
+@memoized
 def did_player_go_north(game_data, start_index, end_index):
     """
     Check if the player has moved north between two game states.
@@ -71,18 +114,10 @@ def did_player_go_north(game_data, start_index, end_index):
     Returns:
     - bool: True if the player moved north, otherwise False.
     """
-    if not (0 <= start_index < len(game_data.states) and 0 <= end_index < len(game_data.states)):
-        raise IndexError("start_index or end_index is out of the valid range of game states.")
-    
-    start_state = game_data.states[start_index]
-    end_state = game_data.states[end_index]
-    
-    # Assuming we have a 'position' attribute with 'x' and 'y' coordinates in PlayerState
-    start_position = start_state.variables.player_position
-    end_position = end_state.variables.player_position
-    
-    return end_position[1] > start_position[1]
+    return moved_in_direction(game_data, "north", start_index, end_index)
 
+@instrumented
+@memoized
 def did_player_go_south(game_data, start_index, end_index):
     """
     Check if the player has moved south between two game states.
@@ -95,19 +130,10 @@ def did_player_go_south(game_data, start_index, end_index):
     Returns:
     - bool: True if the player moved south, otherwise False.
     """
-    if not (0 <= start_index < len(game_data.states) and 0 <= end_index < len(game_data.states)):
-        raise IndexError("start_index or end_index is out of the valid range of game states.")
-    
-    start_state = game_data.states[start_index]
-    end_state = game_data.states[end_index]
-    
-    # Assuming we have a 'position' attribute with 'x' and 'y' coordinates in PlayerState
-    start_position = start_state.variables.player_position
-    end_position = end_state.variables.player_position
-    
-    return end_position[1] < start_position[1]
-
+    return moved_in_direction(game_data, "south", start_index, end_index)
 
+@instrumented
+@memoized
 def did_player_go_west(game_data, start_index, end_index):
     """
     Check if the player has moved west between two game states.
@@ -120,18 +146,10 @@ def did_player_go_west(game_data, start_index, end_index):
     Returns:
     - bool: True if the player moved west, otherwise False.
     """
-    if not (0 <= start_index < len(game_data.states) and 0 <= end_index < len(game_data.states)):
-        raise IndexError("start_index or end_index is out of the valid range of game states.")
-    
-    start_state = game_data.states[start_index]
-    end_state = game_data.states[end_index]
-    
-    # Assuming we have a 'position' attribute with 'x' and 'y' coordinates in PlayerState
-    start_position = start_state.variables.player_position
-    end_position = end_state.variables.player_position
-    
-    return end_position[0] < start_position[0]
+    return moved_in_direction(game_data, "west", start_index, end_index)
 
+@instrumented
+@memoized
 def did_player_go_east(game_data, start_index, end_index):
     """
     Check if the player has moved east between two game states.
@@ -144,17 +162,7 @@ def did_player_go_east(game_data, start_index, end_index):
     Returns:
     - bool: True if the player moved east, otherwise False.
     """
-    if not (0 <= start_index < len(game_data.states) and 0 <= end_index < len(game_data.states)):
-        raise IndexError("start_index or end_index is out of the valid range of game states.")
-    
-    start_state = game_data.states[start_index]
-    end_state = game_data.states[end_index]
-    
-    # Assuming we have a 'position' attribute with 'x' and 'y' coordinates in PlayerState
-    start_position = start_state.variables.player_position
-    end_position = end_state.variables.player_position
-    
-    return end_position[0] > start_position[0]
+    return moved_in_direction(game_data, "east", start_index, end_index)
 
 def check_achievement_inventory_radius(game_data: GameData, coordinate: Tuple[int, int], radius: int, achievement_name: str = None, item_name: str = None) -> bool:
     """
@@ -170,16 +178,40 @@ def check_achievement_inventory_radius(game_data: GameData, coordinate: Tuple[in
     Returns:
     - bool: True if the achievement is obtained or the item is in the inventory within the radius, otherwise False.
     """
-    for state in game_data.states:
-        position = state.variables.player_position
-        distance = sqrt((position[0] - coordinate[0]) ** 2 + (position[1] - coordinate[1]) ** 2)
-        if distance <= radius:
-            if achievement_name and achievement_name in state.achievements.achievements:
-                return True
-            if item_name and getattr(state.inventory, item_name, 0) > 0:
-                return True
+    return check_achievement_inventory_near_any(game_data, [coordinate], radius, achievement_name, item_name)
+
+@instrumented
+@memoized
+def check_achievement_inventory_near_any(game_data: GameData, coordinates: List[Tuple[int, int]], radius: int, achievement_name: str = None, item_name: str = None) -> bool:
+    """
+    Check if an achievement is obtained or an item is in the inventory within a certain radius of any of several coordinates.
+
+    The states near all coordinates are found with one batch query on the trajectory's position index.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - coordinates (List[Tuple[int, int]]): The (x, y) coordinates to check around.
+    - radius (int): The radius within which to check.
+    - achievement_name (str, optional): The name of the achievement to check for.
+    - item_name (str, optional): The name of the item to check in the inventory.
+
+    Returns:
+    - bool: True if the achievement is obtained or the item is in the inventory within the radius of a coordinate, otherwise False.
+    """
+    columns = as_columnar(game_data)
+    nearby = position_index(columns).any_within(coordinates, radius)
+    if len(nearby) == 0:
+        return False
+    if achievement_name and achievement_name in columns.achievement_names:
+        if columns.achievements[nearby, columns.achievement_names.index(achievement_name)].any():
+            return True
+    if item_name and item_name in columns.inventory:
+        if (columns.inventory[item_name][nearby] > 0).any():
+            return True
     return False
 
+@instrumented
+@memoized
 def did_item_count_decrease(game_data: GameData, item_name: str, start_index: int, end_index: int) -> bool:
     """
     Check if the count of a specific item in the inventory has decreased between two game states.
@@ -205,33 +237,41 @@ def did_item_count_decrease(game_data: GameData, item_name: str, start_index: in
         raise ValueError("Index out of range. Ensure the indices are within the correct range of states.")
 
 
-def was_item_placed(game_data: GameData, item_name: str, start_index: int, end_index: int, verbose: bool = False) -> bool:
+@instrumented
+@memoized
+def was_item_placed(game_data: GameData, item_name: str, start_index: int, end_index: int, verbose: bool = False) -> Union[bool, int]:
     """
-    Check if a specific item was placed by verifying if the item count decreased and an action was logged.
+    Check if a specific item was placed by verifying that its place action was logged and the inventory item it consumes decreased.
+
+    The spent item comes from `actions.PLACEMENTS`: wood for a table, stone for a stone or a
+    furnace; plants and torches are checked on the action alone. The count of `item_name`
+    itself is not used: tables and furnaces are not inventory items, so that test never
+    detected them.
 
     Args:
     - game_data (GameData): The game data object.
-    - item_name (str): The name of the item to check.
+    - item_name (str): The name of the item to check. Possible values: "stone", "table", "furnace", "plant", "torch".
     - start_index (int): The index of the starting game state.
     - end_index (int): The index of the ending game state.
     - verbose (bool): Return index where item was placed
 
     Returns:
-    - bool: True if the item was placed, otherwise False.
-    """
-    place_actions = {
-        "stone": "place_stone",
-        "table": "place_table",
-        "furnace": "place_furnace",
-        "plant": "place_plant",
-        "torch": "place_torch"
-    }
-
-    for index in range(start_index, end_index):
-        if did_item_count_decrease(game_data, item_name, index, index + 1):
-            action = game_data.states[index + 1].action
-            if place_actions.get(item_name) == action:
-                if verbose:
-                    return index
-                return True
-    return False
+    - bool or int: True if the item was placed, otherwise False. If verbose is True, the index of
+      the state the item was placed from instead of True; it can be 0, so test for `is False`.
+    """
+    if item_name not in PLACEMENTS:
+        return False
+    columns = as_columnar(game_data)
+    action, spent_item = PLACEMENTS[item_name]
+
+    # Placing at `index` shows up at state index + 1, which must stay inside the trajectory
+    steps = columns.action_index.steps(action)
+    steps = steps[(steps > start_index) & (steps <= min(end_index, columns.n_states - 1))]
+    if spent_item is not None and len(steps):
+        counts = columns.inventory[spent_item]
+        steps = steps[counts[steps] < counts[steps - 1]]
+    if len(steps) == 0:
+        return False
+    if verbose:
+        return int(steps[0]) - 1
+    return True
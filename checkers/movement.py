@@ -0,0 +1,106 @@
+from typing import List, Dict, Tuple, Optional
+import numpy as np
+from deserialization import GameData
+from columnar import as_columnar
+
+# direction -> (axis of player_position, sign of the displacement along it)
+DIRECTIONS: Dict[str, Tuple[int, int]] = {
+    "north": (1, 1),
+    "south": (1, -1),
+    "east": (0, 1),
+    "west": (0, -1),
+}
+
+
+def _check_range(n_states: int, start_index: int, end_index: int) -> None:
+    if not (0 <= start_index < n_states and 0 <= end_index < n_states):
+        raise IndexError("start_index or end_index is out of the valid range of game states.")
+
+
+def _axis_sign(direction: str) -> Tuple[int, int]:
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Invalid direction: {direction}")
+    return DIRECTIONS[direction]
+
+
+def displacement(game_data: GameData, start_index: int = 0, end_index: Optional[int] = None) -> np.ndarray:
+    """
+    Compute the displacement of every state in a range relative to its first state.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - start_index (int): The index of the reference state.
+    - end_index (int, optional): The index of the last state (inclusive). Defaults to the last state.
+
+    Returns:
+    - np.ndarray: Array of shape (end_index - start_index + 1, 2) with player_position[i] - player_position[start_index].
+    """
+    positions = as_columnar(game_data).variables['player_position']
+    end_index = len(positions) - 1 if end_index is None else end_index
+    _check_range(len(positions), start_index, end_index)
+    return positions[start_index:end_index + 1] - positions[start_index]
+
+
+def direction_mask(game_data: GameData, direction: str, start_index: int = 0, end_index: Optional[int] = None) -> np.ndarray:
+    """
+    Mark the states of a range that lie in `direction` from its first state.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - direction (str): One of "north", "south", "east", "west".
+    - start_index (int): The index of the reference state.
+    - end_index (int, optional): The index of the last state (inclusive). Defaults to the last state.
+
+    Returns:
+    - np.ndarray: Boolean array, element k is True if state start_index + k is in `direction`.
+    """
+    axis, sign = _axis_sign(direction)
+    return sign * displacement(game_data, start_index, end_index)[:, axis] > 0
+
+
+def direction_masks(game_data: GameData, start_index: int = 0, end_index: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Compute `direction_mask` for all four directions from a single displacement array.
+
+    Returns:
+    - Dict[str, np.ndarray]: Direction name -> boolean array over the range.
+    """
+    offsets = displacement(game_data, start_index, end_index)
+    return {direction: sign * offsets[:, axis] > 0 for direction, (axis, sign) in DIRECTIONS.items()}
+
+
+def first_step_in_direction(game_data: GameData, direction: str, start_index: int = 0, end_index: Optional[int] = None) -> int:
+    """
+    Find the first state of a range that lies in `direction` from its first state.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - direction (str): One of "north", "south", "east", "west".
+    - start_index (int): The index of the reference state.
+    - end_index (int, optional): The index of the last state (inclusive). Defaults to the last state.
+
+    Returns:
+    - int: The index of the first such state, or -1 if the player never got there.
+    """
+    mask = direction_mask(game_data, direction, start_index, end_index)
+    hits = np.flatnonzero(mask)
+    return start_index + int(hits[0]) if len(hits) else -1
+
+
+def moved_in_direction(game_data: GameData, direction: str, start_index: int, end_index: int) -> bool:
+    """
+    Check if the player has moved in `direction` between two game states.
+
+    Args:
+    - game_data (GameData): The game data object.
+    - direction (str): One of "north", "south", "east", "west".
+    - start_index (int): The index of the starting game state.
+    - end_index (int): The index of the ending game state.
+
+    Returns:
+    - bool: True if the ending position lies in `direction` from the starting one, otherwise False.
+    """
+    axis, sign = _axis_sign(direction)
+    positions = as_columnar(game_data).variables['player_position']
+    _check_range(len(positions), start_index, end_index)
+    return bool(sign * (int(positions[end_index, axis]) - int(positions[start_index, axis])) > 0)
@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional
+from dataclasses import dataclass
+import numpy as np
+from deserialization import GameData
+from columnar import as_columnar
+from change_index import next_true
+from actions import action_code
+
+
+@dataclass(frozen=True)
+class Milestone:
+    """
+    One node of the tech tree.
+
+    Attributes:
+    - name (str): The milestone name.
+    - action (str, optional): Action that must be taken at the step (e.g. "place_table").
+    - item (str, optional): Inventory item whose count must increase at the step (collection).
+    - requires (Tuple[str, ...]): Milestones that must be reached at or before the step.
+    - min_items (Tuple[Tuple[str, int], ...]): Inventory counts required at the step.
+    """
+    name: str
+    action: Optional[str] = None
+    item: Optional[str] = None
+    requires: Tuple[str, ...] = ()
+    min_items: Tuple[Tuple[str, int], ...] = ()
+
+
+# Craftax tech tree, listed so that every milestone comes after its requirements.
+MILESTONES: List[Milestone] = [
+    Milestone("table", action="place_table", min_items=(("wood", 2),)),
+    Milestone("wood_pickaxe", action="make_wood_pickaxe", requires=("table",)),
+    Milestone("wood_sword", action="make_wood_sword", requires=("table",)),
+    Milestone("stone", item="stone", requires=("wood_pickaxe",)),
+    Milestone("coal", item="coal", requires=("wood_pickaxe",)),
+    Milestone("stone_pickaxe", action="make_stone_pickaxe", requires=("table", "stone")),
+    Milestone("stone_sword", action="make_stone_sword", requires=("table", "stone")),
+    Milestone("furnace", action="place_furnace", requires=("table", "stone")),
+    Milestone("iron", item="iron", requires=("stone_pickaxe",)),
+    Milestone("iron_pickaxe", action="make_iron_pickaxe", requires=("furnace", "iron", "coal")),
+    Milestone("iron_sword", action="make_iron_sword", requires=("furnace", "iron", "coal")),
+    Milestone("iron_armour", action="make_iron_armour", requires=("furnace", "iron", "coal")),
+    Milestone("diamond_pickaxe", action="make_diamond_pickaxe", requires=("iron_pickaxe",)),
+    Milestone("diamond_sword", action="make_diamond_sword", requires=("iron_pickaxe",)),
+    Milestone("diamond_armour", action="make_diamond_armour", requires=("iron_pickaxe",)),
+]
+
+
+class ProgressionTracker:
+    """
+    First step of every tech-tree milestone, computed from a single scan of the trajectory.
+
+    Candidate steps of each milestone (right action, enough items, item count going up) are
+    found once with vectorized masks. Resolving the tree for a state range then costs one
+    table lookup per milestone, whatever the length of the trajectory. The resolutions of the
+    last `cache_size` ranges are kept in a small LRU cache.
+    """
+
+    def __init__(self, game_data: GameData, milestones: List[Milestone] = MILESTONES, cache_size: int = 64):
+        columns = as_columnar(game_data)
+        self.milestones = {milestone.name: milestone for milestone in milestones}
+        self.n_states = columns.n_states
+        self.cache_size = cache_size
+        self._candidates: Dict[str, np.ndarray] = {}
+        for milestone in milestones:
+            mask = np.ones(self.n_states, dtype=np.bool_)
+            if milestone.action is not None:
+                mask &= columns.actions == action_code(milestone.action)
+            for item, count in milestone.min_items:
+                mask &= columns.inventory[item] >= count
+            if milestone.item is not None:
+                counts = columns.inventory[milestone.item]
+                mask &= counts > np.concatenate(([0], counts[:-1]))
+            # one extra slot so that a lookup past the last state finds nothing
+            self._candidates[milestone.name] = np.append(next_true(mask), self.n_states)
+        self._resolved: 'OrderedDict[Tuple[int, int], Dict[str, Tuple[int, Dict[str, int]]]]' = OrderedDict()
+
+    def resolve(self, start_index: int = 0, end_index: Optional[int] = None) -> Dict[str, Tuple[int, Dict[str, int]]]:
+        """
+        Resolve the tech tree within a state range.
+
+        Args:
+        - start_index (int): The index of the state to start from.
+        - end_index (int, optional): The index of the state to end at (exclusive). Defaults to the number of states.
+
+        Returns:
+        - Dict[str, Tuple[int, Dict[str, int]]]: Milestone -> (first step or -1, steps of its requirements).
+        """
+        end_index = self.n_states if end_index is None else min(end_index, self.n_states)
+        key = (start_index, end_index)
+        if key in self._resolved:
+            self._resolved.move_to_end(key)
+            return self._resolved[key]
+        resolved = {}
+        for name, milestone in self.milestones.items():
+            requirements = {required: resolved[required][0] for required in milestone.requires}
+            if any(step == -1 for step in requirements.values()):
+                resolved[name] = (-1, requirements)
+                continue
+            earliest = max([start_index] + list(requirements.values()))
+            step = int(self._candidates[name][min(max(earliest, 0), self.n_states)])
+            resolved[name] = (step if step < end_index else -1, requirements)
+        self._resolved[key] = resolved
+        if len(self._resolved) > self.cache_size:
+            self._resolved.popitem(last=False)
+        return resolved
+
+    def first_step(self, milestone: str, start_index: int = 0, end_index: Optional[int] = None) -> int:
+        """
+        Return the first step at which `milestone` is reached with all of its requirements, or -1.
+        """
+        if milestone not in self.milestones:
+            raise ValueError(f"Unknown milestone '{milestone}'.")
+        return self.resolve(start_index, end_index)[milestone][0]
+
+
+def progression(game_data: GameData) -> ProgressionTracker:
+    """Return the progression tracker of the game data, built once per episode."""
+    columns = as_columnar(game_data)
+    return columns.cached('progression', lambda: ProgressionTracker(columns))
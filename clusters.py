@@ -0,0 +1,101 @@
+from typing import List, Tuple, Optional
+import numpy as np
+from scipy.ndimage import label, find_objects
+from columnar import as_columnar
+from blocks import Block, block_id, block_mask
+
+
+class Clusters:
+    """
+    Connected components of one block type on one map, extracted in a single pass.
+
+    Cluster `i` (0-based) carries label `i + 1` in `labels`; 0 marks cells outside every cluster.
+
+    Attributes:
+    - labels (np.ndarray): Label of every map cell.
+    - count (int): Number of clusters.
+    - slices (List[Tuple[slice, slice]]): Bounding slices of every cluster.
+    - sizes (np.ndarray): Number of cells of every cluster.
+    - boxes (np.ndarray): (row_start, col_start, row_stop, col_stop) of every cluster, stops exclusive.
+    - centroids (np.ndarray): Mean (row, col) of every cluster.
+    """
+
+    def __init__(self, mask: np.ndarray):
+        self.labels, self.count = label(mask)
+        self.slices: List[Tuple[slice, slice]] = find_objects(self.labels)
+        self.boxes = np.array([[s[0].start, s[1].start, s[0].stop, s[1].stop] for s in self.slices], dtype=np.int64).reshape(-1, 4)
+
+        flat = self.labels.reshape(-1)
+        cells = np.flatnonzero(flat)
+        # stable sort keeps every cluster's cells in row-major order, like np.argwhere
+        order = np.argsort(flat[cells], kind='stable')
+        cell_labels = flat[cells[order]]
+        self._cells = np.stack(np.unravel_index(cells[order], self.labels.shape), axis=1)
+        self.sizes = np.bincount(cell_labels, minlength=self.count + 1)[1:]
+        self._offsets = np.concatenate(([0], np.cumsum(self.sizes)))
+        sums = [np.bincount(cell_labels, weights=self._cells[:, axis], minlength=self.count + 1)[1:] for axis in range(2)]
+        self.centroids = np.stack(sums, axis=1) / np.maximum(self.sizes, 1)[:, None]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def cells(self, cluster: int) -> np.ndarray:
+        """Coordinates (row, col) of the cells of one cluster, in row-major order."""
+        return self._cells[self._offsets[cluster]:self._offsets[cluster + 1]]
+
+    def coordinates(self) -> List[np.ndarray]:
+        """Cell coordinates of every cluster."""
+        return np.split(self._cells, self._offsets[1:-1])
+
+    def label_at(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Cluster of every position.
+
+        Args:
+        - positions (np.ndarray): Array of (row, col) positions, shape (n, 2).
+
+        Returns:
+        - np.ndarray: Cluster index of every position, or -1 for positions outside clusters or the map.
+        """
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+        inside = np.all((positions >= 0) & (positions < self.labels.shape), axis=1)
+        found = np.full(len(positions), -1, dtype=np.int64)
+        found[inside] = self.labels[positions[inside, 0], positions[inside, 1]].astype(np.int64) - 1
+        return found
+
+
+def label_clusters(map_data: np.ndarray, block: Block) -> Clusters:
+    """
+    Label the connected clusters of one block type.
+
+    Args:
+    - map_data (np.ndarray): Map of block ids.
+    - block (str or int): The block type.
+
+    Returns:
+    - Clusters: The clusters of the block.
+    """
+    return Clusters(block_mask(map_data, block))
+
+
+def clusters_at(game_data, block: Block, step: int = 0) -> Optional[Clusters]:
+    """
+    Return the clusters of a block on the map of a step, labelled once per map version and block.
+
+    Args:
+    - game_data (GameData or ColumnarGameData): The game data object.
+    - block (str or int): The block type.
+    - step (int): The index of the state whose map is used.
+
+    Returns:
+    - Clusters or None: The clusters, or None if the state has no map.
+    """
+    columns = as_columnar(game_data)
+    block = block_id(block)
+    if columns.maps is not None:
+        version = columns.maps.version(step)
+        return columns.cached(('clusters', version, block), lambda: label_clusters(columns.maps.map_at(step), block))
+    map_data = game_data.states[step].map
+    if map_data is None:
+        return None
+    return columns.cached(('clusters', 'step', step, block), lambda: label_clusters(map_data, block))
@@ -0,0 +1,574 @@
+import json
+from typing import List, Dict, Tuple, Any, Optional, Sequence, Iterator, Union, Callable, Hashable
+from dataclasses import dataclass, field
+import numpy as np
+from deserialization import (
+    GameData, PlayerVariables, PlayerAchievements, PlayerInventory, PlayerState,
+    achievements_list
+)
+from change_index import ChangeIndex
+from map_store import MapStore
+from blocks import block_ids
+from instrumentation import count, timed, timer
+from achievement_bits import AchievementBits, unpack_bits
+from actions import Action, ActionIndex, ACTION_DTYPE, ACTION_NAMES, KEY_CODES, encode_actions
+
+# (dtype, per-state shape, default) of every PlayerVariables field
+VARIABLE_COLUMNS: Dict[str, Tuple[Any, Tuple[int, ...], Any]] = {
+    "player_position": (np.int32, (2,), (0, 0)),
+    "player_level": (np.int32, (), 0),
+    "player_direction": (np.int32, (), 0),
+    "player_health": (np.float64, (), 0.0),
+    "player_food": (np.int32, (), 0),
+    "player_drink": (np.int32, (), 0),
+    "player_energy": (np.int32, (), 0),
+    "player_mana": (np.int32, (), 0),
+    "is_sleeping": (np.bool_, (), False),
+    "is_resting": (np.bool_, (), False),
+    "player_recover": (np.float64, (), 0.0),
+    "player_hunger": (np.float64, (), 0.0),
+    "player_thirst": (np.float64, (), 0.0),
+    "player_fatigue": (np.float64, (), 0.0),
+    "player_recover_mana": (np.float64, (), 0.0),
+    "player_xp": (np.int32, (), 0),
+    "player_dexterity": (np.int32, (), 0),
+    "player_strength": (np.int32, (), 0),
+    "player_intelligence": (np.int32, (), 0),
+    "learned_spells": (np.bool_, (2,), (False, False)),
+    "sword_enchantment": (np.int32, (), 0),
+    "bow_enchantment": (np.int32, (), 0),
+    "boss_progress": (np.int32, (), 0),
+    "boss_timesteps_to_spawn_this_round": (np.int32, (), 0),
+    "light_level": (np.float64, (), 0.0),
+    "state_rng": (np.uint32, (2,), (0, 0)),
+    "timestep": (np.int64, (), 0),
+}
+
+# (dtype, per-state shape, default) of every PlayerInventory item
+INVENTORY_COLUMNS: Dict[str, Tuple[Any, Tuple[int, ...], Any]] = {
+    "wood": (np.int32, (), 0),
+    "stone": (np.int32, (), 0),
+    "coal": (np.int32, (), 0),
+    "iron": (np.int32, (), 0),
+    "pickaxe": (np.int32, (), 0),
+    "sword": (np.int32, (), 0),
+    "armour": (np.int32, (4,), (0, 0, 0, 0)),
+    "potions": (np.int32, (6,), (0, 0, 0, 0, 0, 0)),
+}
+
+# PlayerVariables fields that are tuples rather than lists when taken out of a column
+_TUPLE_VARIABLES = {"player_position", "state_rng"}
+
+
+def count_states(data: Dict[str, Any]) -> int:
+    """
+    Count the states described by a compressed changes dictionary.
+
+    Args:
+    - data (Dict[str, Any]): The compressed changes dictionary.
+
+    Returns:
+    - int: One more than the largest step key found in any section.
+    """
+    last = -1
+    for change_map in data['variables'].values():
+        if change_map:
+            last = max(last, max(map(int, change_map.keys())))
+    for section in ('achievements', 'inventory', 'actions', 'map'):
+        if data.get(section):
+            last = max(last, max(map(int, data[section].keys())))
+    return last + 1
+
+
+def forward_fill(steps: np.ndarray, values: np.ndarray, n_states: int, default: Any) -> np.ndarray:
+    """
+    Expand values recorded at sorted change steps into a dense per-state column.
+
+    Every state takes the value of the last change at or before it; states before the
+    first change take `default`. This is one cumulative max scan plus one gather.
+
+    Args:
+    - steps (np.ndarray): Sorted step indices of the changes.
+    - values (np.ndarray): Value recorded at each change, first axis aligned with `steps`.
+    - n_states (int): Length of the dense column.
+    - default (Any): Value before the first change.
+
+    Returns:
+    - np.ndarray: The dense column of shape (n_states,) + values.shape[1:].
+    """
+    if len(steps) == n_states:
+        # every state has its own entry, nothing to fill
+        return values
+    last_change = np.full(n_states, -1, dtype=np.int64)
+    last_change[steps] = np.arange(len(steps))
+    np.maximum.accumulate(last_change, out=last_change)
+    table = np.empty((len(steps) + 1,) + values.shape[1:], dtype=values.dtype)
+    table[0] = default
+    table[1:] = values
+    return table[last_change + 1]
+
+
+def decode_change_map(change_map: Dict[str, Any], n_states: int, spec: Tuple[Any, Tuple[int, ...], Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a sparse {step: value} change map into a dense forward-filled column.
+
+    Args:
+    - change_map (Dict[str, Any]): Values keyed by the string step at which they changed.
+    - n_states (int): Number of states in the episode.
+    - spec (Tuple[Any, Tuple[int, ...], Any]): (dtype, per-state shape, default) of the column.
+
+    Returns:
+    - Tuple[np.ndarray, np.ndarray]: The dense column and the sorted change steps.
+    """
+    dtype, shape, default = spec
+    steps = np.fromiter(map(int, change_map.keys()), dtype=np.int64, count=len(change_map))
+    values = np.array(list(change_map.values()), dtype=dtype).reshape((len(steps),) + shape)
+    order = np.argsort(steps, kind='stable')
+    steps, values = steps[order], values[order]
+    return forward_fill(steps, values, n_states, default), steps
+
+
+def stack_values(values: Sequence[Any], spec: Tuple[Any, Tuple[int, ...], Any]) -> np.ndarray:
+    """
+    Stack per-state field values into a dense column.
+
+    A missing value (None) or a vector of the wrong length, such as the empty
+    `learned_spells` of a default `PlayerVariables`, takes the default of the spec.
+
+    Args:
+    - values (Sequence[Any]): The value of the field in every state.
+    - spec (Tuple[Any, Tuple[int, ...], Any]): (dtype, per-state shape, default) of the column.
+
+    Returns:
+    - np.ndarray: The column of shape (len(values),) + shape.
+    """
+    dtype, shape, default = spec
+    column = np.empty((len(values),) + shape, dtype=dtype)
+    try:
+        column[:] = np.array(values, dtype=dtype).reshape(column.shape)
+    except (TypeError, ValueError):
+        # ragged or missing values: only the states that do not fit take the default
+        for i, value in enumerate(values):
+            column[i] = value if value is not None and np.shape(value) == shape else default
+    return column
+
+
+class _StateSequence(Sequence):
+    """
+    Read-only sequence of `PlayerState` views built on demand from the columns.
+
+    With `memoize` every view is kept once built, so several consumers scanning the same
+    trajectory share a single materialization.
+    """
+
+    def __init__(self, game_data: 'ColumnarGameData', memoize: bool = False):
+        self._game_data = game_data
+        self._views: Optional[List[Optional[PlayerState]]] = [None] * game_data.n_states if memoize else None
+
+    def __len__(self) -> int:
+        return self._game_data.n_states
+
+    def _state(self, index: int) -> PlayerState:
+        if self._views is None:
+            return self._game_data.state(index)
+        view = self._views[index]
+        if view is None:
+            view = self._views[index] = self._game_data.state(index)
+        return view
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._state(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("state index out of range")
+        return self._state(index)
+
+    def __iter__(self) -> Iterator[PlayerState]:
+        for i in range(len(self)):
+            yield self._state(i)
+
+
+@dataclass(eq=False)
+class ColumnarGameData:
+    """
+    Column-oriented game data: one typed NumPy array per variable and inventory item.
+
+    Attributes:
+    - variables (Dict[str, np.ndarray]): PlayerVariables field name -> array indexed by state.
+    - inventory (Dict[str, np.ndarray]): PlayerInventory item name -> array indexed by state.
+    - achievement_flags (np.ndarray, optional): Boolean matrix (states x achievement_names).
+    - achievement_words (np.ndarray, optional): The same achievements as the uint64 bitsets of
+      `AchievementBits`, used when the flags are not given (e.g. columns read in place from a file).
+    - actions (np.ndarray): Code of the action taken at every state (uint8, see `actions.Action`).
+    - achievement_names (List[str]): Column labels of `achievements`; `achievements_list` first,
+      followed by any unknown names met while decoding.
+    - variable_changes (Dict[str, np.ndarray]): Sorted steps recorded in each variable change map.
+    - inventory_changes (np.ndarray): Sorted steps at which an inventory snapshot was recorded.
+    - achievement_changes (np.ndarray): Sorted steps at which an achievement list was recorded.
+    - maps (MapStore, optional): World maps of the trajectory, if recorded.
+    """
+    variables: Dict[str, np.ndarray]
+    inventory: Dict[str, np.ndarray]
+    actions: np.ndarray
+    achievement_flags: Optional[np.ndarray] = None
+    achievement_words: Optional[np.ndarray] = None
+    achievement_names: List[str] = field(default_factory=lambda: list(achievements_list))
+    variable_changes: Dict[str, np.ndarray] = field(default_factory=dict)
+    inventory_changes: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    achievement_changes: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    maps: Optional[MapStore] = None
+    _cache: Dict[str, Any] = field(default_factory=dict, init=False, repr=False)
+
+    def cached(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the derived structure stored under `key`, building it on first use."""
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def change_index(self) -> ChangeIndex:
+        """Change-point index over the variable, inventory and achievement columns."""
+        return self.cached('change_index', lambda: ChangeIndex(self))
+
+    @property
+    def achievements(self) -> np.ndarray:
+        """Boolean matrix (states x achievement_names); unpacked once from the bitsets if needed."""
+        if self.achievement_flags is None:
+            self.achievement_flags = unpack_bits(self.achievement_words, len(self.achievement_names))
+        return self.achievement_flags
+
+    @property
+    def achievement_bits(self) -> AchievementBits:
+        """Per-state achievement bitsets and the first unlock step of every achievement."""
+        def build() -> AchievementBits:
+            if self.achievement_words is not None:
+                return AchievementBits(self.achievement_words, self.achievement_names)
+            return AchievementBits.from_flags(self.achievement_flags, self.achievement_names)
+        return self.cached('achievement_bits', build)
+
+    @property
+    def action_index(self) -> ActionIndex:
+        """Sorted steps of every action, grouped by action code."""
+        return self.cached('action_index', lambda: ActionIndex(self.actions))
+
+    @property
+    def n_states(self) -> int:
+        return len(self.actions)
+
+    @property
+    def states(self) -> Sequence[PlayerState]:
+        """Lazy `PlayerState` sequence, so the checkers written against `GameData` keep working."""
+        return _StateSequence(self)
+
+    def state(self, index: int) -> PlayerState:
+        """
+        Build the `PlayerState` view of a single state.
+
+        Args:
+        - index (int): The index of the state.
+
+        Returns:
+        - PlayerState: A freshly built state holding plain Python values. Its map, if any, is
+          the read-only map shared by all states of the same map version.
+        """
+        count('states/materialized')
+        variables = {}
+        for name, column in self.variables.items():
+            value = column[index].tolist()
+            variables[name] = tuple(value) if name in _TUPLE_VARIABLES else value
+        inventory = {name: column[index].tolist() for name, column in self.inventory.items()}
+        achievements = [self.achievement_names[i] for i in np.flatnonzero(self.achievements[index])]
+        return PlayerState(
+            variables=PlayerVariables(**variables),
+            achievements=PlayerAchievements(achievements=achievements),
+            inventory=PlayerInventory(**inventory),
+            action=ACTION_NAMES[self.actions[index]],
+            map=self.maps.map_at(index) if self.maps is not None else None
+        )
+
+    def to_game_data(self, lazy: bool = False) -> GameData:
+        """
+        Wrap the columns into a plain `GameData`.
+
+        Args:
+        - lazy (bool): If True, states are built the first time they are accessed and then
+          kept; otherwise every state is materialized immediately.
+
+        Returns:
+        - GameData: The game data, keeping a reference to these columns.
+        """
+        states = _StateSequence(self, memoize=True) if lazy else list(self.states)
+        return GameData(states=states, columns=self)
+
+    def to_columns(self) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """
+        Flatten the game data into named plain-dtype arrays plus JSON-serializable metadata.
+
+        This is the common form used by the on-disk and shared-memory representations.
+
+        Returns:
+        - Tuple[Dict[str, np.ndarray], Dict[str, Any]]: The named arrays and the metadata.
+        """
+        columns = {f'variables/{name}': column for name, column in self.variables.items()}
+        columns.update({f'inventory/{name}': column for name, column in self.inventory.items()})
+        columns.update({f'changes/variables/{name}': steps for name, steps in self.variable_changes.items()})
+        columns['changes/inventory'] = self.inventory_changes
+        columns['changes/achievements'] = self.achievement_changes
+        columns['achievement_words'] = self.achievement_bits.words
+        columns['actions'] = self.actions
+        if self.maps is not None:
+            columns.update(self.maps.to_columns())
+        metadata = {
+            'n_states': self.n_states,
+            'achievement_names': list(self.achievement_names),
+        }
+        return columns, metadata
+
+    @staticmethod
+    def from_columns(columns: Dict[str, np.ndarray], metadata: Dict[str, Any]) -> 'ColumnarGameData':
+        """
+        Rebuild the game data from the output of `to_columns`. Arrays are used without copying.
+
+        Args:
+        - columns (Dict[str, np.ndarray]): The named arrays.
+        - metadata (Dict[str, Any]): The metadata returned alongside them.
+
+        Returns:
+        - ColumnarGameData: The columnar game data.
+        """
+        groups: Dict[str, Dict[str, np.ndarray]] = {'variables': {}, 'inventory': {}, 'changes/variables': {}}
+        for key, column in columns.items():
+            group, _, name = key.rpartition('/')
+            if group in groups:
+                groups[group][name] = column
+        return ColumnarGameData(
+            variables=groups['variables'],
+            inventory=groups['inventory'],
+            actions=columns['actions'],
+            achievement_words=columns['achievement_words'],
+            achievement_names=list(metadata['achievement_names']),
+            variable_changes=groups['changes/variables'],
+            inventory_changes=columns['changes/inventory'],
+            achievement_changes=columns['changes/achievements'],
+            maps=MapStore.from_columns(columns, metadata['n_states']) if 'map/initial' in columns else None
+        )
+
+    @staticmethod
+    @timed('load/columnarize')
+    def from_states(states: Sequence[PlayerState]) -> 'ColumnarGameData':
+        """
+        Build the columns from already materialized states.
+
+        Args:
+        - states (Sequence[PlayerState]): The states of a `GameData`.
+
+        Returns:
+        - ColumnarGameData: The columnar game data.
+        """
+        count('states/scanned', len(states))
+        variables = {
+            name: stack_values([getattr(state.variables, name, None) for state in states], spec)
+            for name, spec in VARIABLE_COLUMNS.items()
+        }
+        inventory = {
+            name: stack_values([getattr(state.inventory, name, None) for state in states], spec)
+            for name, spec in INVENTORY_COLUMNS.items()
+        }
+        achievement_names = list(achievements_list)
+        for state in states:
+            for name in state.achievements.achievements:
+                if name not in achievement_names:
+                    achievement_names.append(name)
+        achievement_ids = {name: i for i, name in enumerate(achievement_names)}
+        achievements = np.zeros((len(states), len(achievement_names)), dtype=np.bool_)
+        for i, state in enumerate(states):
+            achievements[i, [achievement_ids[name] for name in state.achievements.achievements]] = True
+        actions = encode_actions([state.action for state in states])
+        maps = None
+        if states and all(state.map is not None for state in states):
+            maps = MapStore.from_maps(_block_id_maps([state.map for state in states]))
+        return ColumnarGameData(
+            variables=variables,
+            inventory=inventory,
+            actions=actions,
+            achievement_flags=achievements,
+            achievement_names=achievement_names,
+            maps=maps
+        )
+
+    @staticmethod
+    @timed('load/decode')
+    def from_json(data: Dict[str, Any]) -> 'ColumnarGameData':
+        """
+        Build the columns straight from the compressed changes dictionary, without creating states.
+
+        The format only records a value at the steps where it changed, so every change map
+        is forward-filled: a state holds the last value recorded at or before it.
+
+        Args:
+        - data (Dict[str, Any]): The compressed changes dictionary.
+
+        Returns:
+        - ColumnarGameData: The columnar game data.
+        """
+        n_states = count_states(data)
+
+        variables, variable_changes = {}, {}
+        for name, spec in VARIABLE_COLUMNS.items():
+            variables[name], variable_changes[name] = decode_change_map(data['variables'].get(name, {}), n_states, spec)
+
+        # inventory and achievements are recorded as whole snapshots at the steps where they changed
+        snapshots = data.get('inventory', {})
+        inventory_changes = np.array(sorted(map(int, snapshots.keys())), dtype=np.int64)
+        inventory = {}
+        for name, (dtype, shape, default) in INVENTORY_COLUMNS.items():
+            values = np.array([snapshots[str(step)].get(name, default) for step in inventory_changes], dtype=dtype)
+            inventory[name] = forward_fill(inventory_changes, values.reshape((-1,) + shape), n_states, default)
+
+        achievement_names = list(achievements_list)
+        achievement_ids = {name: i for i, name in enumerate(achievement_names)}
+        lists = data.get('achievements', {})
+        achievement_changes = np.array(sorted(map(int, lists.keys())), dtype=np.int64)
+        rows, cols = [], []
+        for row, step in enumerate(achievement_changes):
+            for name in lists[str(step)]:
+                if name not in achievement_ids:
+                    achievement_ids[name] = len(achievement_names)
+                    achievement_names.append(name)
+                rows.append(row)
+                cols.append(achievement_ids[name])
+        recorded = np.zeros((len(achievement_changes), len(achievement_names)), dtype=np.bool_)
+        recorded[rows, cols] = True
+        achievements = forward_fill(achievement_changes, recorded, n_states, False)
+
+        actions = np.full(n_states, Action.UNKNOWN, dtype=ACTION_DTYPE)
+        for key, value in data.get('actions', {}).items():
+            actions[int(key)] = KEY_CODES.get(value, Action.UNKNOWN)
+
+        return ColumnarGameData(
+            variables=variables,
+            inventory=inventory,
+            actions=actions,
+            achievement_flags=achievements,
+            achievement_names=achievement_names,
+            variable_changes=variable_changes,
+            inventory_changes=inventory_changes,
+            achievement_changes=achievement_changes,
+            maps=MapStore.from_change_map(data['map'], n_states) if data.get('map') else None
+        )
+
+
+def _block_id_maps(maps: List[Any]) -> List[np.ndarray]:
+    # States sharing a map object keep sharing the converted one
+    converted: Dict[int, np.ndarray] = {}
+    for map_data in maps:
+        if id(map_data) not in converted:
+            converted[id(map_data)] = block_ids(map_data)
+    return [converted[id(map_data)] for map_data in maps]
+
+
+def as_columnar(game_data: Union[GameData, ColumnarGameData]) -> ColumnarGameData:
+    """
+    Return the columnar representation of any game data object.
+
+    `GameData` loaded from JSON keeps the columns it was decoded from; a hand-built
+    `GameData` is converted from its states once and the result is kept on it. The
+    states are assumed not to be edited in place afterwards.
+
+    Args:
+    - game_data (GameData or ColumnarGameData): The game data object.
+
+    Returns:
+    - ColumnarGameData: The columnar game data.
+    """
+    if isinstance(game_data, ColumnarGameData):
+        return game_data
+    if game_data.columns is None or game_data.columns.n_states != len(game_data.states):
+        game_data.columns = ColumnarGameData.from_states(game_data.states)
+    return game_data.columns
+
+
+def iter_distinct_maps(game_data: Union[GameData, ColumnarGameData]) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Walk the maps of a trajectory, visiting each distinct map once.
+
+    Args:
+    - game_data (GameData or ColumnarGameData): The game data object.
+
+    Yields:
+    - Tuple[int, np.ndarray]: The first step showing the map, and the map.
+    """
+    columns = as_columnar(game_data)
+    if columns.maps is not None:
+        yield from columns.maps.iter_versions()
+        return
+    previous = None
+    for step, state in enumerate(game_data.states):
+        if state.map is not None and state.map is not previous:
+            yield step, state.map
+        previous = state.map
+
+
+def iter_step_maps(game_data: Union[GameData, ColumnarGameData], steps: np.ndarray) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Group steps by the map they show, so per-map work is done once per distinct map.
+
+    Args:
+    - game_data (GameData or ColumnarGameData): The game data object.
+    - steps (np.ndarray): State indices.
+
+    Yields:
+    - Tuple[np.ndarray, np.ndarray]: A map and the positions in `steps` of the steps showing it.
+    """
+    columns = as_columnar(game_data)
+    steps = np.asarray(steps, dtype=np.int64)
+    if columns.maps is not None:
+        versions = columns.maps.versions()[steps]
+        for version in np.unique(versions):
+            yield columns.maps.map_version(int(version)), np.flatnonzero(versions == version)
+        return
+    groups: Dict[int, Tuple[Any, List[int]]] = {}
+    for i, step in enumerate(steps):
+        map_data = game_data.states[step].map
+        groups.setdefault(id(map_data), (map_data, []))[1].append(i)
+    for map_data, indices in groups.values():
+        if map_data is not None:
+            yield map_data, np.array(indices, dtype=np.int64)
+
+
+def map_edits(game_data: Union[GameData, ColumnarGameData]) -> Optional[Tuple[int, np.ndarray, Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]]]:
+    """
+    Describe the maps of a trajectory as a first map plus per-step cell edits.
+
+    Args:
+    - game_data (GameData or ColumnarGameData): The game data object.
+
+    Returns:
+    - Tuple[int, np.ndarray, Iterator] or None: The first step with a map, that map, and an
+      iterator of (step, rows, cols, blocks) edits in step order. None if there is no map.
+    """
+    columns = as_columnar(game_data)
+    if columns.maps is not None:
+        return 0, columns.maps.initial, columns.maps.iter_edits()
+    maps = iter_distinct_maps(game_data)
+    first = next(maps, None)
+    if first is None:
+        return None
+
+    def diffs(previous: np.ndarray) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        for step, current in maps:
+            current = np.asarray(current)
+            rows, cols = np.nonzero(current != previous)
+            if len(rows):
+                yield step, rows, cols, current[rows, cols]
+            previous = current
+
+    return first[0], first[1], diffs(np.asarray(first[1]))
+
+
+def load_columnar_game_data(file_path: str) -> ColumnarGameData:
+    with open(file_path, 'r') as file, timer('load/parse'):
+        json_data = json.load(file)
+    return ColumnarGameData.from_json(json_data)
@@ -1,6 +1,7 @@
 import json
 from typing import List, Dict, Tuple, Any
 from dataclasses import dataclass, field
+from instrumentation import timer
 
 achievements_list = [
     "COLLECT_WOOD", "PLACE_TABLE", "EAT_COW", "COLLECT_SAPLING", "COLLECT_DRINK",
@@ -18,6 +19,22 @@ achievements_list = [
     "EAT_BAT", "EAT_SNAIL", "FIND_BOW", "FIRE_BOW", "LEARN_FIREBALL", "CAST_FIREBALL",
     "LEARN_ICEBALL", "CAST_ICEBALL", "OPEN_CHEST", "DRINK_POTION", "ENCHANT_SWORD", "ENCHANT_ARMOUR"
 ]
+known_achievements = frozenset(achievements_list)
+
+action_map = {
+    'q': "noop", 'w': "up", 'd': "right", 's': "down", 'a': "left", 'space': "do",
+    '1': "make_wood_pickaxe", '2': "make_stone_pickaxe", '3': "make_iron_pickaxe",
+    '4': "make_diamond_pickaxe", '5': "make_wood_sword", '6': "make_stone_sword",
+    '7': "make_iron_sword", '8': "make_diamond_sword", 't': "place_table", 'tab': "sleep",
+    'r': "place_stone", 'f': "place_furnace", 'p': "place_plant", 'e': "rest", ',': "ascend",
+    '.': "descend", 'y': "make_iron_armour", 'u': "make_diamond_armour", 'i': "shoot_arrow",
+    'o': "make_arrow", 'g': "cast_fireball", 'h': "cast_iceball", 'j': "place_torch",
+    'z': "drink_potion_red", 'x': "drink_potion_green", 'c': "drink_potion_blue",
+    'v': "drink_potion_pink", 'b': "drink_potion_cyan", 'n': "drink_potion_yellow",
+    'm': "read_book", 'k': "enchant_sword", 'l': "enchant_armour", '[': "make_torch",
+    ']': "level_up_dexterity", '-': "level_up_strength", '=': "level_up_intelligence",
+    ';': "enchant_bow"
+}
 
 @dataclass
 class PlayerVariables:
@@ -70,73 +87,28 @@ class PlayerState:
     achievements: PlayerAchievements
     inventory: PlayerInventory
     action: str
+    map: Any = None
 
 @dataclass
 class GameData:
     states: List[PlayerState] = field(default_factory=list)
+    # ColumnarGameData the states were decoded from, if any
+    columns: Any = field(default=None, repr=False, compare=False)
 
     @staticmethod
     def from_json(data: Dict[str, Any]) -> 'GameData':
-        action_map = {
-            'q': "noop", 'w': "up", 'd': "right", 's': "down", 'a': "left", 'space': "do",
-            '1': "make_wood_pickaxe", '2': "make_stone_pickaxe", '3': "make_iron_pickaxe",
-            '4': "make_diamond_pickaxe", '5': "make_wood_sword", '6': "make_stone_sword",
-            '7': "make_iron_sword", '8': "make_diamond_sword", 't': "place_table", 'tab': "sleep",
-            'r': "place_stone", 'f': "place_furnace", 'p': "place_plant", 'e': "rest", ',': "ascend",
-            '.': "descend", 'y': "make_iron_armour", 'u': "make_diamond_armour", 'i': "shoot_arrow",
-            'o': "make_arrow", 'g': "cast_fireball", 'h': "cast_iceball", 'j': "place_torch",
-            'z': "drink_potion_red", 'x': "drink_potion_green", 'c': "drink_potion_blue",
-            'v': "drink_potion_pink", 'b': "drink_potion_cyan", 'n': "drink_potion_yellow",
-            'm': "read_book", 'k': "enchant_sword", 'l': "enchant_armour", '[': "make_torch",
-            ']': "level_up_dexterity", '-': "level_up_strength", '=': "level_up_intelligence",
-            ';': "enchant_bow"
-        }
-
-        states = []
-        for key in data['variables']['player_position'].keys():
-            key = int(key)
-            variables = PlayerVariables(
-                player_position=tuple(data['variables']['player_position'][str(key)]),
-                player_level=data['variables']['player_level'].get(str(key), 0),
-                player_direction=data['variables']['player_direction'].get(str(key), 0),
-                player_health=data['variables']['player_health'].get(str(key), 0.0),
-                player_food=data['variables']['player_food'].get(str(key), 0),
-                player_drink=data['variables']['player_drink'].get(str(key), 0),
-                player_energy=data['variables']['player_energy'].get(str(key), 0),
-                player_mana=data['variables']['player_mana'].get(str(key), 0),
-                is_sleeping=data['variables']['is_sleeping'].get(str(key), False),
-                is_resting=data['variables']['is_resting'].get(str(key), False),
-                player_recover=data['variables']['player_recover'].get(str(key), 0.0),
-                player_hunger=data['variables']['player_hunger'].get(str(key), 0.0),
-                player_thirst=data['variables']['player_thirst'].get(str(key), 0.0),
-                player_fatigue=data['variables']['player_fatigue'].get(str(key), 0.0),
-                player_recover_mana=data['variables']['player_recover_mana'].get(str(key), 0.0),
-                player_xp=data['variables']['player_xp'].get(str(key), 0),
-                player_dexterity=data['variables']['player_dexterity'].get(str(key), 0),
-                player_strength=data['variables']['player_strength'].get(str(key), 0),
-                player_intelligence=data['variables']['player_intelligence'].get(str(key), 0),
-                learned_spells=data['variables']['learned_spells'].get(str(key), [False, False]),
-                sword_enchantment=data['variables']['sword_enchantment'].get(str(key), 0),
-                bow_enchantment=data['variables']['bow_enchantment'].get(str(key), 0),
-                boss_progress=data['variables']['boss_progress'].get(str(key), 0),
-                boss_timesteps_to_spawn_this_round=data['variables']['boss_timesteps_to_spawn_this_round'].get(str(key), 0),
-                light_level=data['variables']['light_level'].get(str(key), 0.0),
-                state_rng=tuple(data['variables']['state_rng'].get(str(key), (0, 0))),
-                timestep=data['variables']['timestep'].get(str(key), 0)
-            )
-            achievements = PlayerAchievements(
-                achievements=data['achievements'].get(str(key), [])
-            )
-            inventory = PlayerInventory(**data['inventory'].get(str(key), {}))
-            action = action_map.get(data['actions'].get(str(key), ''), 'unknown')
-            states.append(PlayerState(variables=variables, achievements=achievements, inventory=inventory, action=action))
-        return GameData(states=states)
+        # The compressed format only stores the steps where a value changed; the columnar
+        # decoder forward-fills every change map in one vectorized pass per variable. States
+        # are built the first time they are read, so checkers that only use the columns
+        # never materialize them.
+        from columnar import ColumnarGameData
+        return ColumnarGameData.from_json(data).to_game_data(lazy=True)
 
 def validate_achievements(player_achievements: List[str]) -> bool:
-    return all(achievement in achievements_list for achievement in player_achievements)
+    return known_achievements.issuperset(player_achievements)
 
 def load_game_data(file_path: str) -> GameData:
-    with open(file_path, 'r') as file:
+    with open(file_path, 'r') as file, timer('load/parse'):
         json_data = json.load(file)
     return GameData.from_json(json_data)
 
@@ -0,0 +1,184 @@
+"""
+Batch evaluation of checker specs over a corpus of episodes.
+
+Each episode is evaluated in one pass. Specs that call a `temporal.Query` method (`mask`,
+`holds`, `first`, `ever`) are compiled together against a single mask memo, so every
+distinct sub-query of the batch (a column comparison, an action or achievement test, a
+temporal operator) is computed once per episode with one vectorized scan of its columns,
+whatever the number of specs that use it. Plain checker functions run on the same decoded
+episode and share its materialized states and cached indexes.
+"""
+import os
+from typing import List, Dict, Tuple, Any, Optional, Callable, Sequence, Union, Iterable
+from dataclasses import dataclass, field
+from deserialization import GameData
+from columnar import ColumnarGameData, as_columnar, load_columnar_game_data
+from binary_format import load_binary
+from instrumentation import profile_if_enabled, timer
+from temporal import Query
+
+# Query methods whose specs are compiled into the shared mask memo of an episode
+QUERY_METHODS = ('mask', 'holds', 'first', 'ever')
+
+Episode = Union[str, GameData, ColumnarGameData]
+
+
+@dataclass(frozen=True)
+class CheckerSpec:
+    """
+    One checker call to run on every episode.
+
+    Attributes:
+    - function (Callable): The checker function; it receives the game data as first argument.
+      A bound `Query` method (e.g. `query.ever`) makes the spec part of the fused query pass.
+    - args (Tuple): Further positional arguments.
+    - kwargs (Tuple[Tuple[str, Any], ...]): Keyword arguments as sorted (name, value) pairs.
+    - name (str, optional): Column label in the results table.
+    """
+    function: Callable
+    args: Tuple = ()
+    kwargs: Tuple[Tuple[str, Any], ...] = ()
+    name: Optional[str] = None
+
+    @staticmethod
+    def of(function: Callable, *args, name: Optional[str] = None, **kwargs) -> 'CheckerSpec':
+        """Build a spec from a call signature, e.g. `CheckerSpec.of(find_item_in_inventory, 'wood')`."""
+        return CheckerSpec(function=function, args=args, kwargs=tuple(sorted(kwargs.items())), name=name)
+
+    @property
+    def label(self) -> str:
+        if self.name is not None:
+            return self.name
+        arguments = [repr(arg) for arg in self.args] + [f'{key}={value!r}' for key, value in self.kwargs]
+        name = self.function.__name__
+        if self.query is not None:
+            name = f'{self.query!r}.{name}'
+        return f"{name}({', '.join(arguments)})"
+
+    @property
+    def query(self) -> Optional[Query]:
+        """The query whose method the spec calls, if it is a query spec."""
+        owner = getattr(self.function, '__self__', None)
+        if isinstance(owner, Query) and self.function.__name__ in QUERY_METHODS:
+            return owner
+        return None
+
+    @property
+    def key(self) -> Tuple[Callable, str, str]:
+        """Identity of the call, usable even when the arguments are not hashable."""
+        return self.function, repr(self.args), repr(self.kwargs)
+
+    def __call__(self, game_data: GameData, masks: Optional[Dict[Any, Any]] = None) -> Any:
+        """Run the checker; query specs compile into `masks` when one is given."""
+        if masks is not None and self.query is not None:
+            return self.function(game_data, *self.args, masks=masks, **dict(self.kwargs))
+        return self.function(game_data, *self.args, **dict(self.kwargs))
+
+
+@dataclass
+class EvaluationResults:
+    """
+    Results table of episodes by checkers.
+
+    Attributes:
+    - episodes (List[str]): Row labels.
+    - checkers (List[str]): Column labels.
+    - results (List[List[Any]]): `results[i][j]` is the output of checker j on episode i,
+      or the raised exception when errors are recorded.
+    """
+    episodes: List[str] = field(default_factory=list)
+    checkers: List[str] = field(default_factory=list)
+    results: List[List[Any]] = field(default_factory=list)
+
+    def row(self, episode: str) -> Dict[str, Any]:
+        return dict(zip(self.checkers, self.results[self.episodes.index(episode)]))
+
+    def column(self, checker: str) -> List[Any]:
+        column_index = self.checkers.index(checker)
+        return [row[column_index] for row in self.results]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """One dictionary per episode, with the episode label under 'episode'."""
+        return [dict(episode=episode, **dict(zip(self.checkers, row))) for episode, row in zip(self.episodes, self.results)]
+
+
+def load_episode(file_path: str) -> ColumnarGameData:
+    """
+    Load an episode from a binary episode file (`.bin`) or a compressed changes JSON file.
+
+    Args:
+    - file_path (str): Path to the episode file.
+
+    Returns:
+    - ColumnarGameData: The columnar game data.
+    """
+    if file_path.endswith('.bin'):
+        return load_binary(file_path)
+    return load_columnar_game_data(file_path)
+
+
+def evaluate_episode(game_data: Episode, specs: Sequence[CheckerSpec], record_errors: bool = False) -> List[Any]:
+    """
+    Run every checker spec on one episode in a single pass.
+
+    The query specs are evaluated first, against one mask memo, so the sub-queries they
+    have in common are computed once. The other specs get the same `GameData`, whose
+    states are materialized at most once and whose derived indexes are shared. Identical
+    specs are evaluated only once. Inside an `instrumentation.profile` block the episode
+    gets its own nested report.
+
+    Args:
+    - game_data (str, GameData or ColumnarGameData): The episode or a path to it.
+    - specs (Sequence[CheckerSpec]): The checker calls.
+    - record_errors (bool): If True, an exception raised by a checker is stored as its result
+      instead of being propagated.
+
+    Returns:
+    - List[Any]: One result per spec.
+    """
+    with profile_if_enabled(game_data if isinstance(game_data, str) else None):
+        if isinstance(game_data, str):
+            with timer('load/episode'):
+                game_data = load_episode(game_data)
+        shared = as_columnar(game_data).to_game_data(lazy=True)
+
+        masks: Dict[Any, Any] = {}
+        outputs: Dict[Tuple[Callable, str, str], Any] = {}
+        ordered = [spec for spec in specs if spec.query is not None] + [spec for spec in specs if spec.query is None]
+        for spec in ordered:
+            if spec.key not in outputs:
+                try:
+                    with timer(f'spec/{spec.label}'):
+                        outputs[spec.key] = spec(shared, masks)
+                except Exception as error:
+                    if not record_errors:
+                        raise
+                    outputs[spec.key] = error
+        return [outputs[spec.key] for spec in specs]
+
+
+def evaluate(specs: Sequence[CheckerSpec], episodes: Iterable[Episode], record_errors: bool = False) -> EvaluationResults:
+    """
+    Run a list of checker specs over a corpus of episodes.
+
+    Args:
+    - specs (Sequence[CheckerSpec]): The checker calls.
+    - episodes (Iterable[str, GameData or ColumnarGameData]): Episodes or paths to them.
+    - record_errors (bool): If True, exceptions are stored in the table instead of raised.
+
+    Returns:
+    - EvaluationResults: The episodes-by-checkers results table.
+    """
+    table = EvaluationResults(checkers=[spec.label for spec in specs])
+    for position, episode in enumerate(episodes):
+        table.episodes.append(episode if isinstance(episode, str) else str(position))
+        table.results.append(evaluate_episode(episode, specs, record_errors))
+    return table
+
+
+def list_episodes(directory: str, extensions: Tuple[str, ...] = ('.json', '.bin')) -> List[str]:
+    """Sorted paths of the episode files in a directory."""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(extensions)
+    )
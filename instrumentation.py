@@ -0,0 +1,147 @@
+import time
+from contextvars import ContextVar
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import List, Dict, Any, Optional, Callable, Iterator
+
+
+class Report:
+    """
+    Timers and counters gathered while a `profile` block was active.
+
+    Attributes:
+    - label (str, optional): Name of the profiled unit (an episode path, a batch name...).
+    - timers (Dict[str, List[float]]): Timer name -> [calls, total seconds, longest call].
+    - counters (Dict[str, int]): Counter name -> value.
+    - children (List[Report]): Reports of the nested `profile` blocks, e.g. one per episode.
+    """
+
+    def __init__(self, label: Optional[str] = None):
+        self.label = label
+        self.timers: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.children: List['Report'] = []
+
+    def add_time(self, name: str, seconds: float, calls: int = 1, longest: Optional[float] = None) -> None:
+        timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+        timer[0] += calls
+        timer[1] += seconds
+        timer[2] = max(timer[2], seconds if longest is None else longest)
+
+    def add_count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other: 'Report') -> None:
+        """Add the timers and counters of another report to this one."""
+        for name, (calls, total, longest) in other.timers.items():
+            self.add_time(name, total, int(calls), longest)
+        for name, value in other.counters.items():
+            self.add_count(name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'label': self.label,
+            'timers': {name: {'calls': int(calls), 'total': total, 'max': longest}
+                       for name, (calls, total, longest) in self.timers.items()},
+            'counters': dict(self.counters),
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    def summary(self, limit: int = 20) -> str:
+        """Text table of the slowest timers followed by the counters."""
+        lines = [f'{self.label or "profile"}:']
+        for name, (calls, total, longest) in sorted(self.timers.items(), key=lambda item: -item[1][1])[:limit]:
+            lines.append(f'  {name:<48} {int(calls):>8} calls {total * 1e3:12.2f} ms  (max {longest * 1e3:.2f} ms)')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'  {name:<48} {value:>8}')
+        return '\n'.join(lines)
+
+
+# Innermost active report of the current context; None while instrumentation is disabled.
+# A context variable rather than a global, so that checkers running in other threads (e.g. the
+# executor of `service.CheckerService`) neither add to nor pick up a report they are not part of.
+_current: ContextVar[Optional[Report]] = ContextVar('instrumentation_report', default=None)
+
+
+def enabled() -> bool:
+    return _current.get() is not None
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add to a counter of the active report; does nothing while disabled."""
+    report = _current.get()
+    if report is not None:
+        report.add_count(name, value)
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        report = _current.get()
+        if report is not None:
+            report.add_time(self.name, time.perf_counter() - self.start)
+
+
+_DISABLED = nullcontext()
+
+
+def timer(name: str):
+    """Context manager timing its block under `name`; a shared no-op while disabled."""
+    return _Timer(name) if _current.get() is not None else _DISABLED
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator timing every call of a function under `name`."""
+    def decorate(function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return function(*args, **kwargs)
+            with _Timer(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrumented(function: Callable) -> Callable:
+    """Time a checker under `checker/<name>`."""
+    return timed(f'checker/{function.__name__}')(function)
+
+
+@contextmanager
+def profile(label: Optional[str] = None) -> Iterator[Report]:
+    """
+    Collect timers and counters for the duration of a `with` block.
+
+    Profiles nest: a report is appended to the children of the enclosing one and its totals
+    are added to it, so a batch report holds both per-episode detail and batch totals. The
+    active report belongs to the current context: other threads do not see it unless they
+    run in a copy of this context (`contextvars.copy_context().run`).
+
+    Args:
+    - label (str, optional): Name of the profiled unit.
+
+    Yields:
+    - Report: The report being filled.
+    """
+    report, parent = Report(label), _current.get()
+    token = _current.set(report)
+    try:
+        yield report
+    finally:
+        _current.reset(token)
+        if parent is not None:
+            parent.children.append(report)
+            parent.merge(report)
+
+
+def profile_if_enabled(label: Optional[str] = None):
+    """Nested `profile` block if a report is already active, otherwise a no-op."""
+    return profile(label) if _current.get() is not None else _DISABLED
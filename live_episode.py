@@ -0,0 +1,252 @@
+from typing import Dict, Tuple, Any, Optional, Set
+import numpy as np
+from deserialization import achievements_list
+from columnar import ColumnarGameData, VARIABLE_COLUMNS, INVENTORY_COLUMNS
+from map_store import MapStore, MAP_DTYPE
+from actions import Action, ACTION_DTYPE, KEY_CODES
+from achievement_bits import n_words, pack_bits
+
+
+class _Rows:
+    """Dense per-state column grown geometrically; new states repeat the last one."""
+
+    def __init__(self, dtype: Any, shape: Tuple[int, ...], default: Any, capacity: int = 64):
+        self.size = 0
+        self.default = np.broadcast_to(np.asarray(default, dtype=dtype), shape)
+        self.data = np.empty((capacity,) + shape, dtype=dtype)
+
+    def extend(self, n_states: int, fill: Any = None) -> None:
+        """Add states up to `n_states`, holding `fill` or else the value of the last state."""
+        if n_states <= self.size:
+            return
+        if n_states > len(self.data):
+            # a new buffer rather than an in-place resize: views handed out earlier stay valid
+            data = np.empty((max(2 * len(self.data), n_states),) + self.data.shape[1:], dtype=self.data.dtype)
+            data[:self.size] = self.data[:self.size]
+            self.data = data
+        if fill is None:
+            fill = self.data[self.size - 1] if self.size else self.default
+        self.data[self.size:n_states] = fill
+        self.size = n_states
+
+    def append(self, values: np.ndarray) -> None:
+        """Add one state per value."""
+        size = self.size
+        self.extend(size + len(values))
+        self.data[size:self.size] = values
+
+    def set_from(self, step: int, value: Any) -> bool:
+        """Record a value from `step` to the last state; tells whether the value changed."""
+        previous = self.data[step - 1] if step > 0 else self.default
+        self.data[step:self.size] = value
+        return not np.array_equal(previous, self.data[step])
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+class _Steps(_Rows):
+    """Sorted, growable array of change steps."""
+
+    def __init__(self):
+        super().__init__(np.int64, (), 0)
+
+    def add(self, step: int) -> None:
+        if self.size == 0 or self.data[self.size - 1] < step:
+            self.extend(self.size + 1, step)
+
+
+class LiveEpisode:
+    """
+    Game data of an episode that is still running, built from streamed step deltas.
+
+    A delta is a dictionary in the compressed changes schema (any subset of the
+    `variables`, `inventory`, `achievements`, `actions` and `map` sections) whose steps
+    are not older than the last known state. New states are appended to dense columns
+    that grow in place, so applying a step costs time proportional to the step, not to the
+    length of the episode. The derived indexes of a snapshot (change points, action steps,
+    achievement bitsets, map versions) are carried over to the next one and updated from
+    the first changed state instead of being rebuilt.
+
+    Attributes:
+    - n_states (int): Number of states received so far.
+    """
+
+    def __init__(self):
+        self.n_states = 0
+        self._variables = {name: _Rows(dtype, shape, default) for name, (dtype, shape, default) in VARIABLE_COLUMNS.items()}
+        self._variable_changes = {name: _Steps() for name in VARIABLE_COLUMNS}
+        self._inventory = {name: _Rows(dtype, shape, default) for name, (dtype, shape, default) in INVENTORY_COLUMNS.items()}
+        self._inventory_changes = _Steps()
+        self._achievement_names = list(achievements_list)
+        self._achievement_ids = {name: i for i, name in enumerate(self._achievement_names)}
+        self._achievements = _Rows(np.bool_, (len(self._achievement_names),), False)
+        self._achievement_words = _Rows(np.uint64, (n_words(len(self._achievement_names)),), 0)
+        self._achievement_changes = _Steps()
+        self._actions = _Rows(ACTION_DTYPE, (), Action.UNKNOWN)
+        self._map: Optional[np.ndarray] = None
+        self._initial_map: Optional[np.ndarray] = None
+        # step, row, column and block of every map edit, in order
+        self._map_edits = (_Rows(np.int64, (), 0), _Rows(np.int32, (), 0), _Rows(np.int32, (), 0), _Rows(MAP_DTYPE, (), 0))
+        self._snapshot: Optional[ColumnarGameData] = None
+        # last snapshot handed out, and the first state that changed since
+        self._previous: Optional[ColumnarGameData] = None
+        self._changed_from: Optional[int] = None
+
+    def apply(self, changes: Dict[str, Any]) -> Set[str]:
+        """
+        Merge a delta into the episode.
+
+        Args:
+        - changes (Dict[str, Any]): Change maps keyed by string step, in the compressed changes schema.
+
+        Returns:
+        - Set[str]: What the delta changed: `steps` when states were appended, and
+          `variables/<name>`, `inventory/<item>`, `achievements`, `actions` or `map`
+          for the values that differ from before.
+
+        Raises:
+        - ValueError: If the delta rewrites a state older than the last one.
+        """
+        sections = {section: changes.get(section) or {} for section in ('inventory', 'achievements', 'actions', 'map')}
+        variables = changes.get('variables') or {}
+        keys = [key for change_map in variables.values() for key in change_map]
+        keys += [key for change_map in sections.values() for key in change_map]
+        steps = [int(key) for key in keys]
+        if not steps:
+            return set()
+        if min(steps) < self.n_states - 1:
+            raise ValueError(f"Step {min(steps)} is older than the last received state {self.n_states - 1}.")
+        if self._snapshot is not None:
+            self._previous, self._snapshot = self._snapshot, None
+        self._changed_from = min(steps) if self._changed_from is None else min(self._changed_from, min(steps))
+
+        touched = set()
+        n_states = max(self.n_states, max(steps) + 1)
+        if n_states > self.n_states:
+            touched.add('steps')
+            for rows in (*self._variables.values(), *self._inventory.values(), self._achievements, self._achievement_words):
+                rows.extend(n_states)
+            self._actions.extend(n_states, Action.UNKNOWN)
+            self.n_states = n_states
+
+        for name, change_map in variables.items():
+            if name not in self._variables:
+                continue
+            for step in sorted(map(int, change_map)):
+                if self._variables[name].set_from(step, change_map[str(step)]):
+                    touched.add(f'variables/{name}')
+                self._variable_changes[name].add(step)
+
+        for step in sorted(map(int, sections['inventory'])):
+            snapshot = sections['inventory'][str(step)]
+            for name, (dtype, shape, default) in INVENTORY_COLUMNS.items():
+                if self._inventory[name].set_from(step, snapshot.get(name, default)):
+                    touched.add(f'inventory/{name}')
+            self._inventory_changes.add(step)
+
+        for step in sorted(map(int, sections['achievements'])):
+            row = np.zeros(len(self._achievement_names), dtype=np.bool_)
+            for name in sections['achievements'][str(step)]:
+                if name not in self._achievement_ids:
+                    self._add_achievement(name)
+                    row = np.append(row, False)
+                row[self._achievement_ids[name]] = True
+            if self._achievements.set_from(step, row):
+                touched.add('achievements')
+            self._achievement_words.set_from(step, pack_bits(row[None, :], self._achievement_words.data.shape[1])[0])
+            self._achievement_changes.add(step)
+
+        for key, value in sections['actions'].items():
+            self._actions.data[int(key)] = KEY_CODES.get(value, Action.UNKNOWN)
+            touched.add('actions')
+
+        for step in sorted(map(int, sections['map'])):
+            if self._apply_map(step, sections['map'][str(step)]):
+                touched.add('map')
+        return touched
+
+    def _add_achievement(self, name: str) -> None:
+        self._achievement_ids[name] = len(self._achievement_names)
+        self._achievement_names.append(name)
+        rows = _Rows(np.bool_, (len(self._achievement_names),), False, capacity=len(self._achievements.data))
+        rows.extend(self._achievements.size, False)
+        rows.data[:rows.size, :-1] = self._achievements.view()
+        self._achievements = rows
+        if n_words(len(self._achievement_names)) > self._achievement_words.data.shape[1]:
+            words = _Rows(np.uint64, (n_words(len(self._achievement_names)),), 0, capacity=len(rows.data))
+            words.append(pack_bits(rows.view(), words.data.shape[1]))
+            self._achievement_words = words
+
+    def _apply_map(self, step: int, entry: Any) -> bool:
+        # same rules as `MapStore.from_change_map`: a full map first, then full maps or [row, col, block] edits
+        entry = np.array(entry, dtype=np.int64)
+        if self._map is None:
+            if entry.ndim != 2:
+                raise ValueError("The first map entry must be a full 2D map.")
+            self._map = entry.astype(MAP_DTYPE)
+            self._initial_map = self._map.copy()
+            return True
+        if entry.shape == self._map.shape:
+            rows, cols = np.nonzero(entry != self._map)
+            entry = np.stack([rows, cols, entry[rows, cols]], axis=1)
+        entry = entry.reshape(-1, 3)
+        if len(entry) == 0:
+            return False
+        self._map[entry[:, 0], entry[:, 1]] = entry[:, 2]
+        for rows, values in zip(self._map_edits, (np.full(len(entry), step), entry[:, 0], entry[:, 1], entry[:, 2])):
+            rows.append(values)
+        return True
+
+    def _map_store(self, previous: Optional[MapStore]) -> Optional[MapStore]:
+        if self._map is None:
+            return None
+        edits = [rows.view() for rows in self._map_edits]
+        if previous is not None:
+            return previous.extended(*edits, self.n_states)
+        return MapStore(self._initial_map, *edits, self.n_states)
+
+    @property
+    def game_data(self) -> ColumnarGameData:
+        """
+        Columnar game data of the states received so far.
+
+        The columns are views of the live buffers; the object is rebuilt only after a
+        delta was applied, so derived indexes are shared between checkers of the same step.
+        The indexes already built for the previous snapshot are extended from the first
+        changed state; the other derived structures are rebuilt on demand.
+        """
+        if self._snapshot is None:
+            previous = self._previous
+            snapshot = ColumnarGameData(
+                variables={name: rows.view() for name, rows in self._variables.items()},
+                inventory={name: rows.view() for name, rows in self._inventory.items()},
+                actions=self._actions.view(),
+                achievement_flags=self._achievements.view(),
+                achievement_words=self._achievement_words.view(),
+                achievement_names=list(self._achievement_names),
+                variable_changes={name: steps.view() for name, steps in self._variable_changes.items()},
+                inventory_changes=self._inventory_changes.view(),
+                achievement_changes=self._achievement_changes.view(),
+                maps=self._map_store(previous.maps if previous is not None else None)
+            )
+            if previous is not None:
+                _carry_over(previous, snapshot, self._changed_from)
+            self._snapshot, self._previous, self._changed_from = snapshot, None, None
+        return self._snapshot
+
+
+def _carry_over(previous: ColumnarGameData, snapshot: ColumnarGameData, start: int) -> None:
+    # derived indexes of `previous` updated for `snapshot`, whose states before `start` are unchanged
+    cache = previous._cache
+    if 'change_index' in cache:
+        snapshot.cached('change_index', lambda: cache['change_index'].extended(snapshot, start))
+    if 'action_index' in cache:
+        snapshot.cached('action_index', lambda: cache['action_index'].extended(snapshot.actions, start))
+    if 'achievement_bits' in cache:
+        snapshot.cached('achievement_bits', lambda: cache['achievement_bits'].extended(
+            snapshot.achievement_words, snapshot.achievement_names, start))
+    for key, value in cache.items():
+        # clusters are keyed by map version, and the map of a version never changes
+        if isinstance(key, tuple) and key[0] == 'clusters' and key[1] != 'step':
+            snapshot.cached(key, lambda: value)
@@ -0,0 +1,264 @@
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Any, Optional, Iterator, Sequence, Union
+import numpy as np
+from instrumentation import count
+
+MAP_DTYPE = np.uint8
+
+# (rows, cols) reach of the Craftax local view, which is 9 x 11 cells around the player
+VIEW_RADIUS: Tuple[int, int] = (4, 5)
+
+
+def view_radius(radius: Union[int, Tuple[int, int]]) -> Tuple[int, int]:
+    """Normalize a square radius or a (rows, cols) pair."""
+    if isinstance(radius, (int, np.integer)):
+        return int(radius), int(radius)
+    return int(radius[0]), int(radius[1])
+
+
+def window(map_data: np.ndarray, position: Sequence[int], radius: Union[int, Tuple[int, int]] = VIEW_RADIUS) -> np.ndarray:
+    """
+    Cells within `radius` of `position`, clipped to the map.
+
+    Args:
+    - map_data (np.ndarray): The map.
+    - position (Tuple[int, int]): The (row, col) center.
+    - radius (int or Tuple[int, int]): Square radius, or (rows, cols) reach. Defaults to the Craftax view.
+
+    Returns:
+    - np.ndarray: A view into `map_data`; nothing is copied.
+    """
+    row_reach, col_reach = view_radius(radius)
+    row, col = int(position[0]), int(position[1])
+    return map_data[max(row - row_reach, 0):max(row + row_reach + 1, 0),
+                    max(col - col_reach, 0):max(col + col_reach + 1, 0)]
+
+
+class GameMap(np.ndarray):
+    """Map of one state; a plain array view with neighbourhood helpers."""
+
+    def look_around(self, position: Sequence[int], radius: Union[int, Tuple[int, int]] = VIEW_RADIUS) -> np.ndarray:
+        """Zero-copy window of the block ids around `position`, see `window`."""
+        return window(self.view(np.ndarray), position, radius)
+
+
+class MapStore:
+    """
+    World maps of a trajectory stored as an initial map plus a sparse list of cell edits.
+
+    Every edit is (step, row, col, block): from `step` on, cell (row, col) holds `block`.
+    The map of a step is rebuilt on demand by replaying edits on top of the closest
+    cached earlier version; rebuilt versions are kept in a small LRU cache so scans
+    over consecutive steps replay each edit once.
+
+    Attributes:
+    - initial (np.ndarray): Map before any edit, shape (rows, cols).
+    - edit_steps (np.ndarray): Sorted step of every edit.
+    - edit_rows (np.ndarray): Row of every edit.
+    - edit_cols (np.ndarray): Column of every edit.
+    - edit_blocks (np.ndarray): New block of every edit.
+    - n_states (int): Number of states in the trajectory.
+    """
+
+    def __init__(self, initial: np.ndarray, edit_steps: np.ndarray, edit_rows: np.ndarray, edit_cols: np.ndarray,
+                 edit_blocks: np.ndarray, n_states: int, cache_size: int = 16):
+        self.initial = np.asarray(initial, dtype=MAP_DTYPE)
+        self.edit_steps = np.asarray(edit_steps, dtype=np.int64)
+        self.edit_rows = np.asarray(edit_rows, dtype=np.int32)
+        self.edit_cols = np.asarray(edit_cols, dtype=np.int32)
+        self.edit_blocks = np.asarray(edit_blocks, dtype=MAP_DTYPE)
+        self.n_states = n_states
+        self.cache_size = cache_size
+        self._versions: 'OrderedDict[int, np.ndarray]' = OrderedDict()
+        self.materialized = 0
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.initial.shape
+
+    def version(self, step: int) -> int:
+        """
+        Number of edits applied to the map of `step`. Steps with the same version share a map.
+        """
+        return int(np.searchsorted(self.edit_steps, step, side='right'))
+
+    def versions(self) -> np.ndarray:
+        """Map version of every state, as one array."""
+        return np.searchsorted(self.edit_steps, np.arange(self.n_states), side='right')
+
+    def iter_versions(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Walk the distinct maps of the trajectory in order.
+
+        Yields:
+        - Tuple[int, np.ndarray]: First step of the version and its read-only map.
+        """
+        versions = self.versions()
+        distinct, first_steps = np.unique(versions, return_index=True)
+        for version, step in zip(distinct, first_steps):
+            yield int(step), self.map_version(int(version))
+
+    def iter_edits(self) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Walk the edits grouped by step.
+
+        Yields:
+        - Tuple[int, np.ndarray, np.ndarray, np.ndarray]: Step, rows, columns and new blocks of its edits.
+        """
+        starts = np.flatnonzero(np.diff(self.edit_steps, prepend=-1))
+        stops = np.append(starts[1:], len(self.edit_steps))
+        for start, stop in zip(starts, stops):
+            yield (int(self.edit_steps[start]), self.edit_rows[start:stop],
+                   self.edit_cols[start:stop], self.edit_blocks[start:stop])
+
+    def change_steps(self) -> np.ndarray:
+        """Sorted distinct steps at which the map changes."""
+        return np.unique(self.edit_steps)
+
+    def map_at(self, step: int) -> np.ndarray:
+        """
+        Rebuild the map of a step.
+
+        Args:
+        - step (int): The index of the state.
+
+        Returns:
+        - np.ndarray: Read-only map of shape (rows, cols); shared by every step of the same version.
+        """
+        if not 0 <= step < self.n_states:
+            raise IndexError("state index out of range")
+        return self.map_version(self.version(step))
+
+    def look_around(self, step: int, position: Sequence[int], radius: Union[int, Tuple[int, int]] = VIEW_RADIUS) -> np.ndarray:
+        """
+        Block ids within `radius` of `position` on the map of a step.
+
+        Returns:
+        - np.ndarray: Read-only view into the cached map of the step.
+        """
+        return window(self.map_at(step), position, radius).view(np.ndarray)
+
+    def map_version(self, version: int) -> np.ndarray:
+        """Rebuild the map after the first `version` edits."""
+        if version in self._versions:
+            self._versions.move_to_end(version)
+            return self._versions[version]
+
+        base_version, base = 0, self.initial
+        for cached in self._versions:
+            if base_version < cached <= version:
+                base_version, base = cached, self._versions[cached]
+        current = base.copy().view(GameMap)
+        self.apply_edits(current, base_version, version)
+        current.setflags(write=False)
+        self.materialized += 1
+        count('maps/materialized')
+
+        self._versions[version] = current
+        if len(self._versions) > self.cache_size:
+            self._versions.popitem(last=False)
+        return current
+
+    def apply_edits(self, target: np.ndarray, start: int, stop: int) -> None:
+        """Apply edits [start, stop) to `target` in place; the last edit of a cell wins."""
+        if stop <= start:
+            return
+        cells = self.edit_rows[start:stop].astype(np.int64) * self.shape[1] + self.edit_cols[start:stop]
+        # keep only the last write to every cell
+        last = len(cells) - 1 - np.unique(cells[::-1], return_index=True)[1]
+        target.reshape(-1)[cells[last]] = self.edit_blocks[start:stop][last]
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        return {
+            'map/initial': self.initial,
+            'map/steps': self.edit_steps,
+            'map/rows': self.edit_rows,
+            'map/cols': self.edit_cols,
+            'map/blocks': self.edit_blocks,
+        }
+
+    def extended(self, edit_steps: np.ndarray, edit_rows: np.ndarray, edit_cols: np.ndarray,
+                 edit_blocks: np.ndarray, n_states: int) -> 'MapStore':
+        """
+        Store of a longer trajectory whose edits start with the edits of this one.
+
+        Versions are numbered by edit count, so the cached maps stay valid and are shared.
+
+        Returns:
+        - MapStore: The new store.
+        """
+        store = MapStore(self.initial, edit_steps, edit_rows, edit_cols, edit_blocks, n_states, self.cache_size)
+        store._versions.update(self._versions)
+        return store
+
+    @staticmethod
+    def from_columns(columns: Dict[str, np.ndarray], n_states: int) -> 'MapStore':
+        return MapStore(
+            columns['map/initial'], columns['map/steps'], columns['map/rows'],
+            columns['map/cols'], columns['map/blocks'], n_states
+        )
+
+    @staticmethod
+    def from_maps(maps: List[np.ndarray]) -> 'MapStore':
+        """
+        Build a store from one full map per state, keeping only the cells that change.
+
+        Args:
+        - maps (List[np.ndarray]): The map of every state.
+
+        Returns:
+        - MapStore: The map store.
+        """
+        initial = np.asarray(maps[0], dtype=MAP_DTYPE)
+        edit_steps, edits = [], []
+        previous = initial
+        for step, current in enumerate(maps[1:], start=1):
+            if current is previous:
+                continue
+            current = np.asarray(current, dtype=MAP_DTYPE)
+            rows, cols = np.nonzero(current != previous)
+            edit_steps.append(np.full(len(rows), step, dtype=np.int64))
+            edits.append(np.stack([rows, cols, current[rows, cols]], axis=1))
+            previous = current
+        edits = np.concatenate(edits) if edits else np.zeros((0, 3), dtype=np.int64)
+        edit_steps = np.concatenate(edit_steps) if edit_steps else np.zeros(0, dtype=np.int64)
+        return MapStore(initial, edit_steps, edits[:, 0], edits[:, 1], edits[:, 2], len(maps))
+
+    @staticmethod
+    def from_change_map(change_map: Dict[str, Any], n_states: int) -> 'MapStore':
+        """
+        Decode the `map` section of the compressed changes format.
+
+        The entry of the first step is the full map as a list of rows. Every later entry is
+        either a full map, which is diffed against the previous one, or a list of
+        [row, col, block] cell edits.
+
+        Args:
+        - change_map (Dict[str, Any]): The map section, keyed by step.
+        - n_states (int): Number of states in the episode.
+
+        Returns:
+        - MapStore: The decoded map store.
+        """
+        steps = sorted(map(int, change_map.keys()))
+        if not steps:
+            raise ValueError("The map section is empty.")
+        initial = np.array(change_map[str(steps[0])], dtype=MAP_DTYPE)
+        if initial.ndim != 2:
+            raise ValueError("The first map entry must be a full 2D map.")
+
+        current = initial.copy()
+        edit_steps, edits = [], []
+        for step in steps[1:]:
+            entry = np.array(change_map[str(step)], dtype=np.int64)
+            if entry.shape == initial.shape:
+                rows, cols = np.nonzero(entry != current)
+                entry = np.stack([rows, cols, entry[rows, cols]], axis=1)
+            entry = entry.reshape(-1, 3)
+            current[entry[:, 0], entry[:, 1]] = entry[:, 2]
+            edit_steps.append(np.full(len(entry), step, dtype=np.int64))
+            edits.append(entry)
+
+        edits = np.concatenate(edits) if edits else np.zeros((0, 3), dtype=np.int64)
+        edit_steps = np.concatenate(edit_steps) if edit_steps else np.zeros(0, dtype=np.int64)
+        return MapStore(initial, edit_steps, edits[:, 0], edits[:, 1], edits[:, 2], n_states)
@@ -0,0 +1,265 @@
+import copy
+import hashlib
+import inspect
+import json
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from enum import Enum
+from functools import wraps
+from typing import Dict, Tuple, Any, Optional, Callable, Iterator
+import numpy as np
+from columnar import as_columnar
+
+_MISSING = object()
+
+# Part of every cache key. Bump it when a change to shared helpers (decoders, indexes...)
+# alters checker results, so that results persisted by older code are not served.
+CACHE_VERSION = 1
+
+
+def fingerprint(game_data) -> str:
+    """
+    Content hash of an episode, computed once and cached with its columns.
+
+    Only the states are hashed: the dense variable, inventory and action columns, the
+    achievements held at every state and the map of every state. How they were recorded
+    (change steps, achievement column order, redundant map edits) is left out, so two
+    episodes with the same states get the same fingerprint, whatever file or format they
+    were loaded from.
+
+    Args:
+    - game_data (GameData or ColumnarGameData): The game data object.
+
+    Returns:
+    - str: Hex digest.
+    """
+    columns = as_columnar(game_data)
+
+    def build() -> str:
+        digest = hashlib.blake2b(digest_size=20)
+
+        def update(name: str, array: np.ndarray) -> None:
+            array = np.ascontiguousarray(array)
+            digest.update(f'{name}:{array.dtype.str}:{array.shape}'.encode())
+            digest.update(array.tobytes())
+
+        update('n_states', np.array([columns.n_states]))
+        for group, table in (('variables', columns.variables), ('inventory', columns.inventory)):
+            for name in sorted(table):
+                update(f'{group}/{name}', table[name])
+        update('actions', columns.actions)
+        # achievements by name, leaving out the names no state holds
+        held = columns.achievements.any(axis=0) if columns.n_states else np.zeros(len(columns.achievement_names), dtype=bool)
+        for name, index in sorted((name, index) for index, name in enumerate(columns.achievement_names) if held[index]):
+            update(f'achievements/{name}', columns.achievements[:, index])
+        if columns.maps is not None:
+            update('map/initial', columns.maps.initial)
+            update('map/changes', _effective_map_edits(columns.maps))
+        return digest.hexdigest()
+
+    return columns.cached('fingerprint', build)
+
+
+def _effective_map_edits(maps) -> np.ndarray:
+    # (step, cell, block) of every cell whose block differs from the previous step
+    current = maps.initial.copy().reshape(-1)
+    changes = []
+    for step, rows, cols, blocks in maps.iter_edits():
+        cells = rows.astype(np.int64) * maps.shape[1] + cols
+        last = len(cells) - 1 - np.unique(cells[::-1], return_index=True)[1]
+        cells, blocks = cells[last], blocks[last]
+        changed = current[cells] != blocks
+        cells, blocks = cells[changed], blocks[changed]
+        current[cells] = blocks
+        order = np.argsort(cells)
+        changes.append(np.stack([np.full(len(cells), step), cells[order], blocks[order].astype(np.int64)], axis=1))
+    return np.concatenate(changes) if changes else np.zeros((0, 3), dtype=np.int64)
+
+
+def normalize(value: Any) -> Any:
+    """
+    Turn an argument into a JSON-serializable value that only depends on its content.
+
+    Raises:
+    - TypeError: If the argument is of a type with no content-based form (its repr could
+      hold a memory address and never match again).
+    """
+    if isinstance(value, Enum):
+        return normalize(value.value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return {'ndarray': value.dtype.str, 'shape': list(value.shape),
+                'sha1': hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((normalize(item) for item in value), key=repr)
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in sorted(value.items(), key=lambda pair: str(pair[0]))}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Cannot build a cache key from an argument of type {type(value).__name__}.")
+
+
+class CheckerCache:
+    """
+    Bounded LRU of checker results, optionally backed by a SQLite file shared across runs.
+
+    Attributes:
+    - maxsize (int): Maximum number of results kept in memory.
+    - path (str, optional): SQLite database file of the persistent tier.
+    - hits (int): Lookups answered from memory or disk.
+    - misses (int): Lookups that ran the checker.
+    """
+
+    def __init__(self, maxsize: int = 4096, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)')
+            self._db.commit()
+
+    def get(self, key: str) -> Any:
+        """Return the stored result, or `_MISSING`."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+            if self._db is not None:
+                row = self._db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    value = pickle.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return _MISSING
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute('INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)',
+                                 (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Drop the in-memory results; the persistent tier is kept."""
+        with self._lock:
+            self._memory.clear()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+
+# Cache used by @memoized checkers; None while memoization is disabled.
+_active: Optional[CheckerCache] = None
+
+
+def enable_memoization(maxsize: int = 4096, path: Optional[str] = None) -> CheckerCache:
+    """
+    Start caching the results of @memoized checkers.
+
+    Args:
+    - maxsize (int): Maximum number of results kept in memory.
+    - path (str, optional): SQLite file for results that survive the process.
+
+    Returns:
+    - CheckerCache: The active cache.
+    """
+    global _active
+    disable_memoization()
+    _active = CheckerCache(maxsize, path)
+    return _active
+
+
+def disable_memoization() -> None:
+    global _active
+    if _active is not None:
+        _active.close()
+    _active = None
+
+
+@contextmanager
+def memoization(maxsize: int = 4096, path: Optional[str] = None) -> Iterator[CheckerCache]:
+    """Enable memoization for the duration of a `with` block."""
+    cache = enable_memoization(maxsize, path)
+    try:
+        yield cache
+    finally:
+        disable_memoization()
+
+
+def code_hash(function: Callable) -> str:
+    """Hash of the bytecode and constants of a function, so that editing a checker invalidates its results."""
+    digest = hashlib.blake2b(digest_size=12)
+
+    def update(code) -> None:
+        digest.update(code.co_code)
+        digest.update(repr(code.co_names).encode())
+        for constant in code.co_consts:
+            if inspect.iscode(constant):
+                update(constant)
+            else:
+                digest.update(repr(constant).encode())
+
+    update(inspect.unwrap(function).__code__)
+    return digest.hexdigest()
+
+
+def call_key(function: Callable, signature: inspect.Signature, game_data, args: Tuple, kwargs: Dict[str, Any],
+             version: Optional[str] = None) -> str:
+    """
+    Key of a checker call: cache version, function and its code, episode fingerprint and
+    arguments with defaults applied.
+    """
+    bound = signature.bind(game_data, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = list(bound.arguments.items())[1:]
+    payload = json.dumps([CACHE_VERSION, f'{function.__module__}.{function.__qualname__}', version or code_hash(function),
+                          fingerprint(game_data), normalize(arguments)])
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+
+def memoized(function: Callable) -> Callable:
+    """
+    Cache the results of a checker whose first argument is the game data.
+
+    While memoization is disabled the wrapper only adds one global lookup per call.
+    Raised exceptions are not cached, and mutable results are copied on the way out.
+    """
+    signature = inspect.signature(function)
+    version = code_hash(function)
+
+    @wraps(function)
+    def wrapper(game_data, *args, **kwargs):
+        cache = _active
+        if cache is None:
+            return function(game_data, *args, **kwargs)
+        key = call_key(function, signature, game_data, args, kwargs, version)
+        result = cache.get(key)
+        if result is _MISSING:
+            result = function(game_data, *args, **kwargs)
+            cache.put(key, result)
+        return copy.deepcopy(result) if isinstance(result, (list, dict, set, np.ndarray)) else result
+
+    return wrapper
@@ -0,0 +1,62 @@
+from typing import Tuple, Union
+import numpy as np
+from scipy.ndimage import maximum_filter
+from columnar import as_columnar, iter_step_maps
+from blocks import Block, block_id, block_mask
+from map_store import VIEW_RADIUS, view_radius, window
+
+
+def view_filter(mask: np.ndarray, radius: Union[int, Tuple[int, int]] = VIEW_RADIUS) -> np.ndarray:
+    """
+    Sliding-window "any" over a boolean map.
+
+    Args:
+    - mask (np.ndarray): Boolean map of the cells holding a block.
+    - radius (int or Tuple[int, int]): Square radius, or (rows, cols) reach of the window.
+
+    Returns:
+    - np.ndarray: Boolean map, True where the window centred on the cell holds a set cell.
+    """
+    row_reach, col_reach = view_radius(radius)
+    size = (2 * row_reach + 1, 2 * col_reach + 1)
+    return maximum_filter(mask.astype(np.uint8), size=size, mode='constant', cval=0).astype(np.bool_)
+
+
+def block_in_view(game_data, block: Block, radius: Union[int, Tuple[int, int]] = VIEW_RADIUS) -> np.ndarray:
+    """
+    Flag the states at which `block` is within `radius` of the player.
+
+    The window filter is computed once per distinct map and then read at every player
+    position with one fancy-indexing call; the result is cached per block and radius.
+
+    Args:
+    - game_data (GameData or ColumnarGameData): The game data object.
+    - block (str or int): The block type.
+    - radius (int or Tuple[int, int]): Square radius, or (rows, cols) reach. Defaults to the Craftax view.
+
+    Returns:
+    - np.ndarray: Boolean mask over the states.
+    """
+    columns = as_columnar(game_data)
+    block, radius = block_id(block), view_radius(radius)
+
+    def build() -> np.ndarray:
+        positions = np.asarray(columns.variables['player_position'], dtype=np.int64)
+        in_view = np.zeros(columns.n_states, dtype=np.bool_)
+        for map_data, steps in iter_step_maps(game_data, np.arange(columns.n_states)):
+            mask = block_mask(map_data, block)
+            points = positions[steps]
+            inside = np.all((points >= 0) & (points < mask.shape), axis=1)
+            in_view[steps[inside]] = view_filter(mask, radius)[points[inside, 0], points[inside, 1]]
+            # positions off the map can still see its edge
+            for step, point in zip(steps[~inside], points[~inside]):
+                in_view[step] = window(mask, point, radius).any()
+        return in_view
+
+    return columns.cached(('block_in_view', block, radius), build)
+
+
+def first_block_in_view(game_data, block: Block, radius: Union[int, Tuple[int, int]] = VIEW_RADIUS) -> int:
+    """Return the first state at which `block` is in view of the player, or -1."""
+    in_view = block_in_view(game_data, block, radius)
+    return int(np.argmax(in_view)) if in_view.any() else -1
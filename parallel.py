@@ -0,0 +1,120 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Tuple, Any, Optional, Sequence, Iterator
+from evaluation import CheckerSpec, EvaluationResults, evaluate_episode, list_episodes
+from shared_corpus import SharedCorpus
+
+# Corpora a worker process has attached to, by block name; kept open for the life of the worker
+_attached: Dict[str, SharedCorpus] = {}
+
+
+def _evaluate_chunk(paths: Sequence[str], specs: Sequence[CheckerSpec], record_errors: bool) -> List[Tuple[str, List[Any]]]:
+    # Runs inside a worker: episodes are loaded here, only paths and results cross processes.
+    return [(path, evaluate_episode(path, specs, record_errors)) for path in paths]
+
+
+def _attach_worker(name: str) -> None:
+    # Pool initializer: every worker attaches to the block once, before its first chunk.
+    if name not in _attached:
+        _attached[name] = SharedCorpus.attach(name)
+
+
+def _evaluate_shared_chunk(name: str, positions: Sequence[int], specs: Sequence[CheckerSpec],
+                           record_errors: bool) -> List[Tuple[str, List[Any]]]:
+    # Runs inside a worker: episodes are views into the shared block, only positions and results cross processes.
+    _attach_worker(name)
+    corpus = _attached[name]
+    return [(corpus.paths[position], evaluate_episode(corpus.episode(position), specs, record_errors))
+            for position in positions]
+
+
+def _chunks(paths: Sequence[str], chunk_size: int) -> List[Sequence[str]]:
+    return [paths[start:start + chunk_size] for start in range(0, len(paths), chunk_size)]
+
+
+def iter_evaluate_parallel(paths: Sequence[str], specs: Sequence[CheckerSpec], workers: Optional[int] = None,
+                           chunk_size: Optional[int] = None, record_errors: bool = False) -> Iterator[Tuple[str, List[Any]]]:
+    """
+    Evaluate checker specs over episode files in a process pool, yielding results as they complete.
+
+    Episode paths are sharded into chunks; each worker loads and checks its own episodes,
+    so no `GameData` is ever pickled. Results arrive in completion order.
+
+    Args:
+    - paths (Sequence[str]): Episode files (compressed changes JSON or binary episodes).
+    - specs (Sequence[CheckerSpec]): The checker calls. Their functions must be importable
+      module-level functions so that they can be sent to the workers.
+    - workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+    - chunk_size (int, optional): Episodes per work unit. Defaults to about four units per worker.
+    - record_errors (bool): If True, exceptions are returned as results instead of raised.
+
+    Yields:
+    - Tuple[str, List[Any]]: The episode path and one result per spec.
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_evaluate_chunk, chunk, list(specs), record_errors) for chunk in _chunks(paths, chunk_size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def iter_evaluate_shared(corpus: SharedCorpus, specs: Sequence[CheckerSpec], workers: Optional[int] = None,
+                         chunk_size: Optional[int] = None, record_errors: bool = False) -> Iterator[Tuple[str, List[Any]]]:
+    """
+    Evaluate checker specs over a shared memory corpus in a process pool, yielding results as they complete.
+
+    Workers attach to the corpus block once and read the episodes in place, so memory does
+    not grow with the number of workers.
+
+    Args:
+    - corpus (SharedCorpus): The decoded episodes; it must stay open until the iteration ends.
+    - specs (Sequence[CheckerSpec]): The checker calls, importable module-level functions.
+    - workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+    - chunk_size (int, optional): Episodes per work unit. Defaults to about four units per worker.
+    - record_errors (bool): If True, exceptions are returned as results instead of raised.
+
+    Yields:
+    - Tuple[str, List[Any]]: The episode label and one result per spec.
+    """
+    positions = list(range(len(corpus)))
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, len(positions) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach_worker, initargs=(corpus.name,)) as pool:
+        futures = [pool.submit(_evaluate_shared_chunk, corpus.name, chunk, list(specs), record_errors)
+                   for chunk in _chunks(positions, chunk_size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def evaluate_directory(directory: str, specs: Sequence[CheckerSpec], workers: Optional[int] = None,
+                       chunk_size: Optional[int] = None, record_errors: bool = False,
+                       shared: bool = False) -> EvaluationResults:
+    """
+    Evaluate checker specs over every episode file of a directory in parallel.
+
+    Args:
+    - directory (str): Directory holding `.json` or `.bin` episode files.
+    - specs (Sequence[CheckerSpec]): The checker calls.
+    - workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+    - chunk_size (int, optional): Episodes per work unit.
+    - record_errors (bool): If True, exceptions are stored in the table instead of raised.
+    - shared (bool): If True, the episodes are decoded once in this process into a
+      `SharedCorpus` that all workers read, instead of each worker loading its own share.
+
+    Returns:
+    - EvaluationResults: The episodes-by-checkers results table, rows sorted by path.
+    """
+    if shared:
+        with SharedCorpus.from_directory(directory) as corpus:
+            results = dict(iter_evaluate_shared(corpus, specs, workers, chunk_size, record_errors))
+    else:
+        results = dict(iter_evaluate_parallel(list_episodes(directory), specs, workers, chunk_size, record_errors))
+    table = EvaluationResults(checkers=[spec.label for spec in specs])
+    for path in sorted(results):
+        table.episodes.append(path)
+        table.results.append(results[path])
+    return table
@@ -1,7 +1,44 @@
 from typing import List, Tuple
 from deserialization import GameData
+from columnar import map_edits
+from blocks import block_lookup, block_ids
+from instrumentation import instrumented
+from shapes import cross_template, square_template, line_templates, ShapeTracker
 import numpy as np
 
+@instrumented
+def first_shape_step(game_data: GameData, block_name: str, templates: List[np.ndarray]) -> int:
+    """
+    Find the first step at which any of the templates is formed using the specified block.
+
+    The first map is matched once; after that only the windows around edited cells are
+    re-checked, so the cost follows the number of map edits rather than the trajectory length.
+
+    Args:
+    - game_data (GameData): The game data object containing the map information.
+    - block_name (str): The block to check, by BlockType name or id.
+    - templates (List[np.ndarray]): Boolean patterns, see `shapes.py`.
+
+    Returns:
+    - int: The first step with a match, or -1 if the shape is never formed.
+    """
+    edits = map_edits(game_data)
+    if edits is None:
+        return -1
+    first_step, first_map, changes = edits
+    lookup = block_lookup(block_name)
+    tracker = ShapeTracker(lookup[block_ids(first_map)], templates)
+    if tracker.found:
+        return first_step
+    for step, rows, cols, blocks in changes:
+        if tracker.update(rows, cols, lookup[block_ids(blocks)]).any():
+            return step
+    return -1
+
+def _is_shape_formed(game_data: GameData, block_name: str, templates: List[np.ndarray]) -> bool:
+    return first_shape_step(game_data, block_name, templates) != -1
+
+@instrumented
 def is_cross_formed(game_data: GameData, block_name: str) -> bool:
     """
     Check if a cross is formed using the specified block.
@@ -13,28 +50,9 @@ def is_cross_formed(game_data: GameData, block_name: str) -> bool:
     Returns:
     - bool: True if a cross is formed using the block, otherwise False.
     """
-    
-    cross_offsets = [
-        (0, 0),  # center
-        (-1, 0), # left
-        (1, 0),  # right
-        (0, -1), # up
-        (0, 1),  # down
-    ]
-    
-    # Iterate over all game states
-    for state in game_data.states:
-        map_data = state.map
-
-        # Find all coordinates of the specified block
-        block_coords = np.argwhere(map_data == block_name)
-
-        for coord in block_coords:
-            if all(tuple(coord + np.array(offset)) in block_coords for offset in cross_offsets):
-                return True
-    
-    return False
+    return _is_shape_formed(game_data, block_name, [cross_template()])
 
+@instrumented
 def is_square_formed(game_data: GameData, block_name: str, size: int = 2) -> bool:
     """
     Check if a square of a given size is formed using the specified block.
@@ -46,28 +64,17 @@ def is_square_formed(game_data: GameData, block_name: str, size: int = 2) -> boo
 
     Returns:
     - bool: True if a square of the specified size is formed using the block, otherwise False.
+
+    Raises:
+    - ValueError: If `size` is less than 1.
     """
-    
-    # Generate all offset pairs for a square of the given size
-    square_offsets = [(i, j) for i in range(size) for j in range(size)]
-    
-    # Iterate over all game states
-    for state in game_data.states:
-        map_data = state.map
-
-        # Find all coordinates of the specified block
-        block_coords = np.argwhere(map_data == block_name)
-
-        for coord in block_coords:
-            if all(tuple(coord + np.array(offset)) in block_coords for offset in square_offsets):
-                return True
-    
-    return False
+    return _is_shape_formed(game_data, block_name, [square_template(size)])
 
 from typing import List, Tuple
 from deserialization import GameData
 import numpy as np
 
+@instrumented
 def is_line_formed(game_data: GameData, block_name: str, length: int, check_diagonal: bool = False) -> bool:
     """
     Check if a line of a given length is formed using the specified block.
@@ -80,28 +87,8 @@ def is_line_formed(game_data: GameData, block_name: str, length: int, check_diag
 
     Returns:
     - bool: True if a line of the specified length is formed using the block, otherwise False.
-    """
 
-    directions = [
-        (1, 0),  # Horizontal
-        (0, 1),  # Vertical
-    ]
-    
-    if check_diagonal:
-        directions.extend([(1, 1),  # Diagonal (top-left to bottom-right)
-                           (1, -1)])  # Diagonal (top-right to bottom-left)
-
-    # Iterate over all game states
-    for state in game_data.states:
-        map_data = state.map
-
-        # Find all coordinates of the specified block
-        block_coords = np.argwhere(map_data == block_name)
-
-        for coord in block_coords:
-            for direction in directions:
-                line_coords = [tuple(coord + np.array(direction) * i) for i in range(length)]
-                if all(tuple(c) in block_coords for c in line_coords):
-                    return True
-    
-    return False
+    Raises:
+    - ValueError: If `length` is less than 1.
+    """
+    return _is_shape_formed(game_data, block_name, line_templates(length, check_diagonal))
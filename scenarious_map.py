@@ -1,16 +1,24 @@
 from typing import List, Tuple
 from deserialization import GameData, achievements_list
-from checkers.base import did_player_go_north, did_player_go_south, did_player_go_east, did_player_go_west
+from checkers.movement import DIRECTIONS, moved_in_direction
+from columnar import iter_distinct_maps
+from blocks import Block, BlockType, PLACEABLE_BLOCKS, block_ids, block_lookup
+from clusters import Clusters, clusters_at
+from visitation import first_visits
+from neighborhood import first_block_in_view
 from math import sqrt
 import numpy as np
-from scipy.ndimage import label
 
 from typing import Tuple
 from math import sqrt
 
 from typing import Tuple
 from math import sqrt
+from memo import memoized
+from instrumentation import instrumented
 
+@instrumented
+@memoized
 def is_object_near_target(game_data: GameData, placed_object_name: str, target_object_name: str, proximity: int = 1) -> Tuple[bool, bool, bool, bool, bool]:
     """
     Check if an object has been placed near a specific target object and in which direction (north, south, east, west).
@@ -28,12 +36,7 @@ def is_object_near_target(game_data: GameData, placed_object_name: str, target_o
     - Tuple[bool, bool, bool, bool, bool]: A tuple indicating (is_near, is_north, is_south, is_east, is_west).
     """
     
-    # List of objects that a player can place in the game
-    placeable_objects = {
-        "CRAFTING_TABLE", "FURNACE", "CHEST", "FOUNTAIN", "ENCHANTMENT_TABLE_FIRE", "ENCHANTMENT_TABLE_ICE", "STONE"
-    }
-    
-    if placed_object_name not in placeable_objects:
+    if placed_object_name not in PLACEABLE_BLOCKS:
         raise ValueError(f"The object '{placed_object_name}' cannot be placed by the player.")
     
     # List of relevant target objects in the game
@@ -45,40 +48,39 @@ def is_object_near_target(game_data: GameData, placed_object_name: str, target_o
     if target_object_name not in relevant_target_objects:
         raise ValueError(f"The object '{target_object_name}' is not considered a relevant target for this check.")
     
-    is_near = False
-    is_north = False
-    is_south = False
-    is_east = False
-    is_west = False
-    
-    # Iterate over all game states
-    for state in game_data.states:
-        map_data = state.map
+    target_lookup = block_lookup(target_object_name)
+    placed_lookup = block_lookup(placed_object_name)
+    is_near = is_north = is_south = is_east = is_west = False
+    
+    # Each distinct map is checked once, comparing block ids
+    for _, map_data in iter_distinct_maps(game_data):
+        map_ids = block_ids(map_data)
+        target_coords = np.argwhere(target_lookup[map_ids])
+        placed_object_coords = np.argwhere(placed_lookup[map_ids])
+        if len(target_coords) == 0 or len(placed_object_coords) == 0:
+            continue
         
-        # Find all coordinates of the target object
-        target_coords = np.argwhere(map_data == target_object_name)
-        
-        # Find all coordinates of the placed object
-        placed_object_coords = np.argwhere(map_data == placed_object_name)
-        
-        # Check if any placed object is within the specified proximity of any target object
-        for target_coord in target_coords:
-            for placed_coord in placed_object_coords:
-                distance = sqrt((target_coord[0] - placed_coord[0]) ** 2 + (target_coord[1] - placed_coord[1]) ** 2)
-                if distance <= proximity:
-                    is_near = True
-                    if placed_coord[0] < target_coord[0]:
-                        is_north = True
-                    if placed_coord[0] > target_coord[0]:
-                        is_south = True
-                    if placed_coord[1] > target_coord[1]:
-                        is_east = True
-                    if placed_coord[1] < target_coord[1]:
-                        is_west = True
+        # (placed, target) offsets of every pair within the proximity
+        offsets = placed_object_coords[:, None, :] - target_coords[None, :, :]
+        offsets = offsets[(offsets ** 2).sum(axis=-1) <= proximity * proximity]
+        if len(offsets):
+            is_near = True
+            is_north |= bool((offsets[:, 0] < 0).any())
+            is_south |= bool((offsets[:, 0] > 0).any())
+            is_east |= bool((offsets[:, 1] > 0).any())
+            is_west |= bool((offsets[:, 1] < 0).any())
     
     return is_near, is_north, is_south, is_east, is_west
 
 
+def _all_clusters_visited(game_data: GameData, clusters: Clusters, selected: np.ndarray, required_object: str = None) -> bool:
+    # The player must have come within 1 block of every selected cluster (with the object next to it, if required)
+    visits = first_visits(game_data, clusters, radius=1, required_block=required_object)
+    return bool(np.all(visits[selected] >= 0))
+
+
+@instrumented
+@memoized
 def is_player_within_all_water_sources(game_data: GameData, required_object: str = None) -> bool:
     """
     Check if the player has been within the bounds of all water clusters across all game states.
@@ -90,31 +92,14 @@ def is_player_within_all_water_sources(game_data: GameData, required_object: str
     Returns:
     - bool: True if the player has been within all water clusters at some point and the object is present, False otherwise.
     """
-    water_clusters = find_clusters(game_data)
-
-    # Iterate over all game states
-    for state in game_data.states:
-        player_position = state.variables.player_position
-
-        # Check if the player has been within any water cluster
-        for cluster in water_clusters:
-            within_cluster = any(sqrt((x - player_position[0])**2 + (y - player_position[1])**2) <= 1 for (x, y) in cluster)
-            if within_cluster:
-                # Optional check for required object near the cluster
-                if required_object:
-                    object_nearby = any(required_object in state.map.look_around((x, y)) for (x, y) in cluster)
-                    if not object_nearby:
-                        continue
-                water_clusters.remove(cluster)  # Remove the cluster if the player has been within it
-
-        # If all clusters have been covered, return True
-        if not water_clusters:
-            return True
-
-    # If there are any remaining clusters, return False
-    return False
+    clusters = clusters_at(game_data, BlockType.WATER)
+    if clusters is None:
+        return False
+    return _all_clusters_visited(game_data, clusters, np.ones(clusters.count, dtype=np.bool_), required_object)
 
 
+@instrumented
+@memoized
 def is_player_within_north_water_sources(game_data: GameData, required_object: str = None) -> bool:
     """
     Check if the player has been within the bounds of all water clusters in the northern part of the map across all game states.
@@ -127,37 +112,17 @@ def is_player_within_north_water_sources(game_data: GameData, required_object: s
     Returns:
     - bool: True if the player has been within all northern water clusters at some point and the object is present, False otherwise.
     """
-    water_clusters = find_clusters(game_data)
-    map_height = game_data.states[0].map.shape[0]
-    mid_latitude = map_height // 2
-
-    # Filter clusters to only those in the northern part of the map
-    north_water_clusters = [
-        cluster for cluster in water_clusters if all(y < mid_latitude for (x, y) in cluster)
-    ]
-
-    # Iterate over all game states
-    for state in game_data.states:
-        player_position = state.variables.player_position
-
-        # Check if the player has been within any northern water cluster
-        for cluster in north_water_clusters:
-            within_cluster = any(sqrt((x - player_position[0])**2 + (y - player_position[1])**2) <= 1 for (x, y) in cluster)
-            if within_cluster:
-                # Optional check for required object near the cluster
-                if required_object:
-                    object_nearby = any(required_object in state.map.look_around((x, y)) for (x, y) in cluster)
-                    if not object_nearby:
-                        continue
-                north_water_clusters.remove(cluster)  # Remove the cluster if the player has been within it
-
-        # If all northern clusters have been covered, return True
-        if not north_water_clusters:
-            return True
-
-    # If there are any remaining northern clusters, return False
-    return False
+    clusters = clusters_at(game_data, BlockType.WATER)
+    if clusters is None:
+        return False
+    mid_latitude = clusters.labels.shape[0] // 2
 
+    # Keep only the clusters in the northern part of the map (every cell with y < mid_latitude)
+    north_water_clusters = clusters.boxes[:, 3] <= mid_latitude
+    return _all_clusters_visited(game_data, clusters, north_water_clusters, required_object)
+
+@instrumented
+@memoized
 def is_player_within_south_water_sources(game_data: GameData, required_object: str = None) -> bool:
     """
     Check if the player has been within the bounds of all water clusters in the southern part of the map across all game states.
@@ -170,57 +135,28 @@ def is_player_within_south_water_sources(game_data: GameData, required_object: s
     Returns:
     - bool: True if the player has been within all southern water clusters at some point and the object is present, False otherwise.
     """
-    water_clusters = find_clusters(game_data)
-    map_height = game_data.states[0].map.shape[0]
-    mid_latitude = map_height // 2
-
-    # Filter clusters to only those in the southern part of the map
-    south_water_clusters = [
-        cluster for cluster in water_clusters if all(y >= mid_latitude for (x, y) in cluster)
-    ]
-
-    # Iterate over all game states
-    for state in game_data.states:
-        player_position = state.variables.player_position
-
-        # Check if the player has been within any southern water cluster
-        for cluster in south_water_clusters:
-            within_cluster = any(sqrt((x - player_position[0])**2 + (y - player_position[1])**2) <= 1 for (x, y) in cluster)
-            if within_cluster:
-                # Optional check for required object near the cluster
-                if required_object:
-                    object_nearby = any(required_object in state.map.look_around((x, y)) for (x, y) in cluster)
-                    if not object_nearby:
-                        continue
-                south_water_clusters.remove(cluster)  # Remove the cluster if the player has been within it
-
-        # If all southern clusters have been covered, return True
-        if not south_water_clusters:
-            return True
-
-    # If there are any remaining southern clusters, return False
-    return False
+    clusters = clusters_at(game_data, BlockType.WATER)
+    if clusters is None:
+        return False
+    mid_latitude = clusters.labels.shape[0] // 2
 
+    # Keep only the clusters in the southern part of the map (every cell with y >= mid_latitude)
+    south_water_clusters = clusters.boxes[:, 1] >= mid_latitude
+    return _all_clusters_visited(game_data, clusters, south_water_clusters, required_object)
 
 
-def find_clusters(game_data: GameData, object_index:int=3):
-    # Extract the map data
-    map_data = game_data.states[0].map
-    OBJECT=object_index
-    # Identify water blocks (BlockType.WATER.value = 3)
-    water_mask = (map_data == OBJECT)
-
-    # Label connected clusters of water blocks
-    labeled_array, num_features = label(water_mask)
-
-    # Extract the coordinates of each cluster
-    clusters = []
-    for cluster_id in range(1, num_features + 1):
-        cluster_coords = np.argwhere(labeled_array == cluster_id)
-        clusters.append(cluster_coords.tolist())
-    return clusters
+@instrumented
+@memoized
+def find_clusters(game_data: GameData, object_index: Block = BlockType.WATER):
+    # Clusters of the first map are labelled once per episode and block type (water by default)
+    clusters = clusters_at(game_data, object_index)
+    if clusters is None:
+        return []
+    return [cells.tolist() for cells in clusters.coordinates()]
 
 
+@instrumented
+@memoized
 def if_go_in_direction_until_find_block(game_data: GameData, block_name: str, direction: str) -> bool:
     """
     Check if player goes in the specified direction until finding block_name.
@@ -237,18 +173,11 @@ def if_go_in_direction_until_find_block(game_data: GameData, block_name: str, di
     Returns:
     - bool: True if done, otherwise False.
     """
-    direction_map = {
-        "north": did_player_go_north,
-        "south": did_player_go_south,
-        "east": did_player_go_east,
-        "west": did_player_go_west
-    }
-
-    if direction not in direction_map:
+    if direction not in DIRECTIONS:
         raise ValueError(f"Invalid direction: {direction}")
 
-    for index, state in enumerate(game_data.states):
-        if block_name in state.map.look_around(state.variables.player_position):
-            return direction_map[direction](game_data, 0, index)
-    
-    return False
+    # First state with the block in the player's view, from the precomputed view mask
+    index = first_block_in_view(game_data, block_name)
+    if index == -1:
+        return False
+    return moved_in_direction(game_data, direction, 0, index)
@@ -1,12 +1,16 @@
 from typing import List, Tuple
 from deserialization import GameData, achievements_list
-from checkers.base import is_variable_increasing, check_achievement_inventory_radius, was_item_placed
+from checkers.base import is_variable_increasing, check_achievement_inventory_near_any, was_item_placed
 from math import sqrt
+from memo import memoized
+from instrumentation import instrumented
+import temporal
 
 
 
+@instrumented
+@memoized
 def was_item_collected_after_another(game_data: GameData, first_item: str, second_item: str) -> bool:
-    ### WRONG!!!
     """
     Check if `second_item` was collected after `first_item`.
     
@@ -18,22 +22,16 @@ def was_item_collected_after_another(game_data: GameData, first_item: str, secon
     Returns:
     - bool: True if `second_item` was collected after `first_item`, otherwise False.
     """
-    first_item_collected = False
-    first_item_index = None
-
-    for index, state in enumerate(game_data.states):
-        inventory = state.inventory
-
-        if not first_item_collected:
-            if getattr(inventory, first_item, 0) > 0:
-                first_item_collected = True
-                first_item_index = index
-        elif getattr(inventory, second_item, 0) > 0 and first_item_index is not None:
-            return index > first_item_index
-
-    return False
+    # An item is collected when its count goes up; the second collection must come strictly later
+    collected_in_order = temporal.item(first_item).collected().then(temporal.item(second_item).collected())
+    try:
+        return collected_in_order.ever(game_data)
+    except ValueError:
+        return False
 
 
+@instrumented
+@memoized
 def did_placing_item_increase_variable(game_data: GameData, item: str, variable_name: str) -> bool:
     """
     Check if placing `item` caused an increase in `variable_name`.
@@ -49,17 +47,19 @@ def did_placing_item_increase_variable(game_data: GameData, item: str, variable_
     """
     try:
         # Identify the state where the item was placed
-        place_index = was_item_placed(game_data, item, 0, len(game_data.states), verbose=True)
-        if not place_index:  # If item was not placed, return False
+        place_step = temporal.placed(item).first(game_data)
+        if place_step == -1:  # If item was not placed, return False
             return False
-        
-        # Check if the variable increased after the item was placed
-        return is_variable_increasing(game_data, variable_name, place_index[0], place_index[0] + 1)
+
+        # Check if the variable increased when the item was placed
+        return temporal.variable(variable_name).increased().holds(game_data, place_step)
     except ValueError as e:
         print(f"Error: {e}")
         return False
 
 
+@instrumented
+@memoized
 def was_item_placed_near_another(game_data: GameData, first_item: str, second_item: str) -> bool:
     """
     Check if `second_item` was placed near `first_item`.
@@ -75,20 +75,19 @@ def was_item_placed_near_another(game_data: GameData, first_item: str, second_it
     try:
         # Identify the state where the first item was placed
         first_item_placement_index = was_item_placed(game_data, first_item, 0, len(game_data.states), verbose=True)
-        if not first_item_placement_index:  # If the first item was not placed, return False
+        if first_item_placement_index is False:  # If the first item was not placed, return False
             return False
-        
+
         # Check if the second item was placed near the first item
-        for index in first_item_placement_index:
-            # Assuming `check_achievement_inventory_radius` function can be used to check proximity
-            if check_achievement_inventory_radius(game_data, game_data.states[index].variables.player_position, 1, item_name=second_item):
-                return True
-        return False
+        positions = [game_data.states[first_item_placement_index].variables.player_position]
+        return check_achievement_inventory_near_any(game_data, positions, 1, item_name=second_item)
     except ValueError as e:
         print(f"Error: {e}")
         return False
 
 
+@instrumented
+@memoized
 def is_item_in_closed_contour(game_data: GameData, first_item: str, second_item: str) -> bool:
     """
     Check if `first_item` is placed within a closed contour formed by `second_item`.
@@ -104,17 +103,12 @@ def is_item_in_closed_contour(game_data: GameData, first_item: str, second_item:
     try:
         # Identify the state where the first item was placed
         first_item_placement_index = was_item_placed(game_data, first_item, 0, len(game_data.states), verbose=True)
-        if not first_item_placement_index:  # If the first item was not placed, return False
+        if first_item_placement_index is False:  # If the first item was not placed, return False
             return False
 
         # Check if the first item is within a closed contour formed by the second item
-        for index in first_item_placement_index:
-            first_item_position = game_data.states[index].variables.player_position
-
-            # Assuming we have a function that checks if a point is within a polygon
-            if is_point_within_polygon(first_item_position, game_data, second_item):
-                return True
-        return False
+        first_item_position = game_data.states[first_item_placement_index].variables.player_position
+        return is_point_within_polygon(first_item_position, game_data, second_item)
     except ValueError as e:
         print(f"Error: {e}")
         return False
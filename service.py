@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import importlib
+import json
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Any, Optional, Sequence, Callable, FrozenSet, Set
+import numpy as np
+from evaluation import CheckerSpec, evaluate_episode
+from live_episode import LiveEpisode
+from instrumentation import timer
+
+# Modules whose public functions clients may register by name
+CHECKER_MODULES: Tuple[str, ...] = (
+    'checkers.base', 'checkers.achivments', 'scenarius', 'scenarious_map', 'scenarios_building',
+)
+
+
+def resolve_checker(name: str) -> Callable:
+    """
+    Find a checker function by name, e.g. `find_item_in_inventory` or `scenarius.was_item_placed_near_another`.
+
+    Only public functions of `CHECKER_MODULES` can be resolved.
+
+    Raises:
+    - ValueError: If no such checker exists.
+    """
+    module_name, _, function_name = name.rpartition('.')
+    if not function_name.startswith('_'):
+        for candidate in ([module_name] if module_name else CHECKER_MODULES):
+            if candidate not in CHECKER_MODULES:
+                continue
+            function = getattr(importlib.import_module(candidate), function_name, None)
+            if callable(function):
+                return function
+    raise ValueError(f"Unknown checker '{name}'.")
+
+
+# What the verdict of a public checker reads, for the checkers whose verdict cannot change
+# when a state identical to the last one is appended. Every other checker also depends on `steps`.
+CHECKER_DEPENDENCIES: Dict[str, FrozenSet[str]] = {
+    'validate_game_achievements': frozenset({'achievements'}),
+    'was_item_collected_after_another': frozenset({'inventory'}),
+    'did_placing_item_increase_variable': frozenset({'actions', 'inventory', 'variables'}),
+    'find_clusters': frozenset({'map'}),
+    'first_shape_step': frozenset({'map'}),
+    'is_cross_formed': frozenset({'map'}),
+    'is_square_formed': frozenset({'map'}),
+    'is_line_formed': frozenset({'map'}),
+}
+
+
+def watch_dependencies(function: Callable, depends_on: Optional[Sequence[str]] = None) -> Optional[FrozenSet[str]]:
+    """
+    Dependencies of a watch on `function`: the declared ones merged with those known for the checker.
+
+    A checker missing from `CHECKER_DEPENDENCIES` is also re-evaluated whenever states are
+    appended, since its verdict may list or count states; with nothing declared it is
+    re-evaluated after every step.
+
+    Args:
+    - function (Callable): The checker.
+    - depends_on (Sequence[str], optional): Dependencies declared by the caller.
+
+    Returns:
+    - FrozenSet[str], optional: The dependencies, or None for every step.
+    """
+    known = CHECKER_DEPENDENCIES.get(getattr(function, '__name__', ''))
+    if known is not None:
+        return known | frozenset(depends_on or ())
+    if depends_on is None:
+        return None
+    return frozenset(depends_on) | {'steps'}
+
+
+@dataclass(frozen=True)
+class Watch:
+    """
+    A checker call kept up to date on a live episode.
+
+    Attributes:
+    - spec (CheckerSpec): The checker call.
+    - depends_on (FrozenSet[str], optional): What the verdict reads, in the terms reported by
+      `LiveEpisode.apply`: `steps`, `actions`, `achievements`, `map`, `variables/<name>`,
+      `inventory/<item>`, or a whole group such as `inventory`. The checker is re-evaluated
+      only after a step that touches one of them. None re-evaluates it after every step.
+    """
+    spec: CheckerSpec
+    depends_on: Optional[FrozenSet[str]] = None
+
+    @staticmethod
+    def of(function: Callable, *args, depends_on: Optional[Sequence[str]] = None,
+           name: Optional[str] = None, **kwargs) -> 'Watch':
+        """
+        Build a watch from a call signature, e.g. `Watch.of(find_item_in_inventory, 'wood', depends_on=['inventory/wood'])`.
+
+        The declared dependencies go through `watch_dependencies`, so the watch above is also
+        re-evaluated when states are appended: its verdict lists steps.
+        """
+        return Watch(CheckerSpec.of(function, *args, name=name, **kwargs), watch_dependencies(function, depends_on))
+
+    def affected(self, touched: Set[str]) -> bool:
+        if self.depends_on is None:
+            return bool(touched)
+        return any(key in self.depends_on or key.partition('/')[0] in self.depends_on for key in touched)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, Exception):
+        return {'error': f'{type(value).__name__}: {value}'}
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_jsonable(item) for item in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+class EpisodeSession:
+    """
+    A live episode with its watches and their last verdicts.
+
+    Attributes:
+    - episode (LiveEpisode): The game data received so far.
+    - watches (List[Watch]): The checkers kept up to date.
+    - verdicts (Dict[str, Any]): Last verdict of every evaluated watch, by label.
+    """
+
+    def __init__(self, watches: Sequence[Watch] = ()):
+        self.episode = LiveEpisode()
+        self.watches: List[Watch] = list(watches)
+        self.verdicts: Dict[str, Any] = {}
+        # watches added since the last evaluation, run on the next step whatever it touches
+        self._pending: Set[str] = {watch.spec.label for watch in self.watches}
+
+    def register(self, watch: Watch) -> Dict[str, Any]:
+        """Add a watch; it is evaluated at once when states were already received."""
+        self.watches = [existing for existing in self.watches if existing.spec.label != watch.spec.label] + [watch]
+        self._pending.add(watch.spec.label)
+        return self._evaluate([watch]) if self.episode.n_states else {}
+
+    def step(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply a delta and re-evaluate the watches it affects.
+
+        Returns:
+        - Dict[str, Any]: The new verdict of every re-evaluated watch, by label.
+        """
+        with timer('service/apply'):
+            touched = self.episode.apply(changes)
+        if not self.episode.n_states:
+            return {}
+        return self._evaluate([
+            watch for watch in self.watches
+            if watch.spec.label in self._pending or watch.affected(touched)
+        ])
+
+    def _evaluate(self, watches: Sequence[Watch]) -> Dict[str, Any]:
+        if not watches:
+            return {}
+        results = evaluate_episode(self.episode.game_data, [watch.spec for watch in watches], record_errors=True)
+        verdicts = {watch.spec.label: result for watch, result in zip(watches, results)}
+        self.verdicts.update(verdicts)
+        self._pending.difference_update(verdicts)
+        return verdicts
+
+
+class EvaluationService:
+    """
+    Keeps checker verdicts of live episodes up to date from streamed step deltas.
+
+    Clients speak newline-delimited JSON. Every message is an object with an `op` and an
+    `episode` id, plus an optional `id` echoed in the reply:
+
+    - `{"op": "register", "episode": "e1", "checker": "find_item_in_inventory", "args": ["wood"],
+      "kwargs": {}, "name": "wood", "depends_on": ["inventory/wood"]}` adds a watch to the episode.
+      `depends_on` is optional and merged with the server-side table (see `watch_dependencies`).
+    - `{"op": "step", "episode": "e1", "changes": {"variables": {"timestep": {"7": 7}}, "actions": {"7": "w"}}}`
+      merges a delta in the compressed changes schema.
+    - `{"op": "end", "episode": "e1"}` returns every verdict and forgets the episode.
+
+    Replies are `{"episode": ..., "step": ..., "verdicts": {...}}` holding the verdicts that
+    were just evaluated, or `{"error": ...}`. Episodes are created on first use and start
+    with the service-wide watches.
+
+    Checkers run in `executor`, off the event loop, so a slow watch only holds up its own
+    episode. Requests of one episode are processed in arrival order; replies to different
+    episodes sent on the same connection may come back in any order.
+
+    Args:
+    - watches (Sequence[Watch]): Watches added to every episode.
+    - executor (Executor, optional): Where requests are processed. Defaults to a thread pool.
+    - max_in_flight (int): Requests of one connection processed at the same time; reading
+      from the connection pauses beyond that.
+    """
+
+    def __init__(self, watches: Sequence[Watch] = (), executor: Optional[Executor] = None, max_in_flight: int = 64):
+        self.watches = list(watches)
+        self.sessions: Dict[str, EpisodeSession] = {}
+        self.executor = executor or ThreadPoolExecutor(thread_name_prefix='checkers')
+        self.max_in_flight = max_in_flight
+        # one lock per episode with requests in flight; dropped once no request holds it
+        self._locks: 'weakref.WeakValueDictionary[str, asyncio.Lock]' = weakref.WeakValueDictionary()
+
+    def session(self, episode: str) -> EpisodeSession:
+        if episode not in self.sessions:
+            self.sessions[episode] = EpisodeSession(self.watches)
+        return self.sessions[episode]
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process one request and build its reply.
+
+        Args:
+        - message (Dict[str, Any]): The decoded request.
+
+        Returns:
+        - Dict[str, Any]: The reply.
+        """
+        reply: Dict[str, Any] = {'id': message['id']} if 'id' in message else {}
+        try:
+            operation, episode = message.get('op'), str(message['episode'])
+            reply['episode'] = episode
+            if operation == 'register':
+                function = resolve_checker(message['checker'])
+                depends_on = message.get('depends_on')
+                watch = Watch.of(function, *message.get('args', []), name=message.get('name'),
+                                 depends_on=depends_on, **message.get('kwargs', {}))
+                session = self.session(episode)
+                reply['registered'] = watch.spec.label
+                verdicts = session.register(watch)
+            elif operation == 'step':
+                session = self.session(episode)
+                verdicts = session.step(message.get('changes') or {})
+            elif operation == 'end':
+                session = self.sessions.pop(episode, None) or EpisodeSession()
+                verdicts = session.verdicts
+                reply['closed'] = True
+            else:
+                raise ValueError(f"Unknown operation '{operation}'.")
+            reply['step'] = session.episode.n_states - 1
+            reply['verdicts'] = _jsonable(verdicts)
+        except Exception as error:  # a bad request must not take the connection down
+            reply['error'] = f'{type(error).__name__}: {error}'
+        return reply
+
+    async def handle_async(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Process one request in the executor, after the earlier requests of its episode."""
+        key = str(message.get('episode'))
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        async with lock:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self.handle, message)
+
+    async def _reply(self, message: Dict[str, Any], writer: asyncio.StreamWriter, slots: asyncio.Semaphore) -> None:
+        try:
+            reply = await self.handle_async(message)
+            writer.write(json.dumps(reply).encode('utf-8') + b'\n')
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            slots.release()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one client: one reply line per request line."""
+        slots = asyncio.Semaphore(self.max_in_flight)
+        pending: Set[asyncio.Task] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError as error:
+                    message = None
+                    reply = {'error': f'JSONDecodeError: {error}'}
+                else:
+                    if not isinstance(message, dict):
+                        message, reply = None, {'error': 'Expected a JSON object.'}
+                if message is None:
+                    writer.write(json.dumps(reply).encode('utf-8') + b'\n')
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(self._reply(message, writer, slots))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # server shutdown: drop the replies still pending (requests already in the executor
+            # finish on their own), then let the cancellation through
+            for task in pending:
+                task.cancel()
+            raise
+        finally:
+            writer.close()
+
+    async def serve(self, path: Optional[str] = None, host: str = '127.0.0.1', port: int = 8765) -> None:
+        """
+        Accept clients until cancelled, on a Unix socket if `path` is given, otherwise over TCP.
+
+        Args:
+        - path (str, optional): Path of the Unix socket.
+        - host (str): TCP address to bind.
+        - port (int): TCP port.
+        """
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path=path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host=host, port=port)
+        async with server:
+            await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Serve checker verdicts for live episodes over NDJSON.')
+    parser.add_argument('--socket', help='Unix socket path; TCP is used when omitted.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(EvaluationService().serve(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
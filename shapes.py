@@ -0,0 +1,156 @@
+from typing import List, Dict, Tuple, Iterable, Sequence
+import numpy as np
+
+# (row, col) steps of the four line directions; the last two are the diagonals
+LINE_DIRECTIONS: List[Tuple[int, int]] = [(1, 0), (0, 1), (1, 1), (1, -1)]
+
+
+def stencil(offsets: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """
+    Turn a set of (row, col) offsets into a boolean template.
+
+    Args:
+    - offsets (Iterable[Tuple[int, int]]): Cells of the pattern relative to any anchor; negative
+      offsets are allowed.
+
+    Returns:
+    - np.ndarray: Smallest boolean array holding the pattern.
+
+    Raises:
+    - ValueError: If there are no offsets.
+    """
+    offsets = np.asarray(list(offsets), dtype=np.int64).reshape(-1, 2)
+    if len(offsets) == 0:
+        raise ValueError("A stencil needs at least one cell.")
+    offsets -= offsets.min(axis=0)
+    template = np.zeros(tuple(offsets.max(axis=0) + 1), dtype=np.bool_)
+    template[offsets[:, 0], offsets[:, 1]] = True
+    return template
+
+
+def cross_template() -> np.ndarray:
+    """3x3 plus sign: a center and its four neighbours."""
+    return stencil([(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)])
+
+
+def square_template(size: int = 2) -> np.ndarray:
+    """Filled `size` x `size` square; `size` must be at least 1."""
+    if size < 1:
+        raise ValueError(f"The size of a square must be at least 1, got {size}.")
+    return np.ones((size, size), dtype=np.bool_)
+
+
+def line_templates(length: int, check_diagonal: bool = False) -> List[np.ndarray]:
+    """
+    Straight lines of `length` cells.
+
+    Args:
+    - length (int): The number of cells in the line.
+    - check_diagonal (bool): If True, the two diagonal directions are included as well.
+
+    Returns:
+    - List[np.ndarray]: Horizontal and vertical templates, then the diagonal ones if requested.
+
+    Raises:
+    - ValueError: If `length` is less than 1.
+    """
+    if length < 1:
+        raise ValueError(f"The length of a line must be at least 1, got {length}.")
+    directions = LINE_DIRECTIONS if check_diagonal else LINE_DIRECTIONS[:2]
+    return [stencil([(i * d_row, i * d_col) for i in range(length)]) for d_row, d_col in directions]
+
+
+def match_windows(mask: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """
+    Find every placement of `template` whose cells are all set in `mask`.
+
+    The windows are evaluated together: the mask is AND-ed with itself shifted once per
+    template cell, which is a sliding-window erosion over the whole map.
+
+    Args:
+    - mask (np.ndarray): Boolean map of the cells holding the block.
+    - template (np.ndarray): Boolean pattern.
+
+    Returns:
+    - np.ndarray: Boolean array of shape (rows - h + 1, cols - w + 1); True at the top-left
+      corner of every full match. Empty if the template does not fit in the map.
+    """
+    height, width = template.shape
+    rows, cols = mask.shape[0] - height + 1, mask.shape[1] - width + 1
+    if rows <= 0 or cols <= 0:
+        return np.zeros((max(rows, 0), max(cols, 0)), dtype=np.bool_)
+    matches = np.ones((rows, cols), dtype=np.bool_)
+    for d_row, d_col in zip(*np.nonzero(template)):
+        matches &= mask[d_row:d_row + rows, d_col:d_col + cols]
+    return matches
+
+
+def contains_shape(mask: np.ndarray, templates: Sequence[np.ndarray]) -> bool:
+    """
+    Check if any of `templates` fully matches somewhere in `mask`.
+
+    Args:
+    - mask (np.ndarray): Boolean map of the cells holding the block.
+    - templates (Sequence[np.ndarray]): Boolean patterns.
+
+    Returns:
+    - bool: True if at least one template matches.
+    """
+    return any(match_windows(mask, template).any() for template in templates)
+
+
+class ShapeTracker:
+    """
+    Keeps the number of matches of every template while the map is edited.
+
+    An edit of cell (row, col) can only change windows whose anchor is (row, col) minus one of
+    the template cells, so an update re-checks those few windows before and after the edit
+    instead of matching the whole map again.
+
+    Attributes:
+    - mask (np.ndarray): Current boolean map of the cells holding the block.
+    - counts (np.ndarray): Current number of matches of every template.
+    """
+
+    def __init__(self, mask: np.ndarray, templates: Sequence[np.ndarray]):
+        self.mask = np.array(mask, dtype=np.bool_)
+        self._offsets = [np.argwhere(template) for template in templates]
+        self._limits = [np.subtract(self.mask.shape, template.shape) for template in templates]
+        self.counts = np.array([match_windows(self.mask, template).sum() for template in templates], dtype=np.int64)
+
+    @property
+    def found(self) -> bool:
+        """True if at least one template currently matches."""
+        return bool(self.counts.any())
+
+    def update(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Set mask cells and refresh the match counts.
+
+        Args:
+        - rows (np.ndarray): Rows of the edited cells.
+        - cols (np.ndarray): Columns of the edited cells.
+        - values (np.ndarray): New boolean value of every edited cell; the last write to a cell wins.
+
+        Returns:
+        - np.ndarray: The updated counts.
+        """
+        cells = np.stack([np.asarray(rows, dtype=np.int64).reshape(-1), np.asarray(cols, dtype=np.int64).reshape(-1)], axis=1)
+        if len(cells) == 0:
+            return self.counts
+        anchors = [self._anchors(cells, i) for i in range(len(self._offsets))]
+        before = [self._matches(a, i) for i, a in enumerate(anchors)]
+        self.mask[cells[:, 0], cells[:, 1]] = np.asarray(values, dtype=np.bool_).reshape(-1)
+        for i, a in enumerate(anchors):
+            self.counts[i] += int(self._matches(a, i).sum()) - int(before[i].sum())
+        return self.counts
+
+    def _anchors(self, cells: np.ndarray, template: int) -> np.ndarray:
+        # every window anchor covering one of the cells, kept once and inside the map
+        anchors = (cells[:, None, :] - self._offsets[template][None, :, :]).reshape(-1, 2)
+        inside = np.all((anchors >= 0) & (anchors <= self._limits[template]), axis=1)
+        return np.unique(anchors[inside], axis=0)
+
+    def _matches(self, anchors: np.ndarray, template: int) -> np.ndarray:
+        cells = anchors[:, None, :] + self._offsets[template][None, :, :]
+        return self.mask[cells[..., 0], cells[..., 1]].all(axis=1)
@@ -0,0 +1,215 @@
+import json
+import struct
+import sys
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Dict, Tuple, Any, Optional, Sequence, Iterator, Set
+import numpy as np
+from columnar import ColumnarGameData
+from evaluation import load_episode, list_episodes
+from instrumentation import timed, timer
+
+# Block layout:
+#   magic (8 bytes) | header length (uint32) | header (UTF-8 JSON) | column blocks
+# The header is the offset table: for every episode its path, its `to_columns` metadata and
+# the dtype, shape and byte offset (relative to the first block) of each of its columns.
+MAGIC = b'CRAFTSHM'
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sI')
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# Blocks created by this process; its resource tracker already holds their entries
+_created: Set[str] = set()
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to a block without leaving it to the resource tracker of this process.
+
+    Only the owner may be tracked: a tracker unlinks the blocks still registered with it
+    when its processes exit. From Python 3.13 attaching skips the tracker. Before, attaching
+    always registers the block, which is undone here only when the tracker is private to
+    this process: multiprocessing children (forked or spawned) share the tracker of their
+    parent, where the entry is the owner's own, and so does the owner attaching to its
+    block. Children of a process that does not own the block keep the entry in their
+    parent's tracker, so on Python < 3.13 they should be started by the owner.
+
+    Args:
+    - name (str): Name of the shared memory block.
+
+    Returns:
+    - SharedMemory: The attached block.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    memory = shared_memory.SharedMemory(name=name)
+    if multiprocessing.parent_process() is None and memory.name not in _created:
+        resource_tracker.unregister(memory._name, 'shared_memory')
+    return memory
+
+
+class SharedCorpus:
+    """
+    A corpus of decoded episodes stored once in a `multiprocessing.shared_memory` block.
+
+    The process that builds the corpus owns the block; worker processes `attach` to it by
+    name and get read-only `ColumnarGameData` whose columns are views into the block, so
+    any number of workers share a single copy of the data.
+
+    Episodes taken from a closed corpus stay readable until they are dropped.
+
+    Attributes:
+    - name (str): Name of the shared memory block, used by `attach`.
+    - paths (List[str]): Episode labels, in corpus order.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool = False):
+        self._memory = memory
+        self._owner = owner
+        magic, header_length = _PREAMBLE.unpack(bytes(memory.buf[:_PREAMBLE.size]))
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory block '{memory.name}' does not hold an episode corpus.")
+        header = json.loads(bytes(memory.buf[_PREAMBLE.size:_PREAMBLE.size + header_length]).decode('utf-8'))
+        self._data_start = _align(_PREAMBLE.size + header_length)
+        self._episodes: List[Dict[str, Any]] = header['episodes']
+        self.paths: List[str] = [episode['path'] for episode in self._episodes]
+        self._index = {path: position for position, path in enumerate(self.paths)}
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @staticmethod
+    @timed('load/shared')
+    def create(episodes: Sequence[Tuple[str, ColumnarGameData]], name: Optional[str] = None) -> 'SharedCorpus':
+        """
+        Copy decoded episodes into a new shared memory block.
+
+        Args:
+        - episodes (Sequence[Tuple[str, ColumnarGameData]]): (label, columns) of every episode.
+        - name (str, optional): Name of the block; a random one is chosen by default.
+
+        Returns:
+        - SharedCorpus: The corpus, owning the block.
+        """
+        tables, blocks, offset = [], [], 0
+        for path, columns in episodes:
+            arrays, metadata = columns.to_columns()
+            entries = []
+            for column_name, column in arrays.items():
+                column = np.ascontiguousarray(column)
+                entries.append({
+                    'name': column_name,
+                    'dtype': column.dtype.str,
+                    'shape': list(column.shape),
+                    'offset': offset,
+                })
+                blocks.append((offset, column))
+                offset = _align(offset + column.nbytes)
+            tables.append({'path': path, 'metadata': metadata, 'columns': entries})
+        header = json.dumps({'episodes': tables}).encode('utf-8')
+        data_start = _align(_PREAMBLE.size + len(header))
+
+        memory = shared_memory.SharedMemory(name=name, create=True, size=max(data_start + offset, 1))
+        _created.add(memory.name)
+        memory.buf[:_PREAMBLE.size] = _PREAMBLE.pack(MAGIC, len(header))
+        memory.buf[_PREAMBLE.size:_PREAMBLE.size + len(header)] = header
+        for block_offset, column in blocks:
+            start = data_start + block_offset
+            memory.buf[start:start + column.nbytes] = column.reshape(-1).view(np.uint8)
+        return SharedCorpus(memory, owner=True)
+
+    @staticmethod
+    def from_paths(paths: Sequence[str], name: Optional[str] = None) -> 'SharedCorpus':
+        """
+        Decode episode files once and copy them into a new shared memory block.
+
+        Args:
+        - paths (Sequence[str]): Episode files (compressed changes JSON or binary episodes).
+        - name (str, optional): Name of the block.
+
+        Returns:
+        - SharedCorpus: The corpus, owning the block.
+        """
+        return SharedCorpus.create([(path, load_episode(path)) for path in paths], name)
+
+    @staticmethod
+    def from_directory(directory: str, name: Optional[str] = None) -> 'SharedCorpus':
+        """Decode every episode file of a directory into a new shared memory block."""
+        return SharedCorpus.from_paths(list_episodes(directory), name)
+
+    @staticmethod
+    def attach(name: str) -> 'SharedCorpus':
+        """
+        Open a corpus created by another process, without copying it.
+
+        Args:
+        - name (str): Name of the shared memory block.
+
+        Returns:
+        - SharedCorpus: The corpus; closing it leaves the block in place.
+        """
+        return SharedCorpus(_attach_untracked(name))
+
+    def __len__(self) -> int:
+        return len(self._episodes)
+
+    def __iter__(self) -> Iterator[Tuple[str, ColumnarGameData]]:
+        for position, path in enumerate(self.paths):
+            yield path, self.episode(position)
+
+    def __getitem__(self, path: str) -> ColumnarGameData:
+        return self.episode(self._index[path])
+
+    def episode(self, position: int) -> ColumnarGameData:
+        """
+        Columns of one episode as read-only views into the shared block.
+
+        Args:
+        - position (int): Index of the episode in `paths`.
+
+        Returns:
+        - ColumnarGameData: The columnar game data.
+        """
+        table = self._episodes[position]
+        with timer('load/attach'):
+            columns = {}
+            for entry in table['columns']:
+                dtype = np.dtype(entry['dtype'])
+                shape = tuple(entry['shape'])
+                count = int(np.prod(shape))
+                if count == 0:
+                    columns[entry['name']] = np.empty(shape, dtype=dtype)
+                    continue
+                column = np.frombuffer(
+                    self._memory.buf, dtype=dtype, count=count, offset=self._data_start + entry['offset']
+                ).reshape(shape)
+                column.flags.writeable = False
+                columns[entry['name']] = column
+            return ColumnarGameData.from_columns(columns, table['metadata'])
+
+    def close(self) -> None:
+        """
+        Detach from the block; the owner also frees it.
+
+        The owner unlinks the block first, so its name is released even while episodes are
+        still in use. Their views keep the memory mapped until they are dropped.
+        """
+        if self._owner:
+            self._owner = False
+            self._memory.unlink()
+        try:
+            self._memory.close()
+        except BufferError:
+            # episode views still point into the block; the mapping goes away with them
+            pass
+
+    def __enter__(self) -> 'SharedCorpus':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
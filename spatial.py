@@ -0,0 +1,165 @@
+from typing import List, Dict, Tuple, Sequence, Union
+import numpy as np
+from columnar import as_columnar
+
+Point = Union[Tuple[int, int], Sequence[int], np.ndarray]
+
+
+# Above this radius a batch query enumerates too many disk offsets per center.
+MAX_DISK_RADIUS = 16
+
+
+def disk_offsets(radius: float) -> np.ndarray:
+    """
+    Integer offsets (dx, dy) with dx * dx + dy * dy <= radius * radius.
+
+    Returns:
+    - np.ndarray: Array of shape (k, 2).
+    """
+    reach = int(np.floor(radius))
+    grid = np.stack(np.meshgrid(np.arange(-reach, reach + 1), np.arange(-reach, reach + 1), indexing='ij'), axis=-1).reshape(-1, 2)
+    return grid[(grid ** 2).sum(axis=1) <= radius * radius]
+
+
+class PositionIndex:
+    """
+    Grid-bucket hash over the positions visited in a trajectory.
+
+    Distinct positions are grouped into square buckets of `cell_size`; each distinct position
+    keeps the sorted list of states at which the player stood there. A radius query only
+    looks at the buckets overlapping the query square and compares integer squared distances.
+
+    Attributes:
+    - cell_size (int): Side of a bucket, in map cells.
+    - points (np.ndarray): Distinct positions, ordered by bucket.
+    """
+
+    def __init__(self, positions: np.ndarray, cell_size: int = 8):
+        self.cell_size = cell_size
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+        self.n_states = len(positions)
+        points, inverse = np.unique(positions, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        # np.unique sorts rows lexicographically, so this linear key is sorted as well
+        self._low = points.min(axis=0) if len(points) else np.zeros(2, dtype=np.int64)
+        self._span = int(points[:, 1].max() - self._low[1] + 1) if len(points) else 1
+        self._point_keys = self._linear(points)
+
+        # states grouped by distinct position (CSR layout)
+        self._states = np.argsort(inverse, kind='stable')
+        self._state_offsets = np.searchsorted(inverse[self._states], np.arange(len(points) + 1))
+
+        # distinct positions grouped by bucket (CSR layout)
+        buckets = points // cell_size
+        self._origin = buckets.min(axis=0) if len(points) else np.zeros(2, dtype=np.int64)
+        self._width = int(buckets[:, 1].max() - self._origin[1] + 1) if len(points) else 1
+        keys = self._key(buckets)
+        order = np.argsort(keys, kind='stable')
+        self.points = points[order]
+        self._point_states = order
+        self._keys, self._key_offsets = np.unique(keys[order], return_index=True)
+        self._key_offsets = np.append(self._key_offsets, len(order))
+
+    def _linear(self, cells: np.ndarray) -> np.ndarray:
+        relative = cells - self._low
+        return relative[..., 0] * self._span + relative[..., 1]
+
+    def _key(self, buckets: np.ndarray) -> np.ndarray:
+        relative = buckets - self._origin
+        return relative[..., 0] * self._width + relative[..., 1]
+
+    def _candidates(self, center: np.ndarray, radius: float) -> np.ndarray:
+        reach = int(np.floor(radius))
+        low = np.maximum((center - reach) // self.cell_size, self._origin)
+        high = (center + reach) // self.cell_size
+        if np.any(high < low):
+            return np.zeros(0, dtype=np.int64)
+        rows = np.arange(low[0], high[0] + 1)
+        cols = np.arange(low[1], min(high[1], self._origin[1] + self._width - 1) + 1)
+        keys = self._key(np.stack(np.meshgrid(rows, cols, indexing='ij'), axis=-1).reshape(-1, 2))
+        slots = np.searchsorted(self._keys, keys)
+        slots = slots[(slots < len(self._keys)) & (self._keys[np.minimum(slots, len(self._keys) - 1)] == keys)]
+        if len(slots) == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(self._key_offsets[s], self._key_offsets[s + 1]) for s in slots])
+
+    def points_within(self, center: Point, radius: float) -> np.ndarray:
+        """
+        Distinct positions within `radius` of `center`.
+
+        Returns:
+        - np.ndarray: Indices into `points`.
+        """
+        center = np.asarray(center, dtype=np.int64)
+        candidates = self._candidates(center, radius)
+        offsets = self.points[candidates] - center
+        return candidates[np.einsum('ij,ij->i', offsets, offsets) <= radius * radius]
+
+    def query(self, center: Point, radius: float) -> np.ndarray:
+        """
+        States at which the player stood within `radius` of `center` (Euclidean distance).
+
+        Args:
+        - center (Tuple[int, int]): The (x, y) coordinate to search around.
+        - radius (float): The search radius.
+
+        Returns:
+        - np.ndarray: Sorted state indices.
+        """
+        distinct = self._point_states[self.points_within(center, radius)]
+        if len(distinct) == 0:
+            return np.zeros(0, dtype=np.int64)
+        states = [self._states[self._state_offsets[p]:self._state_offsets[p + 1]] for p in distinct]
+        return np.sort(np.concatenate(states))
+
+    def query_many(self, centers: Sequence[Point], radius: float) -> List[np.ndarray]:
+        """
+        Run `query` for many centers at once.
+
+        For small radii every integer offset of the disk is added to every center and the
+        resulting cells are looked up among the visited positions in one vectorized call;
+        larger radii fall back to one bucket query per center.
+
+        Args:
+        - centers (Sequence[Tuple[int, int]]): The coordinates to search around.
+        - radius (float): The search radius.
+
+        Returns:
+        - List[np.ndarray]: Sorted state indices for each center.
+        """
+        centers = np.asarray(centers, dtype=np.int64).reshape(-1, 2)
+        if radius > MAX_DISK_RADIUS or len(self._point_keys) == 0:
+            return [self.query(center, radius) for center in centers]
+
+        cells = centers[:, None, :] + disk_offsets(radius)[None, :, :]
+        inside = np.all((cells >= self._low) & (cells[..., 1:] < self._low[1] + self._span), axis=-1)
+        keys = np.where(inside, self._linear(cells), -1)
+        slots = np.minimum(np.searchsorted(self._point_keys, keys), len(self._point_keys) - 1)
+        center_ids, offset_ids = np.nonzero(inside & (self._point_keys[slots] == keys))
+        points = slots[center_ids, offset_ids]
+
+        # expand every (center, distinct position) hit into the states spent at that position
+        starts, stops = self._state_offsets[points], self._state_offsets[points + 1]
+        lengths = stops - starts
+        owners = np.repeat(center_ids, lengths)
+        flat = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        states = self._states[np.repeat(starts, lengths) + flat]
+        order = np.lexsort((states, owners))
+        return np.split(states[order], np.cumsum(np.bincount(owners, minlength=len(centers)))[:-1])
+
+    def any_within(self, centers: Sequence[Point], radius: float) -> np.ndarray:
+        """
+        States within `radius` of at least one of `centers`.
+
+        Returns:
+        - np.ndarray: Sorted, de-duplicated state indices.
+        """
+        found = self.query_many(centers, radius)
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+
+def position_index(game_data) -> PositionIndex:
+    """Return the position index of the game data, built once per episode."""
+    columns = as_columnar(game_data)
+    return columns.cached('position_index', lambda: PositionIndex(columns.variables['player_position']))
@@ -0,0 +1,241 @@
+import json
+from typing import List, Dict, Tuple, Any, Optional, Iterator, TextIO
+import numpy as np
+from deserialization import achievements_list
+from columnar import ColumnarGameData, VARIABLE_COLUMNS, INVENTORY_COLUMNS, forward_fill
+from map_store import MapStore
+from actions import Action, ACTION_DTYPE, KEY_CODES
+from instrumentation import timed
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+
+
+class _JsonReader:
+    """
+    Incremental JSON tokenizer over a text file.
+
+    Only object structure is walked token by token; every leaf value (a number, a
+    position pair, an inventory snapshot...) is decoded with `json.JSONDecoder.raw_decode`
+    from a bounded buffer, so the whole document is never held in memory.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document.")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self._pos}, found '{self._buffer[self._pos]}'.")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number cut by the end of the buffer ("23." or "1e") decodes to a shorter
+            # number, so refill until a delimiter follows the value
+            if (end == len(self._buffer) or self._buffer[end] in _NUMBER_CHARS) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        if self._peek() == '{':
+            for _ in self.iter_object():
+                self.skip_value()
+        else:
+            self.read_value()
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Walk the members of the next JSON object.
+
+        Yields each key; the caller must consume the member value (with `read_value`,
+        `skip_value` or a nested `iter_object`) before advancing the iterator.
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            if self._peek() == ',':
+                self._pos += 1
+                continue
+            self._expect('}')
+            return
+
+
+class _ChangeBuilder:
+    """Preallocated, geometrically grown (step, value) arrays for one change map."""
+
+    def __init__(self, dtype: Any, shape: Tuple[int, ...], capacity: int):
+        self.size = 0
+        self.steps = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty((capacity,) + shape, dtype=dtype)
+
+    def append(self, step: int, value: Any) -> None:
+        if self.size == len(self.steps):
+            capacity = max(2 * len(self.steps), 16)
+            self.steps.resize(capacity, refcheck=False)
+            self.values.resize((capacity,) + self.values.shape[1:], refcheck=False)
+        self.steps[self.size] = step
+        self.values[self.size] = value
+        self.size += 1
+
+    def finish(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Trim the buffers in place and return them sorted by step."""
+        self.steps.resize(self.size, refcheck=False)
+        self.values.resize((self.size,) + self.values.shape[1:], refcheck=False)
+        if np.any(self.steps[1:] < self.steps[:-1]):
+            order = np.argsort(self.steps, kind='stable')
+            return self.steps[order], self.values[order]
+        return self.steps, self.values
+
+
+@timed('load/stream')
+def stream_columnar_game_data(file_path: str, chunk_size: int = 1 << 20, capacity: int = 1024) -> ColumnarGameData:
+    """
+    Load an episode file section by section without parsing the whole document at once.
+
+    The `variables`, `inventory`, `achievements`, `actions` and `map` sections are walked
+    entry by entry and written into typed arrays, so peak memory stays close to the
+    size of the resulting `ColumnarGameData` rather than to the size of the decoded JSON.
+
+    Args:
+    - file_path (str): Path to the compressed changes JSON file.
+    - chunk_size (int): Number of characters read from the file at a time.
+    - capacity (int): Initial number of entries preallocated per change map. Later maps
+      reuse the length of the longest map seen so far.
+
+    Returns:
+    - ColumnarGameData: The columnar game data, identical to `ColumnarGameData.from_json`.
+    """
+    variables: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    inventory: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    inventory_steps = np.zeros(0, dtype=np.int64)
+    achievement_steps = np.zeros(0, dtype=np.int64)
+    achievement_pairs = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    achievement_names = list(achievements_list)
+    actions = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=ACTION_DTYPE))
+    map_entries: Dict[str, Any] = {}
+
+    with open(file_path, 'r') as file:
+        reader = _JsonReader(file, chunk_size)
+        for section in reader.iter_object():
+            if section == 'variables':
+                for name in reader.iter_object():
+                    if name not in VARIABLE_COLUMNS:
+                        reader.skip_value()
+                        continue
+                    dtype, shape, default = VARIABLE_COLUMNS[name]
+                    builder = _ChangeBuilder(dtype, shape, capacity)
+                    for key in reader.iter_object():
+                        builder.append(int(key), reader.read_value())
+                    variables[name] = builder.finish()
+                    capacity = max(capacity, builder.size)
+            elif section == 'inventory':
+                builders = {
+                    name: _ChangeBuilder(dtype, shape, capacity)
+                    for name, (dtype, shape, default) in INVENTORY_COLUMNS.items()
+                }
+                for key in reader.iter_object():
+                    snapshot = reader.read_value()
+                    for name, (dtype, shape, default) in INVENTORY_COLUMNS.items():
+                        builders[name].append(int(key), snapshot.get(name, default))
+                inventory = {name: builder.finish() for name, builder in builders.items()}
+                if inventory:
+                    inventory_steps = next(iter(inventory.values()))[0]
+            elif section == 'achievements':
+                achievement_ids = {name: i for i, name in enumerate(achievement_names)}
+                steps = _ChangeBuilder(np.int64, (), capacity)
+                pairs = _ChangeBuilder(np.int64, (), capacity)
+                for key in reader.iter_object():
+                    steps.append(int(key), 0)
+                    for name in reader.read_value():
+                        if name not in achievement_ids:
+                            achievement_ids[name] = len(achievement_names)
+                            achievement_names.append(name)
+                        pairs.append(int(key), achievement_ids[name])
+                achievement_steps = np.unique(steps.finish()[0])
+                achievement_pairs = pairs.finish()
+            elif section == 'actions':
+                builder = _ChangeBuilder(ACTION_DTYPE, (), capacity)
+                for key in reader.iter_object():
+                    builder.append(int(key), KEY_CODES.get(reader.read_value(), Action.UNKNOWN))
+                actions = builder.finish()
+            elif section == 'map':
+                # entries are small cell-edit lists, except for the full initial map
+                map_entries = {key: reader.read_value() for key in reader.iter_object()}
+            else:
+                reader.skip_value()
+
+    last_steps = [steps[-1] for steps, values in variables.values() if len(steps)]
+    last_steps += [steps[-1] for steps in (inventory_steps, achievement_steps, actions[0]) if len(steps)]
+    last_steps += [max(map(int, map_entries.keys()))] if map_entries else []
+    n_states = int(max(last_steps)) + 1 if last_steps else 0
+
+    columns, variable_changes = {}, {}
+    for name, spec in VARIABLE_COLUMNS.items():
+        dtype, shape, default = spec
+        # pop so the sparse buffers of a column are freed as soon as it is filled
+        steps, values = variables.pop(name, (np.zeros(0, dtype=np.int64), np.zeros((0,) + shape, dtype=dtype)))
+        columns[name] = forward_fill(steps, values, n_states, default)
+        variable_changes[name] = steps
+
+    items = {}
+    for name, (dtype, shape, default) in INVENTORY_COLUMNS.items():
+        steps, values = inventory.pop(name, (inventory_steps, np.zeros((0,) + shape, dtype=dtype)))
+        items[name] = forward_fill(steps, values, n_states, default)
+
+    recorded = np.zeros((len(achievement_steps), len(achievement_names)), dtype=np.bool_)
+    recorded[np.searchsorted(achievement_steps, achievement_pairs[0]), achievement_pairs[1]] = True
+    achievements = forward_fill(achievement_steps, recorded, n_states, False)
+
+    action_column = np.full(n_states, Action.UNKNOWN, dtype=ACTION_DTYPE)
+    action_column[actions[0]] = actions[1]
+
+    return ColumnarGameData(
+        variables=columns,
+        inventory=items,
+        actions=action_column,
+        achievement_flags=achievements,
+        achievement_names=achievement_names,
+        variable_changes=variable_changes,
+        inventory_changes=inventory_steps,
+        achievement_changes=achievement_steps,
+        maps=MapStore.from_change_map(map_entries, n_states) if map_entries else None
+    )
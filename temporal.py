@@ -0,0 +1,359 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Callable, Union, Hashable
+import numpy as np
+from columnar import ColumnarGameData, as_columnar
+from change_index import next_true
+from actions import PLACEMENTS, action_code
+
+
+class Query(ABC):
+    """
+    A property of the trajectory evaluated at every state.
+
+    `mask(game_data)[t]` tells whether the query holds when the trajectory is read from
+    state t on. State predicates only look at state t; temporal operators look ahead.
+    Queries combine with `&`, `|` and `~`, and with `then`, `eventually`, `always` and `until`.
+
+    Masks are memoized by `key`, which is structural for the queries built with this module:
+    two separately built `item('wood') > 0` share one mask when compiled with the same memo.
+    """
+
+    @property
+    def key(self) -> Hashable:
+        """Identity of the query in a mask memo; queries with equal keys have equal masks."""
+        return id(self)
+
+    def compile(self, columns: ColumnarGameData, masks: Dict[Hashable, Any]) -> np.ndarray:
+        """Mask of the query over `columns`, reusing the masks of shared sub-queries."""
+        key = self.key
+        if key not in masks:
+            # the query is kept next to its mask so that an id in its key cannot be reused meanwhile
+            masks[key] = (self, self._compile(columns, masks))
+        return masks[key][1]
+
+    @abstractmethod
+    def _compile(self, columns: ColumnarGameData, masks: Dict[Hashable, Any]) -> np.ndarray:
+        """Compute the mask of the query, compiling sub-queries through `masks`."""
+
+    def mask(self, game_data, masks: Optional[Dict[Hashable, Any]] = None) -> np.ndarray:
+        """
+        Evaluate the query at every state.
+
+        Args:
+        - game_data (GameData or ColumnarGameData): The game data object.
+        - masks (Dict, optional): Mask memo shared with other queries over the same game data.
+
+        Returns:
+        - np.ndarray: Boolean mask over the states.
+        """
+        return self.compile(as_columnar(game_data), {} if masks is None else masks)
+
+    def holds(self, game_data, step: int = 0, masks: Optional[Dict[Hashable, Any]] = None) -> bool:
+        """Check if the query holds from `step` on."""
+        mask = self.mask(game_data, masks)
+        return 0 <= step < len(mask) and bool(mask[step])
+
+    def first(self, game_data, start: int = 0, masks: Optional[Dict[Hashable, Any]] = None) -> int:
+        """First state at or after `start` where the query holds, or -1."""
+        matches = np.flatnonzero(self.mask(game_data, masks)[max(start, 0):])
+        return int(matches[0]) + max(start, 0) if len(matches) else -1
+
+    def ever(self, game_data, masks: Optional[Dict[Hashable, Any]] = None) -> bool:
+        """Check if the query holds at some state."""
+        return bool(self.mask(game_data, masks).any())
+
+    def __and__(self, other: 'Query') -> 'Query':
+        return _Combine(np.logical_and, self, other)
+
+    def __or__(self, other: 'Query') -> 'Query':
+        return _Combine(np.logical_or, self, other)
+
+    def __invert__(self) -> 'Query':
+        return _Not(self)
+
+    def then(self, other: 'Query', within: Optional[int] = None) -> 'Query':
+        """Holds at t when `self` holds at t and `other` holds at a later state, at most `within` steps later."""
+        return Then(self, other, within)
+
+
+class Predicate(Query):
+    """
+    State predicate computed from the columns with one vectorized function.
+
+    Predicates built with the same `key` are taken to compute the same mask; without a key
+    a predicate is only equal to itself.
+    """
+
+    def __init__(self, compute: Callable[[ColumnarGameData], np.ndarray], name: str = 'predicate',
+                 key: Optional[Hashable] = None):
+        self.compute = compute
+        self.name = name
+        self._key = key
+
+    @property
+    def key(self) -> Hashable:
+        return ('predicate', self._key) if self._key is not None else id(self)
+
+    def _compile(self, columns, masks):
+        return np.asarray(self.compute(columns), dtype=np.bool_).reshape(columns.n_states)
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class _Combine(Query):
+    def __init__(self, operator: Callable, left: Query, right: Query):
+        self.operator, self.left, self.right = operator, left, right
+
+    def _compile(self, columns, masks):
+        return self.operator(self.left.compile(columns, masks), self.right.compile(columns, masks))
+
+    @property
+    def key(self) -> Hashable:
+        return (self.operator.__name__, self.left.key, self.right.key)
+
+    def __repr__(self) -> str:
+        symbol = '&' if self.operator is np.logical_and else '|'
+        return f'({self.left!r} {symbol} {self.right!r})'
+
+
+class _Not(Query):
+    def __init__(self, query: Query):
+        self.query = query
+
+    def _compile(self, columns, masks):
+        return ~self.query.compile(columns, masks)
+
+    @property
+    def key(self) -> Hashable:
+        return ('not', self.query.key)
+
+    def __repr__(self) -> str:
+        return f'~{self.query!r}'
+
+
+class Eventually(Query):
+    """Holds at t when the query holds at some state in [t, t + within] (anywhere after t if within is None)."""
+
+    def __init__(self, query: Query, within: Optional[int] = None):
+        self.query, self.within = query, within
+
+    def _compile(self, columns, masks):
+        found = next_true(self.query.compile(columns, masks))
+        n_states = len(found)
+        if self.within is None:
+            return found < n_states
+        return (found < n_states) & (found - np.arange(n_states) <= self.within)
+
+    @property
+    def key(self) -> Hashable:
+        return ('eventually', self.query.key, self.within)
+
+    def __repr__(self) -> str:
+        return f'eventually({self.query!r}, within={self.within!r})'
+
+
+class Always(Query):
+    """Holds at t when the query holds at every state of [t, t + within] (up to the end if within is None)."""
+
+    def __init__(self, query: Query, within: Optional[int] = None):
+        self.query, self.within = query, within
+
+    def _compile(self, columns, masks):
+        return ~Eventually(~self.query, self.within).compile(columns, masks)
+
+    @property
+    def key(self) -> Hashable:
+        return ('always', self.query.key, self.within)
+
+    def __repr__(self) -> str:
+        return f'always({self.query!r}, within={self.within!r})'
+
+
+class Then(Query):
+    """Holds at t when `first` holds at t and `second` holds at a later state, at most `within` steps later."""
+
+    def __init__(self, first: Query, second: Query, within: Optional[int] = None):
+        self.first_query, self.second, self.within = first, second, within
+
+    def _compile(self, columns, masks):
+        found = next_true(self.second.compile(columns, masks))
+        n_states = len(found)
+        # next match strictly after t
+        later = np.append(found[1:], n_states)
+        ok = later < n_states
+        if self.within is not None:
+            ok &= later - np.arange(n_states) <= self.within
+        return self.first_query.compile(columns, masks) & ok
+
+    @property
+    def key(self) -> Hashable:
+        return ('then', self.first_query.key, self.second.key, self.within)
+
+    def __repr__(self) -> str:
+        return f'{self.first_query!r}.then({self.second!r}, within={self.within!r})'
+
+
+class Until(Query):
+    """Holds at t when `goal` holds at some s >= t and `hold` holds on every state of [t, s)."""
+
+    def __init__(self, hold: Query, goal: Query):
+        self.hold, self.goal = hold, goal
+
+    def _compile(self, columns, masks):
+        reached = next_true(self.goal.compile(columns, masks))
+        broken = next_true(~self.hold.compile(columns, masks))
+        return (reached < len(reached)) & (reached <= broken)
+
+    @property
+    def key(self) -> Hashable:
+        return ('until', self.hold.key, self.goal.key)
+
+    def __repr__(self) -> str:
+        return f'until({self.hold!r}, {self.goal!r})'
+
+
+def eventually(query: Query, within: Optional[int] = None) -> Query:
+    return Eventually(query, within)
+
+
+def always(query: Query, within: Optional[int] = None) -> Query:
+    return Always(query, within)
+
+
+def until(hold: Query, goal: Query) -> Query:
+    return Until(hold, goal)
+
+
+class Column:
+    """
+    A variable or inventory column; comparisons and changes turn it into predicates.
+
+    Vector columns (e.g. `player_position`) are reduced with `any` unless a component is
+    selected with `column[i]`.
+    """
+
+    def __init__(self, group: str, name: str, component: Optional[int] = None):
+        self.group, self.name, self.component = group, name, component
+
+    def values(self, columns: ColumnarGameData) -> np.ndarray:
+        table = columns.variables if self.group == 'variables' else columns.inventory
+        if self.name not in table:
+            raise ValueError(f"'{self.name}' is not a column of {self.group}.")
+        values = table[self.name]
+        return values[:, self.component] if self.component is not None else values
+
+    def __getitem__(self, component: int) -> 'Column':
+        return Column(self.group, self.name, component)
+
+    def _predicate(self, test: Callable[[np.ndarray], np.ndarray], symbol: str) -> Predicate:
+        def compute(columns: ColumnarGameData) -> np.ndarray:
+            result = test(self.values(columns))
+            return result.reshape(len(result), -1).any(axis=1)
+        name = f'{self!r} {symbol}'
+        return Predicate(compute, name, key=name)
+
+    def __gt__(self, value) -> Predicate:
+        return self._predicate(lambda values: values > value, f'> {value!r}')
+
+    def __ge__(self, value) -> Predicate:
+        return self._predicate(lambda values: values >= value, f'>= {value!r}')
+
+    def __lt__(self, value) -> Predicate:
+        return self._predicate(lambda values: values < value, f'< {value!r}')
+
+    def __le__(self, value) -> Predicate:
+        return self._predicate(lambda values: values <= value, f'<= {value!r}')
+
+    def __eq__(self, value) -> Predicate:
+        return self._predicate(lambda values: values == value, f'== {value!r}')
+
+    def __ne__(self, value) -> Predicate:
+        return self._predicate(lambda values: values != value, f'!= {value!r}')
+
+    __hash__ = object.__hash__
+
+    def _step(self, test: Callable[[np.ndarray, np.ndarray], np.ndarray], symbol: str, initial: Any) -> Predicate:
+        # compares every state with the one before it; `initial` stands for the state before the first
+        def compute(columns: ColumnarGameData) -> np.ndarray:
+            values = self.values(columns)
+            if len(values) == 0:
+                return np.zeros(0, dtype=np.bool_)
+            previous = np.concatenate([values[:1] if initial is None else np.full_like(values[:1], initial), values[:-1]])
+            result = test(values, previous)
+            return result.reshape(len(result), -1).any(axis=1)
+        name = f'{self!r} {symbol}'
+        return Predicate(compute, name, key=name)
+
+    def increased(self) -> Predicate:
+        """Value went up at this state; the first state does not count as a change."""
+        return self._step(np.greater, 'increased', None)
+
+    def decreased(self) -> Predicate:
+        """Value went down at this state; the first state does not count as a change."""
+        return self._step(np.less, 'decreased', None)
+
+    def changed(self) -> Predicate:
+        return self._step(np.not_equal, 'changed', None)
+
+    def collected(self) -> Predicate:
+        """Item count went up at this state, counting from an empty inventory before the first state."""
+        return self._step(np.greater, 'collected', 0)
+
+    def __repr__(self) -> str:
+        suffix = f'[{self.component}]' if self.component is not None else ''
+        return f'{self.group}.{self.name}{suffix}'
+
+
+def variable(name: str) -> Column:
+    """Column of a `PlayerVariables` field."""
+    return Column('variables', name)
+
+
+def item(name: str) -> Column:
+    """Column of a `PlayerInventory` item."""
+    return Column('inventory', name)
+
+
+def action(name: Union[str, int]) -> Predicate:
+    """
+    The action taken at the state is `name`.
+
+    Raises:
+    - ValueError: If `name` is not an action, so that a typo cannot build a predicate
+      that matches every state without a recorded action.
+    """
+    code = action_code(name)
+    return Predicate(lambda columns: columns.actions == code, f'action == {name!r}', key=('action', code))
+
+
+def achievement(name: str) -> Predicate:
+    """The achievement is in the achievement set of the state."""
+    def compute(columns: ColumnarGameData) -> np.ndarray:
+        if name not in columns.achievement_names:
+            return np.zeros(columns.n_states, dtype=np.bool_)
+        return columns.achievements[:, columns.achievement_names.index(name)]
+    return Predicate(compute, f'achievement {name!r}', key=('achievement', name))
+
+
+def unlocked(name: str) -> Predicate:
+    """The achievement enters the achievement set at the state."""
+    def compute(columns: ColumnarGameData) -> np.ndarray:
+        flags = achievement(name).compile(columns, {})
+        return flags & ~np.concatenate(([False], flags[:-1]))
+    return Predicate(compute, f'unlocked {name!r}', key=('unlocked', name))
+
+
+def placed(name: str) -> Predicate:
+    """
+    The item is placed at the state: its place action is taken and the inventory item the
+    placement consumes (if tracked) goes down. Unknown items are never placed.
+    """
+    if name not in PLACEMENTS:
+        return Predicate(lambda columns: np.zeros(columns.n_states, dtype=np.bool_), f'placed {name!r}',
+                         key=('placed', name))
+    place_action, spent_item = PLACEMENTS[name]
+    query = action(place_action)
+    if spent_item is not None:
+        query = query & item(spent_item).decreased()
+    return Predicate(lambda columns: query.compile(columns, {}), f'placed {name!r}', key=('placed', name))
@@ -0,0 +1,12 @@
+import os
+import sys
+import pytest
+
+# the modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def episode_path():
+    """The sample episode shipped with the repository."""
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'compressed_changes.json')
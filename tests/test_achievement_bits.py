@@ -0,0 +1,28 @@
+import numpy as np
+from achievement_bits import AchievementBits
+from columnar import load_columnar_game_data
+from checkers.base import first_achievement_step
+
+
+def test_first_unlock():
+    achievements = np.array([[False, False], [False, True], [True, True]])
+    bits = AchievementBits.from_flags(achievements, ['a', 'b'])
+    assert bits.first_unlock.tolist() == [2, 1]
+    assert bits.first_step('c') == -1
+    assert bits.has('b', 1) and not bits.has('a', 1)
+
+
+def test_episode_without_states():
+    bits = AchievementBits.from_flags(np.zeros((0, 2), dtype=bool), ['a', 'b'])
+    assert bits.words.shape[0] == 0
+    assert bits.first_unlock.tolist() == [-1, -1]
+    assert bits.first_step('a') == -1
+    assert bits.all_valid()
+
+
+def test_first_achievement_step_matches_states(episode_path):
+    game_data = load_columnar_game_data(episode_path).to_game_data(lazy=True)
+    for name in ('COLLECT_WOOD', 'COLLECT_DRINK', 'COLLECT_IRON', 'DEFEAT_ZOMBIE'):
+        steps = [i for i, state in enumerate(game_data.states) if name in state.achievements.achievements]
+        assert first_achievement_step(game_data, name) == (steps[0] if steps else -1)
+    assert first_achievement_step(game_data, 'COLLECT_DRINK') == 2
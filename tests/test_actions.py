@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from actions import Action, ActionIndex, action_code, encode_actions
+from columnar import load_columnar_game_data
+
+
+def test_action_code_resolves_names_and_codes():
+    assert action_code('place_table') == Action.PLACE_TABLE
+    assert action_code(int(Action.NOOP)) == Action.NOOP
+    assert action_code('unknown') == Action.UNKNOWN
+
+
+@pytest.mark.parametrize('action', ['not_an_action', 'place_tabel', 200])
+def test_action_code_rejects_unknown_actions(action):
+    with pytest.raises(ValueError):
+        action_code(action)
+
+
+def test_encode_actions_maps_unrecognised_recorded_names_to_unknown():
+    codes = encode_actions(['noop', 'something_else'])
+    assert codes.tolist() == [int(Action.NOOP), int(Action.UNKNOWN)]
+
+
+def test_action_index_rejects_misspelled_action(episode_path):
+    index = ActionIndex(load_columnar_game_data(episode_path).actions)
+    with pytest.raises(ValueError):
+        index.steps('not_an_action')
+    assert isinstance(index.steps('place_table'), np.ndarray)
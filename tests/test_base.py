@@ -0,0 +1,41 @@
+from deserialization import GameData, PlayerState, PlayerVariables, PlayerInventory, PlayerAchievements
+from checkers.base import was_item_placed
+
+
+def trajectory(steps):
+    # (action, wood, stone) of every state
+    return GameData(states=[
+        PlayerState(
+            variables=PlayerVariables(timestep=i),
+            achievements=PlayerAchievements([]),
+            inventory=PlayerInventory(wood=wood, stone=stone),
+            action=action,
+        )
+        for i, (action, wood, stone) in enumerate(steps)
+    ])
+
+
+def test_table_placement_spends_wood():
+    game_data = trajectory([('noop', 2, 0), ('place_table', 1, 0), ('noop', 1, 0)])
+    assert was_item_placed(game_data, 'table', 0, 3) is True
+    # placed from the first state: the index is 0, not False
+    assert was_item_placed(game_data, 'table', 0, 3, verbose=True) == 0
+
+
+def test_place_action_without_spent_item_is_not_a_placement():
+    game_data = trajectory([('noop', 2, 0), ('place_table', 2, 0), ('noop', 2, 0)])
+    assert was_item_placed(game_data, 'table', 0, 3) is False
+    assert was_item_placed(game_data, 'table', 0, 3, verbose=True) is False
+
+
+def test_stone_and_furnace_spend_stone():
+    game_data = trajectory([('noop', 0, 3), ('noop', 0, 3), ('place_stone', 0, 2), ('place_furnace', 0, 1)])
+    assert was_item_placed(game_data, 'stone', 0, 4, verbose=True) == 1
+    assert was_item_placed(game_data, 'furnace', 0, 4, verbose=True) == 2
+    assert was_item_placed(game_data, 'furnace', 0, 2) is False
+
+
+def test_plant_is_checked_on_the_action_alone():
+    game_data = trajectory([('noop', 0, 0), ('place_plant', 0, 0)])
+    assert was_item_placed(game_data, 'plant', 0, 2, verbose=True) == 0
+    assert was_item_placed(game_data, 'sword', 0, 2) is False
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+import binary_format
+from binary_format import save_binary, load_binary
+from columnar import load_columnar_game_data
+from checkers import base
+
+
+def test_round_trip(episode_path, tmp_path):
+    columns = load_columnar_game_data(episode_path)
+    save_binary(columns, str(tmp_path / 'episode.bin'))
+    loaded = load_binary(str(tmp_path / 'episode.bin'))
+    assert loaded.n_states == columns.n_states
+    np.testing.assert_array_equal(loaded.achievements, columns.achievements)
+    np.testing.assert_array_equal(loaded.actions, columns.actions)
+    for name in columns.variables:
+        np.testing.assert_array_equal(loaded.variables[name], columns.variables[name])
+    assert loaded.state(5) == columns.state(5)
+
+
+def test_achievement_bitsets_are_read_in_place(episode_path, tmp_path):
+    columns = load_columnar_game_data(episode_path)
+    save_binary(columns, str(tmp_path / 'episode.bin'))
+    loaded = load_binary(str(tmp_path / 'episode.bin'))
+    assert loaded.achievement_flags is None
+    words = loaded.achievement_bits.words
+    assert words.dtype == np.uint64 and not words.flags.owndata and not words.flags.writeable
+    assert loaded.achievement_flags is None
+    np.testing.assert_array_equal(words, columns.achievement_bits.words)
+    assert loaded.achievement_bits.first_step('COLLECT_DRINK') == columns.achievement_bits.first_step('COLLECT_DRINK') == 2
+    assert base.first_achievement_step(loaded.to_game_data(lazy=True), 'MAKE_WOOD_PICKAXE') == 0
+
+
+def test_other_versions_are_rejected(episode_path, tmp_path):
+    path = tmp_path / 'future.bin'
+    save_binary(load_columnar_game_data(episode_path), str(path))
+    data = bytearray(path.read_bytes())
+    data[8:12] = (binary_format.VERSION + 1).to_bytes(4, 'little')
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match='version'):
+        load_binary(str(path))
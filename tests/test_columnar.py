@@ -0,0 +1,43 @@
+import numpy as np
+from deserialization import GameData, PlayerState, PlayerVariables, PlayerInventory, PlayerAchievements
+from columnar import ColumnarGameData, VARIABLE_COLUMNS, as_columnar
+from checkers import base
+from memo import fingerprint
+
+
+def hand_built_game_data(n_states=3):
+    # default PlayerVariables: learned_spells is an empty list rather than two flags
+    states = [
+        PlayerState(
+            variables=PlayerVariables(player_position=(i, 0), timestep=i),
+            achievements=PlayerAchievements(['collect_wood'] if i else []),
+            inventory=PlayerInventory(wood=i),
+            action='w',
+        )
+        for i in range(n_states)
+    ]
+    return GameData(states=states)
+
+
+def test_from_states_fills_missing_vector_fields_with_defaults():
+    columns = ColumnarGameData.from_states(hand_built_game_data().states)
+    assert columns.variables['learned_spells'].shape == (3, 2)
+    assert not columns.variables['learned_spells'].any()
+    assert columns.variables['player_position'][:, 0].tolist() == [0, 1, 2]
+    for name, (dtype, shape, default) in VARIABLE_COLUMNS.items():
+        assert columns.variables[name].shape == (3,) + shape
+
+
+def test_from_states_keeps_well_formed_values_next_to_short_ones():
+    game_data = hand_built_game_data()
+    game_data.states[1].variables.learned_spells = [True, False]
+    columns = ColumnarGameData.from_states(game_data.states)
+    assert columns.variables['learned_spells'].tolist() == [[False, False], [True, False], [False, False]]
+
+
+def test_checkers_accept_hand_built_game_data():
+    game_data = hand_built_game_data()
+    assert base.find_item_in_inventory(game_data, 'wood') == [1, 2]
+    assert base.did_player_go_north(game_data, 0, 2) in (True, False)
+    assert as_columnar(game_data).n_states == 3
+    assert isinstance(fingerprint(game_data), str)
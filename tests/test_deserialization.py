@@ -0,0 +1,21 @@
+import json
+from deserialization import GameData, load_game_data
+from columnar import ColumnarGameData
+
+
+def test_from_json_builds_states_on_demand(episode_path):
+    game_data = load_game_data(episode_path)
+    views = game_data.states._views
+    assert all(view is None for view in views)
+    assert game_data.states[3] is game_data.states[3]
+    assert sum(view is not None for view in views) == 1
+
+
+def test_lazy_states_match_eager_states(episode_path):
+    with open(episode_path) as file:
+        data = json.load(file)
+    lazy = GameData.from_json(data)
+    eager = ColumnarGameData.from_json(data).to_game_data(lazy=False)
+    assert len(lazy.states) == len(eager.states)
+    assert list(lazy.states) == eager.states
+    assert lazy.columns is not None
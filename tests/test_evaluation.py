@@ -0,0 +1,54 @@
+import numpy as np
+from evaluation import CheckerSpec, evaluate, evaluate_episode
+from columnar import load_columnar_game_data
+from checkers import base
+from temporal import Predicate, item, action, achievement, eventually
+
+
+def test_shared_sub_queries_are_computed_once(episode_path):
+    calls = []
+
+    def wood(columns):
+        calls.append(1)
+        return columns.inventory['wood'] > 0
+
+    def has_wood():
+        # built anew for every spec, as separately written instructions would be
+        return Predicate(wood, 'has wood', key='has wood')
+
+    specs = [
+        CheckerSpec.of(has_wood().ever),
+        CheckerSpec.of((has_wood() & achievement('COLLECT_DRINK')).first),
+        CheckerSpec.of(eventually(has_wood(), within=3).holds, 2),
+    ]
+    results = evaluate_episode(episode_path, specs)
+    assert len(calls) == 1
+    game_data = load_columnar_game_data(episode_path)
+    assert results == [spec(game_data) for spec in specs]
+
+
+def test_structurally_equal_queries_share_masks(episode_path):
+    masks = {}
+    columns = load_columnar_game_data(episode_path)
+    first = (item('wood') > 0) & action('do')
+    second = (item('wood') > 0) & action('DO')
+    np.testing.assert_array_equal(first.mask(columns, masks), second.mask(columns, masks))
+    assert first.key == second.key
+    assert len(masks) == 3
+
+
+def test_query_and_function_specs_keep_their_order(episode_path):
+    specs = [
+        CheckerSpec.of(base.find_item_in_inventory, 'wood'),
+        CheckerSpec.of(item('wood').collected().first, name='first wood'),
+        CheckerSpec.of(base.first_achievement_step, 'COLLECT_DRINK'),
+        CheckerSpec.of(achievement('COLLECT_DRINK').first),
+    ]
+    table = evaluate(specs, [episode_path])
+    row = table.results[0]
+    game_data = load_columnar_game_data(episode_path).to_game_data(lazy=True)
+    assert row[0] == base.find_item_in_inventory(game_data, 'wood')
+    assert row[1] == item('wood').collected().first(game_data)
+    assert row[2] == row[3] == 2
+    assert table.checkers[1] == 'first wood'
+    assert table.checkers[3] == "achievement 'COLLECT_DRINK'.first()"
@@ -0,0 +1,42 @@
+import threading
+from instrumentation import profile, count, enabled, timer
+
+
+def test_nested_profiles_add_up():
+    with profile('batch') as batch:
+        count('states', 2)
+        with profile('episode') as episode:
+            count('states', 3)
+            with timer('load'):
+                pass
+    assert not enabled()
+    assert episode.counters == {'states': 3}
+    assert batch.counters == {'states': 5}
+    assert batch.children == [episode]
+    assert batch.timers['load'][0] == 1
+
+
+def test_reports_do_not_leak_across_threads():
+    started, release = threading.Event(), threading.Event()
+    seen = {}
+
+    def worker():
+        seen['enabled'] = enabled()
+        count('states', 100)
+        with profile('worker') as report:
+            started.set()
+            release.wait(5)
+            count('states', 7)
+        seen['report'] = report
+
+    with profile('main') as main:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        started.wait(5)
+        count('states', 1)
+        release.set()
+        thread.join()
+
+    assert seen['enabled'] is False
+    assert main.counters == {'states': 1}
+    assert seen['report'].counters == {'states': 7}
@@ -0,0 +1,64 @@
+import numpy as np
+from benchmarks.synthetic import EpisodeConfig, generate_episode
+from columnar import ColumnarGameData
+from live_episode import LiveEpisode
+from scenarious_map import find_clusters
+from tests.test_service import step_deltas
+
+
+def rebuilt(columns):
+    """The same game data with copied columns and no derived indexes."""
+    return ColumnarGameData(
+        variables={name: values.copy() for name, values in columns.variables.items()},
+        inventory={name: values.copy() for name, values in columns.inventory.items()},
+        actions=columns.actions.copy(),
+        achievement_flags=columns.achievements.copy(),
+        achievement_names=list(columns.achievement_names),
+        maps=columns.maps,
+    )
+
+
+def test_snapshot_indexes_are_extended_not_rebuilt():
+    n_states = 300
+    data = generate_episode(EpisodeConfig(n_states=n_states, map_size=(12, 12), edit_rate=0.2, seed=3))
+    episode = LiveEpisode()
+    previous = None
+    for step, delta in enumerate(step_deltas(data, n_states)):
+        # a second delta on the same step rewrites the last state
+        episode.apply(delta)
+        episode.apply({'inventory': {str(step): dict(data['inventory'].get(str(step), {}), wood=step % 4)}})
+        columns = episode.game_data
+        if previous is not None:
+            assert columns is not previous
+            assert columns.change_index is not previous.change_index
+        fresh = rebuilt(columns)
+        for name in ('wood', 'stone'):
+            extended, built = columns.change_index.item(name), fresh.change_index.item(name)
+            assert np.array_equal(extended.steps, built.steps)
+            assert np.array_equal(extended.values, built.values)
+        assert columns.change_index.first_achievement('COLLECT_WOOD') == fresh.change_index.first_achievement('COLLECT_WOOD')
+        for action in ('DO', 'NOOP', 'PLACE_TABLE', 'LEFT'):
+            assert np.array_equal(columns.action_index.steps(action), fresh.action_index.steps(action))
+        assert np.array_equal(columns.action_index.counts, fresh.action_index.counts)
+        assert np.array_equal(columns.achievement_bits.words, fresh.achievement_bits.words)
+        assert np.array_equal(columns.achievement_bits.first_unlock, fresh.achievement_bits.first_unlock)
+        previous = columns
+
+    final = ColumnarGameData.from_json(data)
+    assert len(find_clusters(episode.game_data)) == len(find_clusters(final))
+
+
+def test_clusters_of_unchanged_map_versions_are_shared():
+    data = generate_episode(EpisodeConfig(n_states=20, map_size=(8, 8), edit_rate=0.0, seed=1))
+    episode = LiveEpisode()
+    deltas = list(step_deltas(data, 20))
+    for delta in deltas[:10]:
+        episode.apply(delta)
+    first = episode.game_data
+    find_clusters(first)
+    cached = {key: value for key, value in first._cache.items() if key[0] == 'clusters'}
+    assert cached
+    for delta in deltas[10:]:
+        episode.apply(delta)
+    second = episode.game_data
+    assert all(second._cache[key] is value for key, value in cached.items())
@@ -0,0 +1,68 @@
+import inspect
+import numpy as np
+import pytest
+import memo
+from benchmarks.synthetic import EpisodeConfig, generate_episode
+from columnar import ColumnarGameData, load_columnar_game_data
+from memo import call_key, fingerprint, memoization, memoized, normalize
+from checkers.base import check_achievement_inventory_radius
+
+
+@pytest.fixture
+def episode():
+    return ColumnarGameData.from_json(generate_episode(EpisodeConfig(n_states=120, map_size=(12, 12), edit_rate=0.3)))
+
+
+def test_fingerprint_only_depends_on_the_states(episode, episode_path):
+    for columns in (episode, load_columnar_game_data(episode_path)):
+        rebuilt = ColumnarGameData.from_states(list(columns.to_game_data().states))
+        assert fingerprint(rebuilt) == fingerprint(columns)
+
+
+def test_fingerprint_tells_different_states_apart(episode):
+    other = ColumnarGameData.from_json(generate_episode(EpisodeConfig(n_states=120, map_size=(12, 12), edit_rate=0.3, seed=1)))
+    assert fingerprint(other) != fingerprint(episode)
+
+
+def test_persisted_results_are_not_served_to_changed_code(tmp_path, episode):
+    path = str(tmp_path / 'cache.sqlite')
+
+    # the same checker before and after an edit
+    def old(game_data, item):
+        return int(game_data.inventory[item][-1])
+
+    def new(game_data, item):
+        return int(game_data.inventory[item][-1]) + 1
+
+    new.__qualname__ = old.__qualname__
+    with memoization(path=path):
+        assert memoized(old)(episode, 'wood') == old(episode, 'wood')
+    with memoization(path=path) as cache:
+        assert memoized(new)(episode, 'wood') == new(episode, 'wood')
+        assert cache.hits == 0
+        assert memoized(old)(episode, 'wood') == old(episode, 'wood')
+        assert cache.hits == 1
+
+
+def test_call_key_changes_with_the_cache_version(monkeypatch, episode):
+    def checker(game_data):
+        return 0
+
+    signature = inspect.signature(checker)
+    before = call_key(checker, signature, episode, (), {})
+    monkeypatch.setattr(memo, 'CACHE_VERSION', memo.CACHE_VERSION + 1)
+    assert call_key(checker, signature, episode, (), {}) != before
+
+
+def test_normalize_rejects_arguments_without_content_form():
+    assert normalize({'b': (1, 2), 'a': np.int64(3)}) == {'a': 3, 'b': [1, 2]}
+    with pytest.raises(TypeError):
+        normalize(object())
+
+
+def test_radius_wrapper_stores_one_entry(episode):
+    with memoization() as cache:
+        first = check_achievement_inventory_radius(episode, (5, 30), 3, item_name='wood')
+        assert (cache.hits, cache.misses, len(cache._memory)) == (0, 1, 1)
+        assert check_achievement_inventory_radius(episode, (5, 30), 3, item_name='wood') == first
+        assert (cache.hits, cache.misses, len(cache._memory)) == (1, 1, 1)
@@ -0,0 +1,90 @@
+import pytest
+from deserialization import GameData, PlayerState, PlayerVariables, PlayerInventory, PlayerAchievements
+from columnar import load_columnar_game_data
+from checkers.progression import ProgressionTracker, Milestone, progression
+
+
+def trajectory(steps):
+    # (action, wood, stone) of every state
+    return GameData(states=[
+        PlayerState(
+            variables=PlayerVariables(timestep=i),
+            achievements=PlayerAchievements([]),
+            inventory=PlayerInventory(wood=wood, stone=stone),
+            action=action,
+        )
+        for i, (action, wood, stone) in enumerate(steps)
+    ])
+
+
+GAME = trajectory([
+    ('noop', 1, 0),
+    ('place_table', 1, 0),          # not enough wood for a table
+    ('make_wood_pickaxe', 3, 1),    # no table yet; stone goes up before there is a pickaxe
+    ('place_table', 3, 0),          # table
+    ('make_wood_pickaxe', 2, 0),    # wood pickaxe
+    ('noop', 2, 1),                 # stone
+    ('make_stone_pickaxe', 2, 1),   # stone pickaxe
+    ('noop', 2, 1),
+])
+
+
+def test_milestones_wait_for_their_requirements():
+    tracker = progression(GAME)
+    assert tracker.first_step('table') == 3
+    assert tracker.first_step('wood_pickaxe') == 4
+    assert tracker.first_step('stone') == 5
+    assert tracker.resolve()['stone_pickaxe'] == (6, {'table': 3, 'stone': 5})
+
+
+def test_unreached_requirements_block_the_milestone():
+    resolved = progression(GAME).resolve()
+    assert resolved['furnace'][0] == -1
+    assert resolved['iron_pickaxe'] == (-1, {'furnace': -1, 'iron': -1, 'coal': -1})
+
+
+def test_min_items_are_checked_at_the_step():
+    tracker = progression(GAME)
+    assert tracker.first_step('table', 1, 3) == -1
+    assert tracker.first_step('table', 0, 2) == -1
+
+
+def test_end_index_is_exclusive_and_start_index_is_inclusive():
+    tracker = progression(GAME)
+    assert tracker.first_step('wood_pickaxe', 0, 4) == -1
+    assert tracker.first_step('wood_pickaxe', 0, 5) == 4
+    assert tracker.first_step('table', 3) == 3
+    assert tracker.first_step('table', 4) == -1
+
+
+def test_items_held_at_the_first_state_count_as_collected():
+    tracker = ProgressionTracker(trajectory([('noop', 2, 0), ('noop', 2, 0), ('noop', 3, 0)]),
+                                 milestones=[Milestone('wood', item='wood')])
+    assert tracker.first_step('wood') == 0
+    assert tracker.first_step('wood', 1) == 2
+    assert tracker.first_step('wood', 1, 2) == -1
+
+
+def test_unknown_milestones_are_rejected():
+    with pytest.raises(ValueError):
+        progression(GAME).first_step('spaceship')
+
+
+
+def test_resolved_ranges_are_bounded(episode_path):
+    tracker = ProgressionTracker(load_columnar_game_data(episode_path), cache_size=4)
+    expected = {start: tracker.resolve(start) for start in range(tracker.n_states)}
+    assert len(tracker._resolved) == 4
+    for start, resolved in expected.items():
+        assert tracker.resolve(start) == resolved
+    assert len(tracker._resolved) == 4
+
+
+def test_recently_used_ranges_are_kept(episode_path):
+    tracker = ProgressionTracker(load_columnar_game_data(episode_path), cache_size=2)
+    first = tracker.resolve(0)
+    tracker.resolve(1)
+    assert tracker.resolve(0) is first
+    tracker.resolve(2)
+    assert tracker.resolve(0) is first
+    assert (1, tracker.n_states) not in tracker._resolved
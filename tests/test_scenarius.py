@@ -0,0 +1,46 @@
+from deserialization import GameData, PlayerState, PlayerVariables, PlayerInventory, PlayerAchievements
+from scenarius import is_item_in_closed_contour, was_item_placed_near_another
+
+
+def trajectory(steps):
+    # (action, position, wood, stone) of every state
+    return GameData(states=[
+        PlayerState(
+            variables=PlayerVariables(player_position=position, timestep=i),
+            achievements=PlayerAchievements([]),
+            inventory=PlayerInventory(wood=wood, stone=stone),
+            action=action,
+        )
+        for i, (action, position, wood, stone) in enumerate(steps)
+    ])
+
+
+def stone_square(placed_at):
+    # the table is placed from the first state, then stones are held at the corners of a square
+    return trajectory([
+        ('noop', placed_at, 2, 0),
+        ('place_table', placed_at, 1, 0),
+        ('noop', (3, 3), 1, 1),
+        ('noop', (3, 7), 1, 1),
+        ('noop', (7, 7), 1, 1),
+        ('noop', (7, 3), 1, 1),
+    ])
+
+
+def test_item_placed_at_the_first_state_is_inside_the_contour():
+    assert is_item_in_closed_contour(stone_square((5, 5)), 'table', 'stone') is True
+
+
+def test_item_placed_outside_the_contour():
+    assert is_item_in_closed_contour(stone_square((10, 10)), 'table', 'stone') is False
+
+
+def test_item_never_placed():
+    game_data = stone_square((5, 5))
+    game_data.states[1].action = 'noop'
+    assert is_item_in_closed_contour(game_data, 'table', 'stone') is False
+
+
+def test_item_placed_near_another_at_the_first_state():
+    game_data = stone_square((3, 4))
+    assert was_item_placed_near_another(game_data, 'table', 'stone') is True
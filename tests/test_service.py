@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import pytest
+from benchmarks.synthetic import EpisodeConfig, generate_episode
+from columnar import ColumnarGameData
+from evaluation import CheckerSpec, evaluate_episode
+from service import EvaluationService, EpisodeSession, Watch, resolve_checker, watch_dependencies, _jsonable
+from checkers import base
+import scenarius
+import scenarious_map
+
+
+def step_deltas(data, n_states):
+    """Split a compressed changes dictionary into one delta per step."""
+    for step in range(n_states):
+        key = str(step)
+        delta = {'variables': {name: {key: changes[key]} for name, changes in data['variables'].items() if key in changes}}
+        for section in ('inventory', 'achievements', 'actions', 'map'):
+            if key in data[section]:
+                delta[section] = {key: data[section][key]}
+        yield delta
+
+
+def test_declared_dependencies_are_completed_server_side():
+    assert watch_dependencies(base.find_item_in_inventory, ['inventory/wood']) == {'inventory/wood', 'steps'}
+    assert watch_dependencies(base.find_item_in_inventory) is None
+    assert watch_dependencies(scenarious_map.find_clusters) == {'map'}
+    assert watch_dependencies(scenarius.was_item_collected_after_another, ['actions']) == {'inventory', 'actions'}
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_replay_matches_offline_evaluation(seed):
+    n_states = 400
+    data = generate_episode(EpisodeConfig(n_states=n_states, map_size=(16, 16), edit_rate=0.2, seed=seed))
+    watches = [
+        Watch.of(base.find_item_in_inventory, 'wood', depends_on=['inventory/wood']),
+        Watch.of(base.is_achievement_obtained, 'COLLECT_WOOD', 0),
+        Watch.of(scenarius.was_item_collected_after_another, 'wood', 'stone'),
+        Watch.of(scenarius.did_placing_item_increase_variable, 'table', 'player_xp'),
+        Watch.of(scenarious_map.find_clusters),
+        Watch.of(base.did_player_go_north, 0, 50, depends_on=['variables/player_position']),
+    ]
+    session = EpisodeSession(watches)
+    for delta in step_deltas(data, n_states):
+        session.step(delta)
+
+    specs = [watch.spec for watch in watches]
+    offline = evaluate_episode(ColumnarGameData.from_json(data), specs, record_errors=True)
+    assert _jsonable(session.verdicts) == _jsonable({spec.label: result for spec, result in zip(specs, offline)})
+
+
+def test_resolve_checker_only_finds_public_checkers():
+    assert resolve_checker('find_item_in_inventory') is base.find_item_in_inventory
+    assert resolve_checker('scenarius.was_item_placed_near_another') is scenarius.was_item_placed_near_another
+    for name in ('os.system', '_private', 'checkers.base._x', 'nope'):
+        with pytest.raises(ValueError):
+            resolve_checker(name)
+
+
+def run_with_server(client, service=None):
+    """Run `client(reader, writer, service)` against a service on a temporary Unix socket."""
+    service = service or EvaluationService()
+    errors = []
+
+    async def main(path):
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        server = asyncio.create_task(service.serve(path))
+        for _ in range(100):
+            if os.path.exists(path):
+                break
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_unix_connection(path)
+        try:
+            return await client(reader, writer, service)
+        finally:
+            writer.close()
+            server.cancel()
+            await asyncio.sleep(0.05)
+
+    with tempfile.TemporaryDirectory() as directory:
+        result = asyncio.run(main(os.path.join(directory, 'service.sock')))
+    return result, errors
+
+
+async def request(reader, writer, message):
+    writer.write((json.dumps(message) if isinstance(message, dict) else message).encode('utf-8') + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def test_protocol_round_trip():
+    async def client(reader, writer, service):
+        replies = [
+            await request(reader, writer, {'op': 'register', 'episode': 'e1', 'id': 7, 'checker': 'find_item_in_inventory',
+                                           'args': ['wood'], 'name': 'wood'}),
+            await request(reader, writer, {'op': 'step', 'episode': 'e1', 'changes': {'inventory': {'0': {'wood': 1}}}}),
+            await request(reader, writer, {'op': 'step', 'episode': 'e1', 'changes': {'actions': {'1': 'w'}}}),
+            await request(reader, writer, {'op': 'step', 'episode': 'e1', 'changes': {'actions': {'0': 'w'}}}),
+            await request(reader, writer, {'op': 'register', 'episode': 'e1', 'checker': 'os.system'}),
+            await request(reader, writer, {'op': 'frobnicate', 'episode': 'e1'}),
+            await request(reader, writer, 'not json'),
+            await request(reader, writer, '[1, 2]'),
+            await request(reader, writer, {'op': 'end', 'episode': 'e1'}),
+        ]
+        return replies, dict(service.sessions)
+
+    (replies, sessions), errors = run_with_server(client)
+    register, first, second, stale, unknown, bad_op, bad_json, not_object, end = replies
+    assert register == {'id': 7, 'episode': 'e1', 'registered': 'wood', 'step': -1, 'verdicts': {}}
+    assert first['verdicts'] == {'wood': [0]}
+    assert second == {'episode': 'e1', 'step': 1, 'verdicts': {'wood': [0, 1]}}
+    assert 'older than' in stale['error']
+    assert 'Unknown checker' in unknown['error']
+    assert 'Unknown operation' in bad_op['error']
+    assert bad_json['error'].startswith('JSONDecodeError')
+    assert not_object == {'error': 'Expected a JSON object.'}
+    assert end == {'episode': 'e1', 'closed': True, 'step': 1, 'verdicts': {'wood': [0, 1]}}
+    assert sessions == {}
+    assert errors == []
+
+
+def slow_checker(game_data):
+    time.sleep(0.5)
+    return True
+
+
+def test_slow_watch_does_not_block_other_episodes():
+    async def client(reader, writer, service):
+        service.session('slow').register(Watch(CheckerSpec.of(slow_checker)))
+        step = {'op': 'step', 'changes': {'actions': {'0': 'w'}}}
+        for episode in ('slow', 'fast'):
+            writer.write(json.dumps(dict(step, episode=episode)).encode('utf-8') + b'\n')
+        await writer.drain()
+        return [json.loads(await reader.readline())['episode'] for _ in range(2)]
+
+    order, errors = run_with_server(client)
+    assert order == ['fast', 'slow']
+    assert errors == []
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.lines, self.closed = [], False
+
+    def write(self, data):
+        self.lines.append(data)
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_cancelled_connection_drops_pending_replies_and_propagates():
+    async def main():
+        service = EvaluationService([Watch(CheckerSpec.of(slow_checker))])
+        reader, writer = asyncio.StreamReader(), RecordingWriter()
+        reader.feed_data(b'{"op": "step", "episode": "e1", "changes": {"actions": {"0": "w"}}}\n')
+        connection = asyncio.create_task(service.handle_connection(reader, writer))
+        await asyncio.sleep(0.05)
+        connection.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await connection
+        await asyncio.sleep(0.6)
+        return writer
+
+    writer = asyncio.run(main())
+    assert writer.closed
+    assert writer.lines == []
+
+
+def test_steps_of_one_episode_are_applied_in_order():
+    async def client(reader, writer, service):
+        for step in range(50):
+            message = {'op': 'step', 'episode': 'e1', 'id': step, 'changes': {'inventory': {str(step): {'wood': step}}}}
+            writer.write(json.dumps(message).encode('utf-8') + b'\n')
+        await writer.drain()
+        return [json.loads(await reader.readline()) for _ in range(50)]
+
+    replies, errors = run_with_server(client)
+    assert [reply['id'] for reply in replies] == list(range(50))
+    assert all('error' not in reply for reply in replies)
+    assert errors == []
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from shapes import stencil, square_template, line_templates, contains_shape
+from columnar import load_columnar_game_data
+from scenarios_building import is_line_formed, is_square_formed
+
+
+def test_line_and_square_templates():
+    mask = np.zeros((4, 4), dtype=bool)
+    mask[1, :3] = True
+    assert contains_shape(mask, line_templates(3))
+    assert not contains_shape(mask, line_templates(4))
+    assert contains_shape(mask, [square_template(1)])
+    assert not contains_shape(mask, [square_template(2)])
+
+
+@pytest.mark.parametrize('build', [lambda: stencil([]), lambda: line_templates(0), lambda: line_templates(-1, True),
+                                   lambda: square_template(0)])
+def test_empty_patterns_are_rejected(build):
+    with pytest.raises(ValueError):
+        build()
+
+
+def test_checkers_reject_empty_patterns(episode_path):
+    game_data = load_columnar_game_data(episode_path).to_game_data(lazy=True)
+    with pytest.raises(ValueError, match='at least 1'):
+        is_line_formed(game_data, 'CRAFTING_TABLE', 0)
+    with pytest.raises(ValueError, match='at least 1'):
+        is_square_formed(game_data, 'CRAFTING_TABLE', 0)
@@ -0,0 +1,74 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import pytest
+from benchmarks.synthetic import EpisodeConfig, generate_episode
+from columnar import ColumnarGameData
+from evaluation import CheckerSpec
+from concurrent.futures import ProcessPoolExecutor
+from parallel import evaluate_directory, _attach_worker, _evaluate_shared_chunk
+from checkers import base
+import scenarius
+import scenarious_map
+from shared_corpus import SharedCorpus
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def corpus():
+    episodes = [(f'e{seed}', ColumnarGameData.from_json(generate_episode(EpisodeConfig(n_states=50, map_size=(8, 8), seed=seed))))
+                for seed in range(3)]
+    with SharedCorpus.create(episodes) as corpus:
+        yield corpus
+
+
+def attach_in_subprocess(name):
+    code = f'from shared_corpus import SharedCorpus\ncorpus = SharedCorpus.attach({name!r})\nprint(len(corpus))\ncorpus.close()'
+    return subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def test_independent_process_attaching_does_not_unlink_the_block(corpus):
+    for _ in range(2):
+        result = attach_in_subprocess(corpus.name)
+        assert result.stdout.strip() == '3'
+        assert 'leaked' not in result.stderr
+    attached = SharedCorpus.attach(corpus.name)
+    assert attached.paths == ['e0', 'e1', 'e2']
+    attached.close()
+
+
+def test_close_unlinks_the_block_while_episodes_are_alive(corpus):
+    episode = corpus.episode(0)
+    corpus.close()
+    with pytest.raises(FileNotFoundError):
+        SharedCorpus.attach(corpus.name)
+    assert episode.n_states == 50
+    assert int(episode.variables['timestep'][-1]) == 49
+
+
+def test_shared_evaluation_matches_per_worker_loading(tmp_path):
+    for seed in range(4):
+        with open(tmp_path / f'e{seed}.json', 'w') as file:
+            json.dump(generate_episode(EpisodeConfig(n_states=80, map_size=(8, 8), seed=seed)), file)
+    specs = [CheckerSpec.of(base.find_item_in_inventory, 'wood'), CheckerSpec.of(scenarious_map.find_clusters),
+             CheckerSpec.of(scenarius.was_item_collected_after_another, 'wood', 'stone')]
+    expected = evaluate_directory(str(tmp_path), specs, workers=2)
+    shared = evaluate_directory(str(tmp_path), specs, workers=2, shared=True)
+    assert shared.episodes == expected.episodes
+    assert shared.results == expected.results
+
+
+@pytest.mark.parametrize('method', ['fork', 'spawn'])
+def test_workers_attaching_leave_the_owner_entry_in_place(corpus, method):
+    specs = [CheckerSpec.of(base.find_item_in_inventory, 'wood')]
+    context = multiprocessing.get_context(method)
+    with ProcessPoolExecutor(max_workers=2, mp_context=context, initializer=_attach_worker,
+                             initargs=(corpus.name,)) as pool:
+        results = list(pool.map(_evaluate_shared_chunk, [corpus.name] * 3, [[0], [1], [2]], [specs] * 3, [False] * 3))
+    assert [chunk[0][0] for chunk in results] == ['e0', 'e1', 'e2']
+    attached = SharedCorpus.attach(corpus.name)
+    assert len(attached) == 3
+    attached.close()
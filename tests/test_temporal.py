@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from columnar import load_columnar_game_data
+from temporal import Query, Predicate, action, always, eventually, until
+
+
+def constant(mask):
+    mask = np.asarray(mask, dtype=bool)
+    return Predicate(lambda columns: mask)
+
+
+@pytest.fixture
+def game_data(episode_path):
+    return load_columnar_game_data(episode_path)
+
+
+def test_action_rejects_unknown_names(game_data):
+    with pytest.raises(ValueError):
+        action('place_tabel')
+    assert not action('place_table').mask(game_data).all()
+
+
+def test_operators_match_brute_force(game_data):
+    rng = np.random.default_rng(0)
+    n = game_data.n_states
+    for _ in range(20):
+        a, b = rng.random(n) < 0.3, rng.random(n) < 0.7
+        within = int(rng.integers(0, 4))
+        A, B = constant(a), constant(b)
+        assert eventually(A, within).mask(game_data).tolist() == [bool(a[t:t + within + 1].any()) for t in range(n)]
+        assert always(B, within).mask(game_data).tolist() == [bool(b[t:t + within + 1].all()) for t in range(n)]
+        assert A.then(B, within).mask(game_data).tolist() == [bool(a[t] and b[t + 1:t + within + 1].any()) for t in range(n)]
+        expected = []
+        for t in range(n):
+            reached = next((s for s in range(t, n) if a[s] or not b[s]), None)
+            expected.append(reached is not None and bool(a[reached]))
+        assert until(B, A).mask(game_data).tolist() == expected
+
+
+def test_query_subclasses_must_implement_compile():
+    with pytest.raises(TypeError):
+        Query()
+
+    class Incomplete(Query):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
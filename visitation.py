@@ -0,0 +1,63 @@
+from typing import Optional
+import numpy as np
+from scipy.ndimage import binary_dilation
+from columnar import as_columnar, iter_step_maps
+from blocks import Block, block_mask
+from clusters import Clusters
+from spatial import disk_offsets
+
+
+def clusters_near_block(clusters: Clusters, map_data: np.ndarray, block: Block) -> np.ndarray:
+    """
+    Flag the clusters having `block` on one of their cells or on a neighbouring cell (8-connected).
+
+    Args:
+    - clusters (Clusters): The clusters.
+    - map_data (np.ndarray): The map on which `block` is searched.
+    - block (str or int): The block type.
+
+    Returns:
+    - np.ndarray: Boolean flag of every cluster.
+    """
+    reach = binary_dilation(block_mask(map_data, block), structure=np.ones((3, 3), dtype=np.bool_))
+    near = np.zeros(clusters.count, dtype=np.bool_)
+    near[clusters.labels[reach & (clusters.labels > 0)] - 1] = True
+    return near
+
+
+def first_visits(game_data, clusters: Clusters, radius: float = 1, required_block: Optional[Block] = None) -> np.ndarray:
+    """
+    First step at which the player stood within `radius` of each cluster.
+
+    Every trajectory position is shifted by each integer offset of the disk and looked up in
+    the label map with one fancy-indexing call, so the cost is states x disk size instead of
+    states x cluster cells.
+
+    Args:
+    - game_data (GameData or ColumnarGameData): The game data object.
+    - clusters (Clusters): The clusters to visit.
+    - radius (float): The largest Euclidean distance between the player and a cluster cell.
+    - required_block (str or int, optional): If given, a visit only counts while this block is
+      next to the cluster on the map of that step.
+
+    Returns:
+    - np.ndarray: First visit step of every cluster, or -1 if it is never visited.
+    """
+    columns = as_columnar(game_data)
+    positions = np.asarray(columns.variables['player_position'], dtype=np.int64)
+    offsets = disk_offsets(radius)
+    found = clusters.label_at((positions[:, None, :] + offsets[None, :, :]).reshape(-1, 2)).reshape(len(positions), len(offsets))
+    steps, slots = np.nonzero(found >= 0)
+    labels = found[steps, slots]
+
+    if required_block is not None and len(steps):
+        keep = np.zeros(len(steps), dtype=np.bool_)
+        for map_data, indices in iter_step_maps(game_data, steps):
+            keep[indices] = clusters_near_block(clusters, map_data, required_block)[labels[indices]]
+        steps, labels = steps[keep], labels[keep]
+
+    # hits are ordered by step, so the first occurrence of a cluster is its first visit
+    visits = np.full(clusters.count, -1, dtype=np.int64)
+    visited, first = np.unique(labels, return_index=True)
+    visits[visited] = steps[first]
+    return visits